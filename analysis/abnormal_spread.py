@@ -1 +1,220 @@
+# analysis/abnormal_spread.py
+"""
+異常盤口偵測引擎。
 
+原本 `detect_anomaly` 對所有運動都用 `|spread| > 15 or total > 240`，對 MLB / Soccer
+毫無意義，且逐列判斷。這裡改為每個 (sport, league) 各自維護近期觀測值：
+
+✔ 每個指標（|spread|、total、盤口變動 move）一個固定長度的環狀緩衝區，
+  每輪只把新觀測值併入（O(新資料)）
+✔ 以緩衝區計算 rolling z-score 與 robust（median / MAD）z-score，整個賽程一次向量化判斷
+✔ 樣本數不足時退回各運動的靜態門檻
+✔ 可選的狀態落地（ANOMALY_STATE，.npz），重啟後不必重新累積
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+ANOMALY_WINDOW = int(os.getenv("ANOMALY_WINDOW", "500"))
+ANOMALY_MIN_OBS = int(os.getenv("ANOMALY_MIN_OBS", "30"))
+ANOMALY_Z = float(os.getenv("ANOMALY_Z", "3.0"))
+ANOMALY_MAD_Z = float(os.getenv("ANOMALY_MAD_Z", "3.5"))
+ANOMALY_STATE = os.getenv("ANOMALY_STATE")  # 例如 ./cache/anomaly_state.npz
+
+METRICS = ("spread", "total", "move")
+
+# 樣本不足時的靜態門檻（|spread|、total、|move|）
+STATIC_BOUNDS: Dict[str, Dict[str, float]] = {
+    "NBA": {"spread": 15.0, "total": 240.0, "move": 2.0},
+    "MLB": {"spread": 2.5, "total": 11.5, "move": 1.0},
+    "Soccer": {"spread": 2.5, "total": 4.5, "move": 0.75},
+}
+DEFAULT_BOUNDS = STATIC_BOUNDS["NBA"]
+
+# MAD → 常態標準差的換算係數
+_MAD_SCALE = 1.4826
+
+
+class RollingWindow:
+    """固定容量的 float64 環狀緩衝區。"""
+
+    __slots__ = ("buf", "pos", "count")
+
+    def __init__(self, capacity: int, values: Optional[np.ndarray] = None):
+        self.buf = np.empty(capacity, dtype=np.float64)
+        self.pos = 0
+        self.count = 0
+        if values is not None:
+            self.extend(values)
+
+    def extend(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        cap = len(self.buf)
+        if len(values) >= cap:
+            self.buf[:] = values[-cap:]
+            self.pos, self.count = 0, cap
+            return
+        end = self.pos + len(values)
+        if end <= cap:
+            self.buf[self.pos : end] = values
+        else:
+            split = cap - self.pos
+            self.buf[self.pos :] = values[:split]
+            self.buf[: end - cap] = values[split:]
+        self.pos = end % cap
+        self.count = min(cap, self.count + len(values))
+
+    def values(self) -> np.ndarray:
+        """依時間順序（舊 → 新）回傳目前內容。"""
+
+        if self.count < len(self.buf):
+            return self.buf[: self.count]
+        return np.concatenate([self.buf[self.pos :], self.buf[: self.pos]])
+
+
+def zscores(history: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """回傳 (z, robust_z, mad_is_zero)；history 不可為空。"""
+
+    mean, std = history.mean(), history.std()
+    med = np.median(history)
+    mad = np.median(np.abs(history - med)) * _MAD_SCALE
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (x - mean) / std if std > 0 else np.zeros_like(x)
+        rz = (x - med) / mad if mad > 0 else np.zeros_like(x)
+    return z, rz, mad == 0
+
+
+class AnomalyEngine:
+    """每個 (sport, league, metric) 一個 RollingWindow，整個賽程一次判斷。"""
+
+    def __init__(
+        self,
+        window: int = ANOMALY_WINDOW,
+        min_obs: int = ANOMALY_MIN_OBS,
+        z_threshold: float = ANOMALY_Z,
+        mad_threshold: float = ANOMALY_MAD_Z,
+        state_path: Optional[str] = ANOMALY_STATE,
+    ):
+        self.window = window
+        self.min_obs = min_obs
+        self.z_threshold = z_threshold
+        self.mad_threshold = mad_threshold
+        self.state_path = state_path
+        self._windows: Dict[Tuple[str, str, str], RollingWindow] = {}
+        self._lock = threading.Lock()
+        if state_path and os.path.exists(state_path):
+            self.load(state_path)
+
+    def _window(self, key: Tuple[str, str, str]) -> RollingWindow:
+        win = self._windows.get(key)
+        if win is None:
+            win = self._windows[key] = RollingWindow(self.window)
+        return win
+
+    def _flag_group(
+        self, sport: str, league: str, metrics: Mapping[str, np.ndarray]
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        n = len(next(iter(metrics.values())))
+        flags = np.zeros(n, dtype=bool)
+        scores: Dict[str, np.ndarray] = {}
+        bounds = STATIC_BOUNDS.get(sport, DEFAULT_BOUNDS)
+
+        for name, x in metrics.items():
+            win = self._windows.get((sport, league, name))
+            valid = np.isfinite(x)
+            if win is None or win.count < self.min_obs:
+                hit = valid & (x > bounds[name])
+                scores[name] = np.full(n, np.nan)
+            else:
+                z, rz, mad_zero = zscores(win.values(), x)
+                # MAD 為 0（歷史幾乎都同一個值）時 robust z 無意義，改用一般 z-score
+                hit = valid & (
+                    (np.abs(z) > self.z_threshold)
+                    if mad_zero
+                    else (np.abs(rz) > self.mad_threshold)
+                )
+                scores[name] = z if mad_zero else rz
+            flags |= hit
+        return flags, scores
+
+    def detect(
+        self,
+        sport: str,
+        metrics: Mapping[str, np.ndarray],
+        leagues: Optional[Sequence[str]] = None,
+        update: bool = True,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """判斷整個賽程，回傳 (異常旗標, {metric: score})，之後把本輪觀測值併入歷史。
+
+        `metrics` 的值為等長的一維陣列（NaN 表示無資料，不判斷也不併入）：
+        spread 以絕對值比較，move 為最新盤 − 初盤（同樣取絕對值）。
+        """
+
+        metrics = {
+            name: np.abs(np.asarray(v, dtype=np.float64)) if name in ("spread", "move")
+            else np.asarray(v, dtype=np.float64)
+            for name, v in metrics.items()
+            if name in METRICS
+        }
+        n = len(next(iter(metrics.values()))) if metrics else 0
+        flags = np.zeros(n, dtype=bool)
+        scores = {name: np.full(n, np.nan) for name in metrics}
+        if n == 0:
+            return flags, scores
+
+        if leagues is None:
+            groups, inverse = np.array([""]), np.zeros(n, dtype=np.intp)
+        else:
+            groups, inverse = np.unique(np.asarray(leagues, dtype=str), return_inverse=True)
+
+        with self._lock:
+            for gi, league in enumerate(groups):
+                idx = np.flatnonzero(inverse == gi)
+                sub = {name: x[idx] for name, x in metrics.items()}
+                g_flags, g_scores = self._flag_group(sport, str(league), sub)
+                flags[idx] = g_flags
+                for name, s in g_scores.items():
+                    scores[name][idx] = s
+                if update:
+                    for name, x in sub.items():
+                        self._window((sport, str(league), name)).extend(x)
+            if update and self.state_path:
+                self._save_locked(self.state_path)
+
+        return flags, scores
+
+    # ── 狀態落地 ─────────────────────────────────────────────────
+
+    def _save_locked(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            arrays = {"|".join(k): w.values() for k, w in self._windows.items()}
+            tmp = f"{path}.tmp.npz"
+            np.savez_compressed(tmp, **arrays)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logging.error(f"異常偵測狀態寫入失敗：{exc}")
+
+    def save(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            self._save_locked(path or self.state_path)
+
+    def load(self, path: str) -> None:
+        try:
+            with np.load(path) as data:
+                for key in data.files:
+                    sport, league, metric = key.split("|")
+                    self._windows[(sport, league, metric)] = RollingWindow(self.window, data[key])
+            logging.info(f"✓ 異常偵測狀態載入：{len(self._windows)} 組")
+        except (OSError, ValueError) as exc:
+            logging.error(f"異常偵測狀態載入失敗：{exc}")
+
+
+anomaly_engine = AnomalyEngine()
@@ -0,0 +1,107 @@
+# benchmarks/bench_features.py
+"""
+特徵建構效能比較：逐列 `df.apply(build_features)` vs 欄位式 `build_feature_matrix`。
+
+    python benchmarks/bench_features.py --rows 10000 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.features import build_feature_matrix  # noqa: E402
+
+
+def make_slate(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    spread = rng.normal(0, 6, n).round(1)
+    total = rng.normal(220, 15, n).round(1)
+    spread_s = np.where(spread >= 0, np.char.add("+", spread.astype(str)), spread.astype(str))
+    spread_s[rng.random(n) < 0.02] = "-"  # 少量無法解析的盤口
+    return pd.DataFrame(
+        {
+            "kickoff": "19:30",
+            "home": rng.integers(0, 600, n).astype(str),
+            "away": rng.integers(0, 600, n).astype(str),
+            "spread": spread_s,
+            "total": total.astype(str),
+            "inj_home": [[{}] * k for k in rng.integers(0, 5, n)],
+            "inj_away": [[{}] * k for k in rng.integers(0, 5, n)],
+            "home_wins": rng.integers(0, 6, n),
+            "away_wins": rng.integers(0, 6, n),
+        }
+    )
+
+
+# ── 舊版逐列實作（僅供比較） ─────────────────────────────────────
+
+def legacy_build_features(row: pd.Series) -> np.ndarray:
+    feats = []
+    try:
+        feats.append(float(row["spread"].replace("+", "")))
+    except ValueError:
+        feats.append(0.0)
+    try:
+        feats.append(float(row["total"]))
+    except ValueError:
+        feats.append(0.0)
+    feats.append(len(row.get("inj_home", [])))
+    feats.append(len(row.get("inj_away", [])))
+    feats.append(row.get("home_wins", 0))
+    feats.append(row.get("away_wins", 0))
+    return np.array(feats, dtype=float)
+
+
+def legacy_is_abnormal(r: pd.Series) -> bool:
+    try:
+        return abs(float(r["spread"])) > 15 or float(r["total"]) > 240
+    except ValueError:
+        return False
+
+
+def legacy_path(df: pd.DataFrame) -> np.ndarray:
+    feats = np.vstack(df.apply(legacy_build_features, axis=1))
+    df.apply(legacy_is_abnormal, axis=1)
+    return feats
+
+
+def columnar_path(df: pd.DataFrame) -> np.ndarray:
+    feats = build_feature_matrix(df)
+    _ = (np.abs(feats[:, 0]) > 15) | (feats[:, 1] > 240)
+    return feats
+
+
+def _best_of(fn, df: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'legacy(s)':>10} {'columnar(s)':>12} {'speedup':>8}")
+    for n in args.rows:
+        df = make_slate(n)
+        np.testing.assert_allclose(legacy_path(df), columnar_path(df), rtol=1e-5)
+        legacy = _best_of(legacy_path, df, args.repeat)
+        columnar = _best_of(columnar_path, df, args.repeat)
+        print(f"{n:>8} {legacy:>10.3f} {columnar:>12.4f} {legacy / columnar:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
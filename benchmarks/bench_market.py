@@ -0,0 +1,95 @@
+# benchmarks/bench_market.py
+"""
+多莊家市場計算：逐場 Python 迴圈 vs OddsMatrix（modules/odds_matrix.py）。
+
+    python benchmarks/bench_market.py --matches 1000 10000 --books 20
+
+兩條路徑都從列表頁解析後的 `books`（{莊家: [賠率字串, ...]}）開始，
+算出最佳賠率、去水共識機率與套利報酬率；結果需一致。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.odds_matrix import OddsMatrix  # noqa: E402
+
+
+def make_books(n: int, books: int, outcomes: int, seed: int = 0):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        fair = [rng.uniform(0.2, 0.8) for _ in range(outcomes)]
+        total = sum(fair)
+        per = {}
+        for b in range(books):
+            if rng.random() < 0.15:
+                continue  # 部分莊家沒開盤
+            margin = 1 + rng.uniform(0.02, 0.08)
+            per[f"bm{b}"] = [f"{total / (p * margin) * rng.uniform(0.97, 1.03):.2f}" for p in fair]
+        out.append(per)
+    return out
+
+
+def path_loop(books):
+    rows = []
+    for per in books:
+        prices = {name: [float(p) for p in ps] for name, ps in per.items()}
+        k = len(next(iter(prices.values()))) if prices else 0
+        best = [max((ps[j] for ps in prices.values()), default=float("nan")) for j in range(k)]
+        fair = []
+        for ps in prices.values():
+            inv = [1 / p for p in ps]
+            s = sum(inv)
+            fair.append([x / s for x in inv])
+        consensus = [sum(f[j] for f in fair) / len(fair) for j in range(k)] if fair else []
+        arb = 1 / sum(1 / b for b in best) - 1 if best else float("nan")
+        rows.append((best, consensus, arb))
+    return rows
+
+
+def path_matrix(books):
+    matrix = OddsMatrix.from_books([str(i) for i in range(len(books))], books)
+    best, _ = matrix.best_price()
+    margin, _ = matrix.arbitrage()
+    return best, matrix.consensus(), margin
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--books", type=int, default=20)
+    parser.add_argument("--outcomes", type=int, choices=[2, 3], default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'path':<7} {'matches':>8} {'median(ms)':>11} {'matches/s':>11}")
+    for n in args.matches:
+        books = make_books(n, args.books, args.outcomes)
+        results = {}
+        for name, fn in (("loop", path_loop), ("matrix", path_matrix)):
+            times = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                results[name] = fn(books)
+                times.append(time.perf_counter() - t0)
+            median = sorted(times)[len(times) // 2]
+            print(f"{name:<7} {n:>8} {median * 1e3:>11.1f} {n / median:>11.0f}")
+
+        best, consensus, margin = results["matrix"]
+        loop = results["loop"]
+        assert np.allclose(best, [r[0] for r in loop])
+        assert np.allclose(consensus, [r[1] for r in loop])
+        assert np.allclose(margin, [r[2] for r in loop])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# benchmarks/bench_parsers.py
+"""
+HTML 解析效能比較：舊版 BeautifulSoup 寫法 vs modules/html_parse（lxml + XPath）。
+
+    python benchmarks/bench_parsers.py --rows 500 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from modules import html_parse  # noqa: E402
+from modules.sources import oddspedia_events  # noqa: E402
+
+
+# ── 舊版寫法（僅供比較） ─────────────────────────────────────────
+
+def legacy_oddspedia_table(html):
+    soup = BeautifulSoup(html, "lxml")
+    table = soup.select_one("table[data-testid='odds-table']")
+    rows = []
+    for tr in table.select("tbody tr"):
+        tds = tr.select("td")
+        try:
+            rows.append(
+                {
+                    "kickoff": tds[0].get_text(strip=True),
+                    "home": tds[1].get_text(strip=True),
+                    "away": tds[2].get_text(strip=True),
+                    "spread": tds[3].get_text(strip=True).replace("−", "-"),
+                    "total": tds[4].get_text(strip=True),
+                }
+            )
+        except IndexError:
+            continue
+    return rows
+
+
+def legacy_oddspedia_events(html):
+    soup = BeautifulSoup(html, "html.parser")
+    games = []
+    for match in soup.select("div.eventRow"):
+        try:
+            odds = match.select(".bookmaker-area .odds-value")
+            games.append(
+                {
+                    "teams": match.select_one(".eventCell__name").text.strip(),
+                    "home_odds": odds[0].text if odds else "-",
+                    "away_odds": odds[1].text if len(odds) > 1 else "-",
+                }
+            )
+        except Exception:
+            continue
+    return games
+
+
+def legacy_sofascore(html):
+    soup = BeautifulSoup(html, "html.parser")
+    games = []
+    for block in soup.select("div.eventRow__main"):
+        teams = block.select("span.eventRow__name")
+        scores = block.select_one("div.eventRow__score")
+        if len(teams) == 2 and scores and ":" in scores.text:
+            h, a = map(int, scores.text.strip().split(":"))
+            games.append((teams[0].text.strip(), teams[1].text.strip(), h, a))
+    return games
+
+
+def legacy_rotowire(html):
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="injury-table")
+    data = {}
+    for row in table.find_all("tr")[1:]:
+        cols = row.find_all("td")
+        if len(cols) >= 5:
+            data.setdefault(cols[0].text.strip(), []).append(cols[1].text.strip())
+    return data
+
+
+CASES = [
+    ("oddspedia_table", legacy_oddspedia_table, html_parse.parse_oddspedia_table),
+    (
+        "oddspedia_events",
+        legacy_oddspedia_events,
+        lambda h: html_parse.parse_event_rows(h, "eventCell__name", oddspedia_events.odds_xpath),
+    ),
+    ("sofascore_events", legacy_sofascore, html_parse.parse_sofascore_events),
+    ("rotowire_injuries", legacy_rotowire, html_parse.parse_rotowire_injuries),
+]
+
+
+def _best_of(fn, html, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'fixture':<18} {'rows':>6} {'KiB':>7} {'bs4(ms)':>9} {'lxml(ms)':>9} {'speedup':>8}")
+    for n in args.rows:
+        for name, legacy, fast in CASES:
+            html = fixtures.load(name, n)
+            t_old, out_old = _best_of(legacy, html, args.repeat)
+            t_new, out_new = _best_of(fast, html, args.repeat)
+            assert len(out_old) == len(out_new), (name, len(out_old), len(out_new))
+            print(
+                f"{name:<18} {n:>6} {len(html) / 1024:>7.0f} {t_old * 1e3:>9.1f}"
+                f" {t_new * 1e3:>9.1f} {t_old / t_new:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# benchmarks/bench_pipeline.py
+"""
+整條流程的離線基準測試：所有 HTTP 由 benchmarks/replay.py 以 fixtures 重播
+（Oddspedia 賠率表、SofaScore 傷兵 JSON、Rotowire 傷兵表、LINE API）。
+
+量測 `run_once`、`fetch_odds`、`get_rotowire_injuries`、`predict_total`、
+`extract_info_from_image` 在不同賽程大小下的延遲（中位數 / 最小值）、吞吐量（列/秒）
+與 Python 配置的峰值記憶體（tracemalloc；OCR 子程序不在內）。
+
+    python benchmarks/bench_pipeline.py --sizes 10 1000 50000
+    python benchmarks/bench_pipeline.py --save-baseline          # 寫入 benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json --tolerance 0.2
+
+baseline 存在時自動比較，任何情境的中位數超過 baseline × (1 + tolerance) 即以
+exit code 1 結束。baseline 與機器相關，請在同一台機器上建立與比較。
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCENARIOS = ["fetch_odds", "rotowire", "predict_total", "run_once", "ocr"]
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+def _train_total_model(path: str, seed: int = 0) -> None:
+    """與 modules/features.FEATURE_COLUMNS 同欄位的小型總分回歸模型。"""
+
+    import xgboost as xgb
+
+    from modules.features import FEATURE_COLUMNS
+
+    rng = np.random.default_rng(seed)
+    X = np.column_stack(
+        [
+            rng.normal(0, 6, 5000),
+            rng.normal(220, 15, 5000),
+            rng.integers(0, 5, 5000),
+            rng.integers(0, 5, 5000),
+            rng.integers(0, 6, 5000),
+            rng.integers(0, 6, 5000),
+        ]
+    ).astype(np.float32)
+    y = X[:, 1] + rng.normal(0, 8, 5000)
+    dtrain = xgb.DMatrix(X, label=y, feature_names=FEATURE_COLUMNS)
+    xgb.train({"tree_method": "hist", "max_depth": 6}, dtrain, num_boost_round=100).save_model(path)
+
+
+def _setup_env(tmp: str) -> None:
+    # 必須在 import main_runtime_model 之前設定
+    model_path = os.path.join(tmp, "total.ubj")
+    os.environ.update(
+        {
+            "LINE_CHANNEL_ACCESS_TOKEN": "bench-token",
+            "LINE_CHANNEL_SECRET": "bench-secret",
+            "LINE_DELIVERY_BATCH_WAIT": "0",
+            "MODEL_PATH": model_path,
+            "CHANGE_DETECTION": "0",  # 每次重複都要完整處理整張表
+            "HISTORY_GLOB": os.path.join(tmp, "no-history-*.csv"),
+            "TEAM_INDEX_STRICT": "0",  # fixture 隊名（"Team 12"）不在別名表內，仍要照常抓傷兵
+        }
+    )
+    for key in ("ODDS_STORE_DIR", "ANOMALY_STATE", "TEAM_CACHE_DB", "METRICS_RUN_LOG", "PROFILE_RUN"):
+        os.environ.pop(key, None)
+    _train_total_model(model_path)
+
+
+def _screenshot(lines: int) -> bytes:
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (1600, 60 + 28 * lines), "white")
+    draw = ImageDraw.Draw(img)
+    for i in range(lines):
+        draw.text((40, 30 + 28 * i), f"Team {i} vs Team {i + 1}  -3.5  over 221.5", fill="black")
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+class Bench:
+    def __init__(self) -> None:
+        import main_runtime_model as bot
+        from data.injury_parser import get_rotowire_injuries
+
+        from benchmarks.replay import install_replay
+
+        logging.getLogger().setLevel(logging.WARNING)
+        self.bot = bot
+        self.get_rotowire_injuries = get_rotowire_injuries
+        self._install_replay = install_replay
+        self.adapter = None
+
+    def prepare(self, rows: int) -> None:
+        self.adapter = self._install_replay(self.bot.session, rows)
+        self.bot.line_delivery.session.mount("https://", self.adapter)
+        self.bot.line_delivery.session.mount("http://", self.adapter)
+
+    def scenario(self, name: str, rows: int) -> Tuple[Optional[Callable[[], None]], int]:
+        """回傳 (要量測的函式, 處理列數)；情境不適用時函式為 None。"""
+
+        bot = self.bot
+        if name == "fetch_odds":
+            return (lambda: bot.fetch_odds("basketball/nba")), rows
+        if name == "rotowire":
+            return (lambda: self.get_rotowire_injuries("nba")), rows
+        if name == "predict_total":
+            df = bot.fetch_odds("basketball/nba")
+            slate = bot.enrich_slate(bot.MatchSlate.from_frame(df, "NBA"), bot.fetch_injuries)
+            slate.set_wins(bot.feature_store.wins)
+            feats = slate.features()
+            bot.predict_total(df.copy(), feats)  # 預先載入模型
+            return (lambda: bot.predict_total(df.copy(), feats)), rows
+        if name == "run_once":
+            def _run() -> None:
+                bot.team_cache.clear()  # 冷快取：每輪都要補傷兵
+                report = bot.run_once(profile=None)
+                bot.line_delivery.flush(timeout=300)
+                failed = {k: v for k, v in report.items() if v["status"] != "ok"}
+                if failed:
+                    raise RuntimeError(f"run_once 失敗：{failed}")
+            return _run, rows * len(bot.SPORT_ROUTE)
+        if name == "ocr":
+            import image_handler
+
+            lines = min(rows, 40)  # 截圖只會有一頁的比賽
+            image = _screenshot(lines)
+            try:
+                image_handler.extract_info_from_image(image)
+            except RuntimeError as exc:
+                logging.warning(f"略過 OCR：{exc}")
+                return None, lines
+
+            def _ocr() -> None:
+                image_handler.ocr_service._cache.clear()  # 量測實際 OCR，而非快取命中
+                image_handler.extract_info_from_image(image)
+            return _ocr, lines
+        raise KeyError(name)
+
+
+def measure(fn: Callable[[], None], repeat: int) -> Dict[str, float]:
+    times: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"median_s": statistics.median(times), "min_s": min(times), "peak_kib": peak / 1024}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    base = baseline.get("results", {})
+    print(f"\n比較 baseline（{baseline.get('meta', {}).get('created', '?')}，容許 +{tolerance:.0%}）")
+    for key, cur in results.items():
+        ref = base.get(key)
+        if not ref or "median_s" not in cur:
+            continue
+        ratio = cur["median_s"] / ref["median_s"] if ref["median_s"] else float("inf")
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"  {key:<24} {ref['median_s'] * 1e3:>10.2f}ms → {cur['median_s'] * 1e3:>10.2f}ms  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 50000])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--json", help="另存本次結果")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-pipeline-")
+    _setup_env(tmp)
+    bench = Bench()
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'scenario':<14} {'rows':>6} {'median(ms)':>11} {'min(ms)':>10} {'rows/s':>11} {'peak(KiB)':>10}")
+    for rows in args.sizes:
+        bench.prepare(rows)
+        for name in args.scenarios:
+            fn, n = bench.scenario(name, rows)
+            if fn is None:
+                print(f"{name:<14} {n:>6} {'skipped':>11}")
+                continue
+            r = measure(fn, args.repeat)
+            r["rows"] = n
+            r["rows_per_s"] = n / r["median_s"] if r["median_s"] else float("inf")
+            results[f"{name}@{rows}"] = r
+            print(
+                f"{name:<14} {n:>6} {r['median_s'] * 1e3:>11.2f} {r['min_s'] * 1e3:>10.2f}"
+                f" {r['rows_per_s']:>11.0f} {r['peak_kib']:>10.0f}"
+            )
+        if bench.adapter.unmatched:
+            print(f"  ⚠ 未錄製的請求 {len(bench.adapter.unmatched)} 筆，例如 {bench.adapter.unmatched[0]}")
+
+    payload = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+        print(f"\n已寫入 baseline：{args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        if regressions:
+            print(f"\n✘ {len(regressions)} 個情境變慢：{', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_predict.py
+"""
+推論延遲比較：逐場（每場一個 DataFrame + 三次 predict）vs 整個賽程批次預測。
+
+    python benchmarks/bench_predict.py --games 10 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.predictor import ModelHandle, predict_batch  # noqa: E402
+
+FEATURES = ["home_score", "away_score"]
+TARGETS = ["home_win", "spread", "over"]
+
+
+def train_models(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {"home_score": rng.integers(80, 140, 2000), "away_score": rng.integers(80, 140, 2000)}
+    )
+    labels = {
+        "home_win": df["home_score"] > df["away_score"],
+        "spread": (df["home_score"] - df["away_score"]) > -2.5,
+        "over": (df["home_score"] + df["away_score"]) > 220,
+    }
+    models = {}
+    for target in TARGETS:
+        model = XGBClassifier(n_estimators=100, max_depth=4, tree_method="hist", eval_metric="logloss")
+        model.fit(df[FEATURES], labels[target].astype(int))
+        models[target] = model
+    return models
+
+
+def make_games(n: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    return [
+        {"home_score": int(h), "away_score": int(a)}
+        for h, a in zip(rng.integers(80, 140, n), rng.integers(80, 140, n))
+    ]
+
+
+def per_game(models, games):
+    out = []
+    for game in games:
+        X = pd.DataFrame([[game["home_score"], game["away_score"]]], columns=FEATURES)
+        out.append(tuple(models[t].predict(X)[0] for t in TARGETS))
+    return out
+
+
+def batched(handles, games):
+    X = np.array([[g[f] for f in FEATURES] for g in games], dtype=np.float32)
+    return predict_batch(handles, X)
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    models = train_models()
+    handles = {t: ModelHandle(t, "<memory>", 0.0, m, False, True) for t, m in models.items()}
+
+    print(f"{'games':>6} {'per-game ms/game':>17} {'batched ms/game':>16} {'speedup':>8}")
+    for n in args.games:
+        games = make_games(n)
+        expected = np.array(per_game(models, games))
+        got = batched(handles, games)
+        assert (np.column_stack([got[t][0] for t in TARGETS]) == expected).all()
+
+        slow = _best_of(lambda: per_game(models, games), args.repeat)
+        fast = _best_of(lambda: batched(handles, games), args.repeat)
+        print(f"{n:>6} {slow / n * 1e3:>17.3f} {fast / n * 1e3:>16.4f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
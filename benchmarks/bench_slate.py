@@ -0,0 +1,149 @@
+# benchmarks/bench_slate.py
+"""
+大型多聯盟賽程的記憶體與速度比較（補傷兵 / 勝場 → 特徵矩陣）：
+
+  rows     舊版：逐列 `row.copy()`、傷兵 dict 列表放進 Series，再由 Series 列表重建 DataFrame
+  frame    不重複球隊抓取後整欄補入 object 欄位（每場兩個 dict 列表）+ `build_feature_matrix`
+  slate    MatchSlate：代碼陣列 + 傷兵人數 / 球員 ID（modules/match_slate.py）
+
+    python benchmarks/bench_slate.py --rows 10000 100000 --leagues 40
+
+記憶體為 tracemalloc 的峰值，以及結果物件本身的大小（DataFrame 為 deep memory_usage）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.enrichment import enrich_slate, fetch_all  # noqa: E402
+from modules.features import build_feature_matrix  # noqa: E402
+from modules.match_slate import MatchSlate  # noqa: E402
+
+
+def make_slate(n: int, leagues: int, teams_per_league: int = 24, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    league = rng.integers(0, leagues, n)
+    home = rng.integers(0, teams_per_league, n)
+    away = (home + rng.integers(1, teams_per_league, n)) % teams_per_league
+    spread = rng.normal(0, 6, n).round(1)
+    return pd.DataFrame(
+        {
+            "kickoff": [f"{h}:{m:02d}" for h, m in zip(rng.integers(10, 24, n), rng.choice([0, 30], n))],
+            "home": [f"L{lg} Team {t}" for lg, t in zip(league, home)],
+            "away": [f"L{lg} Team {t}" for lg, t in zip(league, away)],
+            "spread": np.where(spread >= 0, np.char.add("+", spread.astype(str)), spread.astype(str)),
+            "total": rng.normal(220, 15, n).round(1).astype(str),
+            "league": [f"League {lg}" for lg in league],
+        }
+    )
+
+
+def make_injuries(df: pd.DataFrame, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    teams = pd.unique(pd.concat([df["home"], df["away"]]))
+    table = {
+        t: [
+            {"player": {"id": int(rng.integers(1, 10**6)), "name": f"{t} P{i}"}, "status": "out", "reason": "Knee"}
+            for i in range(rng.integers(0, 7))
+        ]
+        for t in teams
+    }
+    return table.__getitem__
+
+
+def wins(team: str) -> int:
+    return len(team) % 6
+
+
+def path_rows(df, fetch_injuries):
+    enriched_rows = []
+    for _, row in df.iterrows():
+        row = row.copy()
+        row["inj_home"] = fetch_injuries(row["home"])
+        row["inj_away"] = fetch_injuries(row["away"])
+        row["home_wins"] = wins(row["home"])
+        row["away_wins"] = wins(row["away"])
+        enriched_rows.append(row)
+    out = pd.DataFrame(enriched_rows)
+    return out, build_feature_matrix(out)
+
+
+def path_frame(df, fetch_injuries):
+    out = df.copy()
+    teams = list(pd.unique(pd.concat([df["home"], df["away"]], ignore_index=True)))
+    injuries = fetch_all(teams, fetch_injuries, [], max_workers=1)
+    out["inj_home"] = [injuries[t] for t in out["home"]]
+    out["inj_away"] = [injuries[t] for t in out["away"]]
+    out["home_wins"] = out["home"].map(wins)
+    out["away_wins"] = out["away"].map(wins)
+    return out, build_feature_matrix(out)
+
+
+def path_slate(df, fetch_injuries):
+    slate = enrich_slate(MatchSlate.from_frame(df, "bench"), fetch_injuries, max_workers=1)
+    slate.set_wins(wins)
+    return slate, slate.features()
+
+
+def _size(obj) -> int:
+    if isinstance(obj, pd.DataFrame):
+        # memory_usage(deep=True) 算不到 object 欄位內 list 裡的 dict；同一隊的 list 是共用的，
+        # 每個 list 只計一次
+        size = int(obj.memory_usage(deep=True).sum())
+        seen = {}
+        for col in ("inj_home", "inj_away"):
+            if col in obj:
+                for v in obj[col]:
+                    seen[id(v)] = sum(sys.getsizeof(d) for d in v)
+        return size + sum(seen.values())
+    return obj.nbytes
+
+
+def run(fn, df, fetch_injuries):
+    t0 = time.perf_counter()
+    out, feats = fn(df, fetch_injuries)
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    kept = fn(df, fetch_injuries)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return elapsed, peak, _size(out), feats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--leagues", type=int, default=40)
+    parser.add_argument("--skip-rows-path", action="store_true", help="略過最慢的逐列舊版")
+    args = parser.parse_args()
+
+    paths = [("frame", path_frame), ("slate", path_slate)]
+    if not args.skip_rows_path:
+        paths.insert(0, ("rows", path_rows))
+
+    print(f"{'path':<6} {'rows':>7} {'time(ms)':>10} {'peak(MiB)':>10} {'result(MiB)':>12}")
+    for n in args.rows:
+        df = make_slate(n, args.leagues)
+        fetch_injuries = make_injuries(df)
+        reference = None
+        for name, fn in paths:
+            elapsed, peak, size, feats = run(fn, df, fetch_injuries)
+            if reference is None:
+                reference = feats
+            assert np.allclose(reference, feats), name
+            print(f"{name:<6} {n:>7} {elapsed * 1e3:>10.1f} {peak / 2**20:>10.1f} {size / 2**20:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
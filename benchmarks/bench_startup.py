@@ -0,0 +1,207 @@
+# benchmarks/bench_startup.py
+"""
+啟動時間基準測試：各入口模組的 import 時間（`python -X importtime`）與
+webhook 服務的 time-to-first-request（啟動 main.py → 第一個 GET / 回 200）。
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --top 15 --modules main image_handler
+    python benchmarks/bench_startup.py --save-baseline            # 寫入 benchmarks/startup_baseline.json
+
+每次都在新的子程序中量測（不共用已 import 的模組；.pyc 會先預熱一次）。
+baseline 存在時自動比較，任一項的中位數超過 baseline × (1 + tolerance) 即以 exit code 1 結束。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import compare  # noqa: E402
+
+ENTRY_MODULES = ["main", "main_runtime_model", "modules.scheduler", "image_handler", "predict_and_push"]
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+
+ENV = {
+    "LINE_CHANNEL_ACCESS_TOKEN": "bench-token",
+    "LINE_CHANNEL_SECRET": "bench-secret",
+    "ODDS_PROXY_INTERVAL": "0",  # 不在背景爬取
+    "SCHEDULER_STATE": "",  # 不寫排程狀態檔
+    "PYTHONPATH": ROOT,
+}
+
+# (自身 µs, 累計 µs, 深度, 模組)
+ImportRow = Tuple[int, int, int, str]
+
+
+def _env(**extra: str) -> Dict[str, str]:
+    env = {**os.environ, **ENV, **extra}
+    env.pop("PYTHONIMPORTTIME", None)
+    return env
+
+
+def parse_importtime(stderr: str) -> List[ImportRow]:
+    """`import time:  self |  cumulative | name`，name 的縮排（兩格一層）為深度。"""
+
+    rows: List[ImportRow] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表頭
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((int(parts[0]), int(parts[1]), depth, name.strip()))
+    return rows
+
+
+def import_once(module: str) -> Tuple[float, float, List[ImportRow]]:
+    """回傳 (整個程序的牆鐘秒數, 該模組的累計 import 秒數, importtime 明細)。"""
+
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} 失敗：{proc.stderr.strip().splitlines()[-1:]}")
+    rows = parse_importtime(proc.stderr)
+    total = next((cum for _, cum, depth, name in rows if depth == 0 and name == module), 0)
+    return wall, total / 1e6, rows
+
+
+def heaviest(rows: List[ImportRow], top: int) -> List[Tuple[str, float]]:
+    """累計時間最長的第三方 / 本專案套件（只取各自最頂層的那一筆）。"""
+
+    best: Dict[str, int] = {}
+    for _, cum, depth, name in rows:
+        if depth == 0:
+            continue
+        root = name.split(".")[0]
+        best[root] = max(best.get(root, 0), cum)
+    ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return [(name, us / 1e3) for name, us in ranked]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_request_once(scheduler: bool, timeout: float = 60.0) -> float:
+    """啟動 `python main.py`，回傳到 GET / 第一次成功的秒數。"""
+
+    port = _free_port()
+    env = _env(PORT=str(port), ENABLE_SCHEDULER="1" if scheduler else "0")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/"
+        while time.perf_counter() - t0 < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"main.py 提前結束（exit {proc.returncode}）")
+            try:
+                if requests.get(url, timeout=0.5).status_code == 200:
+                    return time.perf_counter() - t0
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"{timeout:.0f}s 內沒有回應")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {"median_s": statistics.median(samples), "min_s": min(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=ENTRY_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="列出累計 import 時間最長的套件數")
+    parser.add_argument("--no-server", action="store_true", help="略過 time-to-first-request")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--json", help="另存本次結果")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'import':<22} {'import(ms)':>11} {'process(ms)':>12}  heaviest")
+    for module in args.modules:
+        import_once(module)  # 預熱 .pyc
+        walls, totals = [], []
+        rows: List[ImportRow] = []
+        for _ in range(args.repeat):
+            wall, total, rows = import_once(module)
+            walls.append(wall)
+            totals.append(total)
+        results[f"import:{module}"] = _summary(totals)
+        results[f"process:{module}"] = _summary(walls)
+        top = ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest(rows, args.top))
+        print(f"{module:<22} {statistics.median(totals) * 1e3:>11.1f} {statistics.median(walls) * 1e3:>12.1f}  {top}")
+
+    if not args.no_server:
+        print(f"\n{'first request':<22} {'median(ms)':>11} {'min(ms)':>12}")
+        for scheduler in (False, True):
+            key = "first_request" + (":scheduler" if scheduler else "")
+            samples = [first_request_once(scheduler) for _ in range(args.repeat)]
+            results[key] = _summary(samples)
+            label = "main.py" + (" +scheduler" if scheduler else "")
+            print(f"{label:<22} {results[key]['median_s'] * 1e3:>11.1f} {results[key]['min_s'] * 1e3:>12.1f}")
+
+    payload = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+        print(f"\n已寫入 baseline：{args.baseline}")
+        return
+
+    baseline: Optional[Dict] = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n✘ {len(regressions)} 項變慢：{', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/load_webhook.py
+"""
+Webhook 壓力測試：送出帶簽章的 `/查詢` 事件，統計 ack 與回覆延遲的 p50 / p99。
+
+預設在本機啟動 main.py 的 Flask app，並以本機的假 LINE API 接收 reply，
+因此可量測「webhook 收到 → reply 送達」的完整延遲：
+
+    python benchmarks/load_webhook.py --requests 2000 --concurrency 32
+
+若指定 --url 則對外部服務施壓（僅量測 ack 延遲）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SECRET = "load-test-secret"
+REPLIES: dict = {}
+
+
+class _FakeLineApi(BaseHTTPRequestHandler):
+    def do_POST(self):  # noqa: N802
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        token = json.loads(body).get("replyToken")
+        if token:
+            REPLIES[token] = time.perf_counter()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(server) -> None:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def start_local_app(teams: int) -> str:
+    fake = ThreadingHTTPServer(("127.0.0.1", 0), _FakeLineApi)
+    _serve(fake)
+    os.environ.update(
+        {
+            "LINE_API": f"http://127.0.0.1:{fake.server_port}",
+            "LINE_CHANNEL_SECRET": SECRET,
+            "LINE_CHANNEL_ACCESS_TOKEN": "load-test-token",
+            "ENABLE_SCHEDULER": "0",
+        }
+    )
+
+    import pandas as pd
+    from werkzeug.serving import make_server
+
+    import main
+    from modules.slate_cache import slate_cache
+
+    slate_cache.update(
+        "NBA",
+        pd.DataFrame(
+            {
+                "kickoff": "19:30",
+                "home": [f"Team {i}" for i in range(teams)],
+                "away": [f"Team {i + teams}" for i in range(teams)],
+                "spread": "-3.5",
+                "total": "220.5",
+                "pred_total": 223.0,
+                "anomaly": False,
+            }
+        ),
+    )
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, main.app, threaded=True)
+    _serve(server)
+    return f"http://127.0.0.1:{server.server_port}/callback"
+
+
+def _signed(body: bytes, secret: str) -> str:
+    return base64.b64encode(hmac.new(secret.encode(), body, hashlib.sha256).digest()).decode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="外部 webhook URL（省略則啟動本機 app）")
+    parser.add_argument("--secret", default=SECRET)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--teams", type=int, default=500)
+    args = parser.parse_args()
+
+    url = args.url or start_local_app(args.teams)
+    local = args.url is None
+    sent: dict = {}
+    acks: list = []
+    local_state = threading.local()
+
+    def fire(i: int) -> None:
+        session = getattr(local_state, "session", None) or requests.Session()
+        local_state.session = session
+        token = uuid.uuid4().hex
+        event = {
+            "type": "message",
+            "replyToken": token,
+            "message": {"type": "text", "text": f"/查詢 Team {i % args.teams}"},
+        }
+        body = json.dumps({"events": [event]}).encode()
+        t0 = time.perf_counter()
+        sent[token] = t0
+        res = session.post(
+            url,
+            data=body,
+            headers={"X-Line-Signature": _signed(body, args.secret), "Content-Type": "application/json"},
+            timeout=10,
+        )
+        acks.append((time.perf_counter() - t0, res.status_code))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(fire, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    if local:
+        deadline = time.time() + 10
+        while len(REPLIES) < len(sent) and time.time() < deadline:
+            time.sleep(0.05)
+
+    ack_ms = np.array([a for a, _ in acks]) * 1e3
+    errors = sum(1 for _, code in acks if code != 200)
+    print(f"requests={len(acks)} concurrency={args.concurrency} errors={errors} rps={len(acks) / elapsed:.0f}")
+    print(f"ack    p50={np.percentile(ack_ms, 50):.1f}ms p99={np.percentile(ack_ms, 99):.1f}ms")
+    if local:
+        reply_ms = np.array([(REPLIES[t] - sent[t]) * 1e3 for t in sent if t in REPLIES])
+        print(
+            f"reply  p50={np.percentile(reply_ms, 50):.1f}ms p99={np.percentile(reply_ms, 99):.1f}ms"
+            f" (received {len(reply_ms)}/{len(sent)})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# gunicorn.conf.py
+"""
+正式環境的 WSGI 設定（Procfile: `web: gunicorn -c gunicorn.conf.py main:app`）。
+
+✔ 單一 worker 程序 + 多執行緒：排程、模型、賽程快取都是程序內狀態，
+  多個 worker 會各自排程、重複推播（WEB_THREADS 調整並行請求數）
+✔ worker 啟動後才開始背景工作（`main.start_background`），不在 master 內 fork 前啟動 thread
+"""
+
+import logging
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = 1
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "8"))
+timeout = int(os.getenv("WEB_TIMEOUT", "30"))
+graceful_timeout = 20
+accesslog = os.getenv("WEB_ACCESS_LOG") or None  # 例如 "-" 輸出到 stdout
+loglevel = os.getenv("LOG_LEVEL", "INFO").lower()
+
+
+def post_worker_init(worker):
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s│%(levelname)s│%(message)s"
+    )
+    from main import start_background
+
+    start_background()
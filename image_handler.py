@@ -1,25 +1,118 @@
 # image_handler.py
-import pytesseract
-from PIL import Image
+"""
+截圖 OCR：擷取對戰隊伍、讓分與大小分。
+
+原本每張截圖都以原尺寸在呼叫端 thread 內跑 `pytesseract.image_to_string`
+（每次 spawn 一個 tesseract 程序、動輒數秒），會卡住 webhook。這裡改為：
+
+✔ OCR 在 process pool 內執行（OCR_WORKERS），`submit_ocr()` 立即回傳 Future
+✔ 前處理：灰階 → 自動對比 → 二值化 → 裁切到文字區域 → 限制最長邊（OCR_MAX_SIDE）
+✔ 以圖檔位元組的摘要去重，重複上傳的截圖直接命中 LRU 快取（OCR_CACHE_SIZE）
+✔ 規則用的正規表示式預先編譯
+✔ 回傳各階段耗時（hash / preprocess / ocr / parse）
+✔ 隊名經 modules/team_index.py 解析為標準球隊 ID（home_team_id / away_team_id）
+✔ PIL / pytesseract 延遲載入：只用 `parse_info` 的文字流程不必付 pytesseract（連帶 pandas）的 import 成本
+"""
+
+import hashlib
 import io
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
 
-def extract_info_from_image(image_bytes):
-    # 開啟圖片
-    image = Image.open(io.BytesIO(image_bytes))
-    
-    # OCR 文字辨識
-    text = pytesseract.image_to_string(image, lang="eng+chi_tra")
-    
+from modules.lazy import lazy_import
+from modules.team_index import team_index
+
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
+pytesseract = lazy_import("pytesseract")
+
+OCR_LANG = os.getenv("OCR_LANG", "eng+chi_tra")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "1600"))
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))
+OCR_THRESHOLD = int(os.getenv("OCR_THRESHOLD", "160"))
+
+SPREAD_RE = re.compile(r'[-+]?\d+\.\d+')
+TOTAL_RE = re.compile(r'\d{3}\.?\d*')
+
+
+@dataclass
+class OcrResult:
+    text: str
+    info: Dict[str, Optional[str]]
+    timings: Dict[str, float] = field(default_factory=dict)
+    cached: bool = False
+
+
+# ────────────────────────────────────────────────────────────────
+# 前處理 / 快取 key
+# ────────────────────────────────────────────────────────────────
+
+def preprocess(image, max_side=OCR_MAX_SIDE, threshold=OCR_THRESHOLD):
+    """灰階、二值化、裁切到文字區域並限制解析度。"""
+    gray = ImageOps.autocontrast(image.convert("L"))
+    binary = gray.point(lambda p: 255 if p > threshold else 0)
+
+    # 深色文字 → 反相後 getbbox 即為文字範圍
+    bbox = ImageOps.invert(binary).getbbox()
+    if bbox:
+        pad = 8
+        left, top, right, bottom = bbox
+        binary = binary.crop((
+            max(0, left - pad), max(0, top - pad),
+            min(binary.width, right + pad), min(binary.height, bottom + pad),
+        ))
+
+    if max(binary.size) > max_side:
+        binary.thumbnail((max_side, max_side), Image.LANCZOS)
+    return binary
+
+
+def image_digest(image_bytes):
+    """快取 key：圖檔位元組的 BLAKE2b 摘要。
+
+    不用感知雜湊（dHash）當 key：同一版面、只有讓分 / 大小分數字不同的截圖
+    縮到 8×9 後雜湊相同，會拿到別張圖的 OCR 結果。
+    """
+    return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+
+def _ocr_worker(image_bytes, lang):
+    """在子程序中執行：前處理 + tesseract。"""
+    t0 = time.perf_counter()
+    try:
+        image = preprocess(Image.open(io.BytesIO(image_bytes)))
+        t1 = time.perf_counter()
+        text = pytesseract.image_to_string(image, lang=lang)
+    except Exception as exc:
+        # pytesseract 的例外無法在主程序還原（pickle），會讓整個 pool 失效
+        raise RuntimeError(f"{type(exc).__name__}: {exc}") from None
+    t2 = time.perf_counter()
+    return text, {"preprocess": t1 - t0, "ocr": t2 - t1}
+
+
+# ────────────────────────────────────────────────────────────────
+# 規則擷取
+# ────────────────────────────────────────────────────────────────
+
+def parse_info(text):
     # 嘗試擷取資訊（你可以再調整這些規則）
-    lines = text.split("\n")
-    lines = [line.strip() for line in lines if line.strip() != ""]
+    lines = [line.strip() for line in text.split("\n") if line.strip() != ""]
 
     info = {
         "home_team": None,
         "away_team": None,
         "spread": None,
-        "total": None
+        "total": None,
+        "home_team_id": None,
+        "away_team_id": None
     }
 
     for line in lines:
@@ -29,12 +122,109 @@ def extract_info_from_image(image_bytes):
                 info["home_team"] = teams[0].strip()
                 info["away_team"] = teams[1].strip()
         if "讓" in line or "+" in line or "-" in line:
-            spread_match = re.search(r'[-+]?\d+\.\d+', line)
+            spread_match = SPREAD_RE.search(line)
             if spread_match:
                 info["spread"] = spread_match.group()
         if "大小" in line or "over" in line.lower() or "under" in line.lower():
-            total_match = re.search(r'\d{3}\.?\d*', line)
+            total_match = TOTAL_RE.search(line)
             if total_match:
                 info["total"] = total_match.group()
 
-    return text, info
+    # OCR 的隊名（中文簡稱 / 夾雜雜訊）→ 標準球隊 ID，見 modules/team_index.py
+    if info["home_team"] or info["away_team"]:
+        home, away = team_index.resolve_pair(info["home_team"], info["away_team"])
+        info["home_team_id"] = home.id if home else None
+        info["away_team_id"] = away.id if away else None
+
+    return info
+
+
+# ────────────────────────────────────────────────────────────────
+# OCR 子系統
+# ────────────────────────────────────────────────────────────────
+
+class OcrService:
+    def __init__(self, workers=OCR_WORKERS, cache_size=OCR_CACHE_SIZE, lang=OCR_LANG):
+        self.workers = workers
+        self.cache_size = cache_size
+        self.lang = lang
+        self._pool = None
+        self._cache: "OrderedDict[bytes, Tuple[str, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _reset_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _cache_get(self, key):
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+            return hit
+
+    def _cache_put(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def submit(self, image_bytes) -> Future:
+        """非阻塞：回傳會得到 OcrResult 的 Future。"""
+        started = time.perf_counter()
+        timings = {}
+
+        t0 = time.perf_counter()
+        key = image_digest(bytes(image_bytes))
+        timings["hash"] = time.perf_counter() - t0
+
+        out: Future = Future()
+        cached = self._cache_get(key)
+        if cached is not None:
+            text, info = cached
+            timings["total"] = time.perf_counter() - started
+            out.set_result(OcrResult(text, info, timings, cached=True))
+            return out
+
+        def _done(fut):
+            try:
+                text, worker_timings = fut.result()
+            except Exception as exc:
+                if isinstance(exc, BrokenProcessPool):
+                    self._reset_pool()
+                out.set_exception(exc)
+                return
+            t0 = time.perf_counter()
+            info = parse_info(text)
+            timings.update(worker_timings)
+            timings["parse"] = time.perf_counter() - t0
+            timings["total"] = time.perf_counter() - started
+            self._cache_put(key, (text, info))
+            out.set_result(OcrResult(text, info, timings))
+
+        self._executor().submit(_ocr_worker, image_bytes, self.lang).add_done_callback(_done)
+        return out
+
+    def ocr(self, image_bytes, timeout=None) -> OcrResult:
+        return self.submit(image_bytes).result(timeout=timeout)
+
+
+ocr_service = OcrService()
+
+
+def submit_ocr(image_bytes) -> Future:
+    return ocr_service.submit(image_bytes)
+
+
+def extract_info_from_image(image_bytes):
+    result = ocr_service.ocr(image_bytes)
+    return result.text, result.info
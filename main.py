@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+main.py — LINE webhook 服務（Procfile: `web: gunicorn -c gunicorn.conf.py main:app`）
+
+✔ POST /callback：驗證 X-Line-Signature 後立即回 200，事件交給 worker pool 處理，
+  不會超過 LINE 的 webhook 回應期限
+✔ `/查詢 <球隊>`：直接從記憶體中的最新賽程快取（modules/slate_cache.py）回覆，
+  不在請求中即時爬蟲
+✔ 背景排程：常駐的 APScheduler 服務（modules/scheduler.py），模型 / 連線池 / 快取
+  在各輪之間保持暖機；各運動間隔可分別設定，重啟後補跑逾期的輪次
+✔ GET /metrics：Prometheus 格式量測；GET /metrics/last-run：上一輪 JSON 摘要
+✔ GET /odds-proxy：共用賠率 proxy（proxy/odds_proxy.py），供其他 bot 實例取用
+✔ 快速啟動：主流程（pandas / xgboost …）不在 import 時載入；排程在背景 thread 暖機，
+  HTTP 服務先開始接受請求（benchmarks/bench_startup.py 量測）
+✔ 正式環境由 gunicorn 服務（gunicorn.conf.py）：worker 啟動後呼叫 `start_background()`
+  開始排程與 odds proxy 更新；`python main.py` 為本機開發用的 Flask 伺服器
+
+環境變數：LINE_CHANNEL_SECRET、LINE_CHANNEL_ACCESS_TOKEN、PORT、
+         WEBHOOK_WORKERS、PUSH_INTERVAL、SPORT_INTERVALS、QUIET_HOURS、
+         ENABLE_SCHEDULER、ODDS_PROXY_INTERVAL
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from flask import Flask, Response, abort, request
+
+from modules.line_delivery import get_delivery
+from modules.metrics import metrics
+from modules.slate_cache import slate_cache
+from proxy.odds_proxy import odds_proxy_bp, start_refresher
+
+LINE_CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
+LINE_CHANNEL_SECRET = os.getenv("LINE_CHANNEL_SECRET")
+QUERY_COMMAND = "/查詢"
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "8"))
+ENABLE_SCHEDULER = os.getenv("ENABLE_SCHEDULER", "1") == "1"
+
+app = Flask(__name__)
+app.register_blueprint(odds_proxy_bp)
+workers = ThreadPoolExecutor(max_workers=WEBHOOK_WORKERS, thread_name_prefix="webhook")
+
+
+def _bot():
+    """主流程模組（第一次呼叫時才 import；排程暖機通常已先載入）。"""
+
+    import main_runtime_model
+
+    return main_runtime_model
+
+
+def verify_signature(body: bytes, signature: str, secret: str | None = LINE_CHANNEL_SECRET) -> bool:
+    if not secret or not signature:
+        return False
+    mac = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).digest()
+    return hmac.compare_digest(base64.b64encode(mac).decode("ascii"), signature)
+
+
+def answer_query(text: str) -> str:
+    """`/查詢 <球隊>` → 快取中的預測與盤口。"""
+
+    team = text[len(QUERY_COMMAND):].strip()
+    if not team:
+        return f"用法：{QUERY_COMMAND} <球隊名稱>"
+    rows = slate_cache.lookup(team)
+    if not rows:
+        return f"目前沒有「{team}」的賽事資料（快取 {len(slate_cache)} 場）"
+    return _bot().fmt_push_msg(f"{team} 查詢", rows)
+
+
+def handle_events(events: List[Dict[str, Any]]) -> None:
+    for event in events:
+        try:
+            if event.get("type") != "message" or event["message"].get("type") != "text":
+                continue
+            text = event["message"]["text"].strip()
+            if text.startswith(QUERY_COMMAND):
+                get_delivery(LINE_CHANNEL_ACCESS_TOKEN).reply(
+                    event["replyToken"], answer_query(text), to=event.get("source", {}).get("userId")
+                )
+        except Exception as exc:
+            logging.error(f"webhook 事件處理失敗：{exc}")
+
+
+@app.post("/callback")
+def callback():
+    body = request.get_data()
+    if not verify_signature(body, request.headers.get("X-Line-Signature", "")):
+        abort(400)
+    try:
+        events = json.loads(body).get("events", [])
+    except ValueError:
+        abort(400)
+    workers.submit(handle_events, events)  # 先 ack，回覆在背景處理
+    return "OK"
+
+
+@app.get("/")
+def health():
+    return {"status": "ok", "cached_games": len(slate_cache)}
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/last-run")
+def last_run():
+    return metrics.last_run or {"status": "no run yet"}
+
+
+def _start_scheduler() -> None:
+    try:
+        from modules.scheduler import start_scheduler
+
+        start_scheduler()
+    except Exception as exc:
+        logging.error(f"排程啟動失敗：{exc}")
+
+
+_background_lock = threading.Lock()
+_background_started = False
+
+
+def start_background() -> None:
+    """啟動排程與 odds proxy 更新（每個程序只執行一次）。
+
+    gunicorn 由 gunicorn.conf.py 的 `post_worker_init` 呼叫；import main 本身不啟動任何背景工作。
+    """
+
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    if ENABLE_SCHEDULER:
+        # 載入主流程與模型需要數秒，不擋住 HTTP 服務啟動
+        threading.Thread(target=_start_scheduler, name="scheduler-init", daemon=True).start()
+    start_refresher()
+
+
+if __name__ == "__main__":
+    # 本機開發：Flask 內建伺服器（正式環境見 Procfile / gunicorn.conf.py）
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s│%(levelname)s│%(message)s"
+    )
+    start_background()
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5000")), threaded=True)
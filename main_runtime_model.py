@@ -9,8 +9,8 @@ Version: 3.0.0  (2025‑05‑31)
 統一的 LINE 賠率推播主程式，全面移除「模擬資料」，改以 _**真實**_ 網路來源為基礎。
 
 ✔ 直接爬取 Oddspedia（Soccer / NBA / MLB 等）最新盤口與賠率
-✔ 透過 SofaScore / ESPN 端點取得即時傷兵與近期戰績
-✔ 內建異常盤口（讓分誘導 & 水位異常）偵測器
+✔ 透過 SofaScore / ESPN 端點取得即時傷兵，近期戰績由本地特徵庫增量維護
+✔ 內建異常盤口（讓分誘導 & 水位異常）偵測器，門檻依運動 / 聯盟歷史自動調整
 ✔ 以 XGBoost 預測比賽總分方向（大 / 小）
 ✔ 每小時自動推播至 LINE，並支援 `/查詢` 指令
 
@@ -19,24 +19,45 @@ Version: 3.0.0  (2025‑05‑31)
    - LINE_CHANNEL_SECRET
    - PROXY_URL（如需代理）
    - SOFASCORE_PROXY（官方或自建 Proxy）
-   - MODEL_PATH（XGBoost .pkl 模型路徑）
+   - MODEL_PATH（XGBoost 模型路徑；同名 .ubj 原生格式存在時優先使用）
+   - TEAM_CACHE_DB（可選，傷兵 / 戰績快取的 SQLite 路徑）
+   - ODDS_STORE_DIR（可選，盤口快照與初盤 / 最新盤索引的目錄）
+   - ANOMALY_STATE（可選，異常偵測歷史狀態 .npz 路徑）
 """
 
 from __future__ import annotations
 
+import argparse
 import os
 import json
+import time
 import logging
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import joblib  # XGBoost 模型
 import numpy as np
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from linebot import LineBotApi, WebhookHandler
-from linebot.models import TextSendMessage
+
+from analysis.abnormal_spread import anomaly_engine
+from model.predictor import registry
+from modules.change_detector import ChangeDetector, FetchResult
+from modules.enrichment import enrich_slate
+from modules.feature_store import feature_store
+from modules.features import SPREAD, TOTAL, build_feature_matrix, parse_line
+from modules.html_parse import ODDS_TABLE_MARKER
+from modules.kickoff_schedule import kickoff_board
+from modules.http_client import get_session
+from modules.line_delivery import get_delivery
+from modules.match_slate import MatchSlate
+from modules.metrics import install_http_metrics, metrics, profile_run
+from modules.odds_analyzer import analyze_odds_shift_frame
+from modules.odds_store import match_key, odds_store
+from modules.slate_cache import slate_cache
+from modules.sources import ODDSPEDIA_BASE, Match, oddspedia_table
+from modules.sport_runner import run_parallel
+from modules.team_cache import team_cache
+from modules.team_index import slugify, team_index
+from scraper_sofascore import get_games_from_sofascore
 
 # ────────────────────────────────────────────────────────────────
 # 全域設定
@@ -50,158 +71,172 @@ logging.basicConfig(
 
 LINE_CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
 LINE_CHANNEL_SECRET = os.getenv("LINE_CHANNEL_SECRET")
-PROXY_URL = os.getenv("PROXY_URL")  # HTTP/HTTPS 代理（可選）
+RUN_MODE = os.getenv("RUN_MODE", "parallel").lower()  # parallel / serial
+CHANGE_DETECTION = os.getenv("CHANGE_DETECTION", "1") == "1"  # 只推播有變動的比賽
 SOFASCORE_PROXY = os.getenv("SOFASCORE_PROXY", "https://api.sofascore.app/api/v1")
 MODEL_PATH = os.getenv("MODEL_PATH", "./models/xgb_total.pkl")
+PROFILE_RUN = os.getenv("PROFILE_RUN")  # cprofile / pyinstrument：擷取每一輪（單輪請用 --profile）
+TEAM_INDEX_STRICT = os.getenv("TEAM_INDEX_STRICT", "1") == "1"  # 有別名資料的運動，解析不到的隊名不發請求
 
 if not LINE_CHANNEL_ACCESS_TOKEN or not LINE_CHANNEL_SECRET:
     logging.error("✘ LINE Bot Token / Secret 未設定，程式將無法推播！")
 
-# LINE Bot 初始化
-line_bot_api = LineBotApi(LINE_CHANNEL_ACCESS_TOKEN)
-handler = WebhookHandler(LINE_CHANNEL_SECRET)
+# LINE Bot 初始化：推播走背景佇列（見 modules/line_delivery.py）；webhook 見 main.py
+line_delivery = get_delivery(LINE_CHANNEL_ACCESS_TOKEN)
 
-# requests Session 共用
-session = requests.Session()
-if PROXY_URL:
-    session.proxies.update({"http": PROXY_URL, "https": PROXY_URL})
+# requests Session 共用（連線池 / 壓縮 / 限速 / 斷路器 / PROXY_URL，見 modules/http_client.py）
+session = get_session()
+install_http_metrics(session)
+change_detector = ChangeDetector(session)
 
-session.headers.update(
-    {
-        "User-Agent": (
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
-            "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
-        )
+
+def _cache_gauges() -> Dict[str, float]:
+    team = team_cache.stats()
+    return {
+        "team_cache_hit_ratio": team["hit_ratio"],
+        "team_cache_entries": team["size"],
+        "slate_cache_games": len(slate_cache),
+        "line_messages_sent": line_delivery.sent,
+        "line_messages_failed": line_delivery.failed,
     }
-)
+
+
+metrics.add_collector(_cache_gauges)
 
 # ────────────────────────────────────────────────────────────────
 # 1. 賠率抓取：Oddspedia
 # ────────────────────────────────────────────────────────────────
 
-ODDSPEDIA_BASE = "https://oddspedia.com"
-
 SPORT_ROUTE = {
     "NBA": "basketball/nba",
     "MLB": "baseball/mlb",
     "Soccer": "soccer",
 }
 
+# scraper_sofascore 的運動代碼（近期完賽結果 → 戰績特徵庫）
+SOFASCORE_SPORT = {"NBA": "nba", "MLB": "mlb", "Soccer": "soccer"}
 
-def fetch_odds(route: str) -> pd.DataFrame:
-    """根據路徑爬取最新賠率表，傳回 DataFrame。"""
 
-    url = f"{ODDSPEDIA_BASE}/{route}"
-    logging.info(f"[Odds] GET {url}")
+ODDS_COLUMNS = ["kickoff", "home", "away", "spread", "total"]
 
-    res = session.get(url, timeout=15)
-    res.raise_for_status()
 
-    soup = BeautifulSoup(res.text, "lxml")
-    table = soup.select_one("table[data-testid='odds-table']")
-    if not table:
-        raise RuntimeError("Odds table not found – 可能前端結構更新。")
-
-    rows: List[Dict[str, Any]] = []
-    for tr in table.select("tbody tr"):
-        tds = tr.select("td")
-        try:
-            kickoff = tds[0].get_text(strip=True)
-            home = tds[1].get_text(strip=True)
-            away = tds[2].get_text(strip=True)
-            spread = tds[3].get_text(strip=True).replace("−", "-")
-            total = tds[4].get_text(strip=True)
-            rows.append(
-                {
-                    "kickoff": kickoff,
-                    "home": home,
-                    "away": away,
-                    "spread": spread,
-                    "total": total,
-                }
-            )
-        except IndexError:
-            continue  # 有些列可能是廣告/空白
-    df = pd.DataFrame(rows)
+def matches_to_frame(matches: List[Match]) -> pd.DataFrame:
+    df = pd.DataFrame([m.as_dict() for m in matches], columns=ODDS_COLUMNS)
     if df.empty:
         logging.warning("✘ 沒有擷取到任何賠率資料！")
     return df
 
 
-# ────────────────────────────────────────────────────────────────
-# 2. 傷兵 & 近期戰績：SofaScore/ESPN
-# ────────────────────────────────────────────────────────────────
+def parse_odds_html(html: str) -> pd.DataFrame:
+    """解析 Oddspedia 賠率表 HTML（只解析賠率表子樹，見 modules/html_parse.py）。"""
 
-def fetch_injuries(team_slug: str) -> List[Dict[str, Any]]:
-    """SofaScore injuries 端點。"""
+    return matches_to_frame(oddspedia_table.parse(html, ""))
 
-    url = f"{SOFASCORE_PROXY}/teams/{team_slug}/injuries"
-    try:
-        data = session.get(url, timeout=10).json()
-        return data.get("playerInjuries", [])
-    except Exception as exc:
-        logging.debug(f"Injury fetch failed: {exc}")
-        return []
 
+def fetch_odds(route: str) -> pd.DataFrame:
+    """根據路徑爬取最新賠率表，傳回 DataFrame。"""
 
-def fetch_team_form(team_id: int, limit: int = 5) -> Dict[str, int]:
-    """取得近期戰績 (近 `limit` 場勝敗)。"""
+    url = f"{ODDSPEDIA_BASE}/{route}"
+    logging.info(f"[Odds] GET {url}")
+    return matches_to_frame(oddspedia_table.fetch_url(url))
 
-    url = f"{SOFASCORE_PROXY}/team/{team_id}/events/last/{limit}"
-    try:
-        events = session.get(url, timeout=10).json().get("events", [])
-        wins = sum(1 for e in events if e.get("winnerCode") == 1)
-        return {"games": len(events), "wins": wins}
-    except Exception as exc:
-        logging.debug(f"Form fetch failed: {exc}")
-        return {"games": 0, "wins": 0}
+
+def fetch_odds_if_changed(route: str) -> Tuple[Optional[pd.DataFrame], FetchResult]:
+    """條件式抓取：頁面 / 賠率表未變動時回傳 (None, result)。
+
+    處理完成後需呼叫 `change_detector.commit(result)`，下一輪才會視為已處理。
+    """
+
+    url = f"{ODDSPEDIA_BASE}/{route}"
+    logging.info(f"[Odds] GET {url}（條件式）")
+    result = change_detector.fetch(url, ODDS_TABLE_MARKER)
+    if not result.changed:
+        return None, result
+    return parse_odds_html(result.text), result
+
+
+def attach_line_history(tag: str, df: pd.DataFrame) -> pd.DataFrame:
+    """寫入本次快照，並補上初盤（open_spread / open_total）與盤口變動說明。"""
+
+    if odds_store is None or df.empty:
+        return df
+
+    keys = match_key(df)  # 寫入與查詢用同一組 key（"HH:MM" 的開賽日期依當下時間推定）
+    odds_store.append(tag, df, keys=keys)
+    hist = odds_store.opening_and_latest(tag, keys.unique())
+    opening = hist.set_index("match_key")[["open_spread", "open_total"]]
+    opening = opening[~opening.index.duplicated()]
+
+    df = df.copy()
+    df["open_spread"] = keys.map(opening["open_spread"]).to_numpy()
+    df["open_total"] = keys.map(opening["open_total"]).to_numpy()
+    df["shift_note"] = analyze_odds_shift_frame(
+        pd.DataFrame(
+            {"open_odds": df["open_spread"], "current_odds": parse_line(df["spread"])},
+            index=df.index,
+        ).astype(float)
+    )
+    return df
 
 
 # ────────────────────────────────────────────────────────────────
-# 3. XGBoost 進階預測
+# 2. 傷兵 & 近期戰績：SofaScore/ESPN
 # ────────────────────────────────────────────────────────────────
 
-try:
-    xgb_model = joblib.load(MODEL_PATH)
-    logging.info(f"✓ XGBoost 模型載入成功：{MODEL_PATH}")
-except Exception as exc:
-    logging.error(f"XGBoost 模型載入失敗：{exc}")
-    xgb_model = None
+def _get_json(url: str) -> Dict[str, Any]:
+    res = session.get(url, timeout=10)
+    res.raise_for_status()
+    return res.json()
 
 
-def build_features(row: pd.Series) -> np.ndarray:
-    """將比賽行轉為特徵向量。"""
+def fetch_injuries(team: str, sport: Optional[str] = None) -> List[Dict[str, Any]]:
+    """SofaScore injuries 端點（經 team_cache 快取，失敗亦短暫快取）。
 
-    feats = []
-    # Spread & Total 轉 float
-    try:
-        feats.append(float(row["spread"].replace("+", "")))
-    except ValueError:
-        feats.append(0.0)
+    顯示名稱先經 modules/team_index.py 解析成標準球隊，以其 SofaScore 代號查詢；
+    同一隊的不同寫法（"LA Lakers" / "Los Angeles Lakers" / 「湖人」）共用同一筆快取。
+    """
 
-    try:
-        feats.append(float(row["total"]))
-    except ValueError:
-        feats.append(0.0)
+    resolved = team_index.resolve(team, sport)
+    if resolved is not None:
+        team_slug = resolved.sofascore_key
+    elif TEAM_INDEX_STRICT and team_index.covers(sport):
+        metrics.inc("team_unresolved_total", help="無法解析而略過請求的隊名", sport=sport)
+        logging.debug(f"[Injury] {sport} 無法解析隊名 {team!r}，略過")
+        return []
+    else:
+        team_slug = slugify(team)
+
+    def _load() -> List[Dict[str, Any]]:
+        url = f"{SOFASCORE_PROXY}/teams/{team_slug}/injuries"
+        return _get_json(url).get("playerInjuries", [])
+
+    return team_cache.get_or_fetch("injuries", team_slug, _load, [])
 
-    # 傷兵數
-    feats.append(len(row.get("inj_home", [])))
-    feats.append(len(row.get("inj_away", [])))
 
-    # 近期戰績（近五場勝場數）
-    feats.append(row.get("home_wins", 0))
-    feats.append(row.get("away_wins", 0))
+# ────────────────────────────────────────────────────────────────
+# 3. XGBoost 進階預測
+# ────────────────────────────────────────────────────────────────
 
-    return np.array(feats, dtype=float)
+# 延遲載入：第一次預測時才讀檔，之後檔案更新會自動熱替換（見 model/predictor.py）
+registry.register("total", MODEL_PATH)
 
 
-def predict_total(df: pd.DataFrame) -> pd.DataFrame:
-    """用 XGBoost 預測總分後，回填至 DataFrame。"""
+def predict_total(df: pd.DataFrame, feats: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """用 XGBoost 預測總分後，回填至 DataFrame。
 
-    if xgb_model is None or df.empty:
+    `feats` 為 `MatchSlate.features()` / `build_feature_matrix(df)` 的結果；未提供時才自行建構。
+    """
+
+    if df.empty:
+        return df
+    model = registry.get("total")
+    if model is None:
         return df
-    feats = np.vstack(df.apply(build_features, axis=1))
-    df["pred_total"] = xgb_model.predict(feats)
+    if feats is None:
+        feats = build_feature_matrix(df)
+    t0 = time.perf_counter()
+    df["pred_total"] = model.predict(feats)
+    metrics.observe("model_inference_seconds", time.perf_counter() - t0, "模型推論耗時", model="total")
     return df
 
 
@@ -209,16 +244,30 @@ def predict_total(df: pd.DataFrame) -> pd.DataFrame:
 # 4. 異常盤偵測
 # ────────────────────────────────────────────────────────────────
 
-def detect_anomaly(df: pd.DataFrame) -> pd.DataFrame:
-    """簡易：Spread 絕對值 > 15 或 Total > 240 視為異常。"""
-
-    def _is_abnormal(r: pd.Series) -> bool:
-        try:
-            return abs(float(r["spread"])) > 15 or float(r["total"]) > 240
-        except ValueError:
-            return False
+def detect_anomaly(
+    df: pd.DataFrame, feats: Optional[np.ndarray] = None, tag: str = ""
+) -> pd.DataFrame:
+    """以各運動 / 聯盟的 rolling z-score 與 MAD 門檻判斷異常（見 analysis/abnormal_spread.py）。"""
+
+    if feats is None:
+        feats = build_feature_matrix(df)
+
+    # 無法解析的盤口在特徵矩陣內是 0.0：spread / total 各自依原始字串能否解析遮成 NaN，
+    # 不判斷也不併入歷史（否則 spread 的 rolling 視窗會被 0 拉低）
+    valid_total = feats[:, TOTAL] > 0
+    valid_spread = (
+        parse_line(df["spread"]).notna().to_numpy() if "spread" in df else np.zeros(len(df), dtype=bool)
+    )
+    spread = np.where(valid_spread, feats[:, SPREAD], np.nan)
+    observed = {
+        "spread": spread,
+        "total": np.where(valid_total, feats[:, TOTAL], np.nan),
+    }
+    if "open_spread" in df:
+        observed["move"] = spread - df["open_spread"].to_numpy(dtype=float)
 
-    df["anomaly"] = df.apply(_is_abnormal, axis=1)
+    flags, _ = anomaly_engine.detect(tag, observed, df["league"] if "league" in df else None)
+    df["anomaly"] = flags
     return df
 
 
@@ -226,65 +275,160 @@ def detect_anomaly(df: pd.DataFrame) -> pd.DataFrame:
 # 5. LINE 推播
 # ────────────────────────────────────────────────────────────────
 
-def fmt_push_msg(tag: str, df: pd.DataFrame) -> str:
+def fmt_push_msg(tag: str, df: pd.DataFrame | List[Dict[str, Any]]) -> str:
+    """`df` 可為 DataFrame 或 records（slate_cache 的查詢結果）。"""
+
     lines = [f"📊 {tag} 推薦"]
-    for _, r in df.iterrows():
+    for r in df.to_dict("records") if isinstance(df, pd.DataFrame) else df:
         advise = "大" if r.get("pred_total", 0) > float(r["total"]) else "小"
         mark = "⚠️" if r["anomaly"] else ""
+        note = r.get("shift_note")
+        if isinstance(note, str) and not note.startswith("✅"):
+            mark = f"{mark} {note}".strip()
         lines.append(
             f"{r['kickoff']} {r['home']} vs {r['away']} O/U {r['total']} → 建議 {advise} {mark}"
         )
     return "\n".join(lines)
 
 
-def push_line(msg: str):
-    if not LINE_CHANNEL_ACCESS_TOKEN:
-        logging.error("LINE Token 未設置，跳過推播。")
-        return
+def push_line(msg: str, on_sent: Optional[Callable[[bool], None]] = None):
+    """排入背景佇列後立即返回；合併、切分、重試由 line_delivery 處理，送達後回呼 `on_sent(ok)`。"""
 
-    try:
-        line_bot_api.broadcast(TextSendMessage(text=msg))
-        logging.info("✓ LINE 推播完成")
-    except Exception as exc:
-        logging.error(f"LINE 推播失敗：{exc}")
+    line_delivery.enqueue(msg, on_sent=on_sent)
 
 
 # ────────────────────────────────────────────────────────────────
 # 6. Pipeline 主流程
 # ────────────────────────────────────────────────────────────────
 
-def process_sport(tag: str, route: str):
-    df = fetch_odds(route)
+def refresh_team_form(tag: str) -> None:
+    """把 SofaScore 代理上的最新完賽結果併入戰績特徵庫。"""
+
+    feature_store.ensure_loaded()
+    sport = SOFASCORE_SPORT.get(tag)
+    if sport:
+        added = feature_store.ingest_results(get_games_from_sofascore(sport))
+        if added:
+            logging.info(f"[Form] {tag} 新增 {added} 場完賽結果")
+
+
+def process_sport(tag: str, route: str) -> int:
+    """單一運動的完整流程，回傳推播的比賽場數。"""
+
+    with metrics.timer("form_refresh", tag):
+        refresh_team_form(tag)
+    if not CHANGE_DETECTION:
+        with metrics.timer("fetch_odds", tag):
+            df = fetch_odds(route)
+        metrics.rows("fetched", len(df), tag)
+        kickoff_board.update(tag, df)  # 輪詢頻率依開賽時間調整（modules/scheduler.py）
+        return _process_odds(tag, df)
+
+    with metrics.timer("fetch_odds", tag):
+        df, fetched = fetch_odds_if_changed(route)
+    if df is None:
+        logging.info(f"{tag} 盤口無變動，略過本輪")
+        return 0
+    metrics.rows("fetched", len(df), tag)
+    kickoff_board.update(tag, df)
+
+    df, row_hashes = change_detector.changed_rows(tag, df, match_key(df)) if not df.empty else (df, {})
+
+    # 頁面 / 逐列雜湊在 LINE 確定送達後才寫入：送失敗時下一輪會再次視為變動並重推
+    # （推播在背景佇列，下一輪若在回呼前開始，同一變動可能推兩次；寧可重複也不遺漏）
+    def _commit(ok: bool = True) -> None:
+        if not ok:
+            logging.warning(f"{tag} 推播失敗，變動保留到下一輪")
+            return
+        change_detector.commit(fetched)
+        change_detector.commit_rows(tag, row_hashes)
+
+    pushed = _process_odds(tag, df, on_sent=_commit)
+    if not pushed:
+        _commit()  # 沒有要推播的列，直接記錄本輪狀態
+    return pushed
+
+
+def _process_odds(tag: str, df: pd.DataFrame, on_sent: Optional[Callable[[bool], None]] = None) -> int:
     if df.empty:
-        return
-
-    # 補入傷兵 & 戰績
-    enriched_rows = []
-    for _, row in df.iterrows():
-        row = row.copy()
-        row["inj_home"] = fetch_injuries(row["home"])
-        row["inj_away"] = fetch_injuries(row["away"])
-        # 這裡需要 team_id：可先以自建對照表或 SofaScore search API 取 id
-        row["home_wins"] = 0  # TODO：替換為真實資料
-        row["away_wins"] = 0  # TODO：替換為真實資料
-        enriched_rows.append(row)
-
-    df = pd.DataFrame(enriched_rows)
-    df = predict_total(df)
-    df = detect_anomaly(df)
-
-    push_line(fmt_push_msg(tag, df))
-
-
-def run_once():
-    """執行一次完整流程（可由排程器每小時呼叫）。"""
+        return 0
+    with metrics.timer("line_history", tag):
+        df = attach_line_history(tag, df)
+
+    # 球隊 / 傷兵 / 戰績以精簡陣列保存（見 modules/match_slate.py），df 只留盤口供推播顯示
+    # 補入傷兵：不重複球隊並行抓取，只存人數與球員 ID（見 modules/enrichment.py）
+    with metrics.timer("enrich", tag):
+        slate = enrich_slate(MatchSlate.from_frame(df, tag), lambda team: fetch_injuries(team, tag))
+    # 近期戰績：本地特徵庫字典查詢，不需 HTTP（見 modules/feature_store.py）
+    with metrics.timer("features", tag):
+        slate.set_wins(feature_store.wins)
+        feats = slate.features()
+    with metrics.timer("predict_total", tag):
+        df = predict_total(df, feats)
+    with metrics.timer("detect_anomaly", tag):
+        df = detect_anomaly(df, feats, tag)
+    slate_cache.update(tag, df)  # 供 /查詢 直接回覆
+
+    with metrics.timer("push_line", tag):
+        push_line(fmt_push_msg(tag, df), on_sent)
+    metrics.rows("pushed", len(df), tag)
+    return len(df)
+
+
+def init() -> None:
+    """預先載入模型與特徵庫（常駐服務在第一輪之前呼叫；單次執行時由第一輪載入）。"""
+
+    registry.get("total")
+    feature_store.ensure_loaded()
+
+
+def run_once(
+    profile: Optional[str] = PROFILE_RUN, sports: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """執行一次完整流程（常駐排程見 modules/scheduler.py），回傳各運動狀態與耗時。
+
+    `sports` 指定只跑部分運動（預設為 SPORT_ROUTE 全部）。
+    RUN_MODE=parallel（預設）時各運動並行、各自期限與重試；
+    RUN_MODE=serial 時沿用逐一執行。`profile`（cprofile / pyinstrument）
+    會擷取這一輪，並改以 serial 執行（profiler 只看得到呼叫端 thread）。
+    各階段耗時 / HTTP / 快取摘要見 `metrics.last_run`。
+    """
+
+    routes = {tag: SPORT_ROUTE[tag] for tag in (sports or SPORT_ROUTE)}
+    with profile_run(profile), metrics.run(routes) as summary:
+        report = _run_sports(routes, serial=RUN_MODE == "serial" or bool(profile))
+        summary["report"] = report
+    logging.info(f"[Metrics] {json.dumps(summary, ensure_ascii=False, default=str)}")
+    return report
+
+
+def _run_sports(routes: Dict[str, str], serial: bool) -> Dict[str, Dict[str, Any]]:
+    started = datetime.now()
+    if serial:
+        report: Dict[str, Dict[str, Any]] = {}
+        for tag, route in routes.items():
+            t0 = datetime.now()
+            try:
+                rows = process_sport(tag, route)
+                report[tag] = {"status": "ok", "result": rows}
+            except Exception as exc:
+                logging.error(f"{tag} 流程錯誤：{exc}")
+                report[tag] = {"status": "error", "error": str(exc)}
+            report[tag]["elapsed"] = (datetime.now() - t0).total_seconds()
+    else:
+        report = run_parallel(
+            {tag: (lambda t=tag, r=route: process_sport(t, r)) for tag, route in routes.items()}
+        )
 
-    for tag, route in SPORT_ROUTE.items():
-        try:
-            process_sport(tag, route)
-        except Exception as exc:
-            logging.error(f"{tag} 流程錯誤：{exc}")
+    logging.info(
+        f"本輪完成，總耗時 {(datetime.now() - started).total_seconds():.2f}s："
+        + json.dumps({k: round(v["elapsed"], 2) for k, v in report.items()}, ensure_ascii=False)
+    )
+    return report
 
 
 if __name__ == "__main__":
-    run_once()
+    parser = argparse.ArgumentParser(description="執行一輪賠率推播流程")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], default=PROFILE_RUN)
+    run_once(profile=parser.parse_args().profile)
+    line_delivery.flush(timeout=120)
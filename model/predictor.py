@@ -1 +1,202 @@
+# model/predictor.py
+"""
+模型註冊中心（Model Registry）。
 
+各處原本各自 `joblib.load(...)`（且在 import 時就載入），這裡統一管理：
+
+✔ 延遲載入：第一次 `get()` 才讀檔，import 本模組不會載入 xgboost / joblib
+✔ 優先使用 XGBoost 原生格式（.ubj / .json），同名 .pkl 僅作為相容備援
+✔ 監看檔案 mtime，檔案更新後自動熱替換，不需重啟程式
+✔ 重新訓練在背景 thread 執行並寫出新檔，推播流程不會被阻塞
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+MODEL_DIR = os.getenv("MODEL_DIR", "./models")
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))  # 秒
+
+NATIVE_EXTS = (".ubj", ".json")
+
+
+def resolve_model_path(path: str) -> str:
+    """同名原生格式檔存在時優先使用（models/x.pkl → models/x.ubj）。"""
+
+    stem, ext = os.path.splitext(path)
+    if ext in NATIVE_EXTS:
+        return path
+    for native in NATIVE_EXTS:
+        if os.path.exists(stem + native):
+            return stem + native
+    return path
+
+
+@dataclass
+class ModelHandle:
+    """已載入的模型與其版本資訊；對 Booster 與 sklearn 介面提供一致的預測方法。"""
+
+    name: str
+    path: str
+    mtime: float
+    model: Any
+    native: bool
+    is_classifier: bool
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """二元分類的正類機率（長度 n 的一維陣列）。
+
+        pickled 的 XGBClassifier 也改走底層 Booster 的 `inplace_predict`，
+        省去 sklearn 包裝每次建構 DMatrix 的成本。
+        """
+
+        if self.native:
+            return np.asarray(self.model.inplace_predict(X))
+        if hasattr(self.model, "get_booster"):
+            return np.asarray(self.model.get_booster().inplace_predict(X))
+        return np.asarray(self.model.predict_proba(X))[:, 1]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """分類模型回傳 0/1 標籤，回歸模型回傳數值。"""
+
+        if self.native:
+            out = np.asarray(self.model.inplace_predict(X))
+            return (out > 0.5).astype(np.int8) if self.is_classifier else out
+        return np.asarray(self.model.predict(X))
+
+
+def _load_native(path: str) -> Any:
+    # XGBoost 沒有 mmap 載入 API；原生 UBJSON 直接由 C++ 讀檔，
+    # 不經過 pickle 反序列化，也不需要 import sklearn 包裝類別。
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return booster
+
+
+def _is_binary(booster: Any) -> bool:
+    try:
+        objective = json.loads(booster.save_config())["learner"]["objective"]["name"]
+        return objective.startswith("binary:")
+    except Exception:
+        return False
+
+
+def _load(name: str, path: str) -> ModelHandle:
+    mtime = os.path.getmtime(path)
+    if path.endswith(NATIVE_EXTS):
+        model = _load_native(path)
+        return ModelHandle(name, path, mtime, model, True, _is_binary(model))
+
+    import joblib
+
+    model = joblib.load(path)
+    return ModelHandle(name, path, mtime, model, False, hasattr(model, "predict_proba"))
+
+
+def predict_batch(
+    handles: Mapping[str, ModelHandle],
+    X: np.ndarray,
+    threshold: float = 0.5,
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """整個賽程一次預測多個二元目標，回傳 {target: (labels, probs)}。
+
+    特徵矩陣只建一次並轉為 C-contiguous float32，所有目標共用；
+    標籤由機率門檻推得，不必再呼叫一次 `predict`。
+    """
+
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    out: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    for target, handle in handles.items():
+        probs = handle.predict_proba(X)
+        out[target] = ((probs > threshold).astype(np.int8), probs)
+    return out
+
+
+class ModelRegistry:
+    """以名稱登記模型路徑，延遲載入並依 mtime 熱替換。"""
+
+    def __init__(self, reload_interval: float = MODEL_RELOAD_INTERVAL):
+        self.reload_interval = reload_interval
+        self._paths: Dict[str, str] = {}
+        self._handles: Dict[str, ModelHandle] = {}
+        self._checked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._training: Optional[threading.Thread] = None
+
+    def register(self, name: str, path: str) -> None:
+        with self._lock:
+            self._paths[name] = path
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Optional[ModelHandle]:
+        """取得模型；第一次呼叫時載入，之後每 `reload_interval` 秒檢查一次檔案是否更新。"""
+
+        if name not in self._paths:
+            raise KeyError(f"模型未登記：{name}")
+
+        handle = self._handles.get(name)
+        now = time.monotonic()
+        if handle is not None and now - self._checked.get(name, 0) < self.reload_interval:
+            return handle
+
+        with self._load_locks[name]:
+            handle = self._handles.get(name)
+            self._checked[name] = now
+            path = resolve_model_path(self._paths[name])
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                if handle is None:
+                    logging.error(f"模型檔不存在：{path}")
+                return handle
+
+            if handle is not None and handle.path == path and handle.mtime == mtime:
+                return handle
+
+            try:
+                new = _load(name, path)
+            except Exception as exc:
+                logging.error(f"模型 {name} 載入失敗：{exc}")
+                return handle
+
+            self._handles[name] = new
+            verb = "熱替換" if handle is not None else "載入"
+            logging.info(f"✓ 模型 {name} {verb}成功：{path}")
+            return new
+
+    def predict(self, name: str, X: np.ndarray) -> Optional[np.ndarray]:
+        handle = self.get(name)
+        return None if handle is None else handle.predict(X)
+
+    def retrain_async(self, train_fn: Callable[[], Any]) -> bool:
+        """在背景 thread 執行重新訓練；新檔寫出後由 mtime 檢查自動熱替換。
+
+        已有訓練進行中時回傳 False，不重複啟動。
+        """
+
+        if self._training is not None and self._training.is_alive():
+            return False
+
+        def _run() -> None:
+            try:
+                train_fn()
+            except Exception as exc:
+                logging.error(f"背景重新訓練失敗：{exc}")
+
+        self._training = threading.Thread(target=_run, name="retrain", daemon=True)
+        self._training.start()
+        return True
+
+
+registry = ModelRegistry()
@@ -0,0 +1,119 @@
+# modules/change_detector.py
+"""
+盤口頁面變動偵測。
+
+安靜時段盤口幾乎不動，卻每小時都重新下載、解析、預測並推播整張表。這裡在共用
+`requests.Session` 上加一層：
+
+✔ 條件式請求：記住 ETag / Last-Modified，下次帶 If-None-Match / If-Modified-Since，
+  304 時直接略過
+✔ 內容雜湊：只對賠率表那一段原始 HTML 做 blake2b，雜湊相同就不解析
+✔ 逐列雜湊：表有變動時只保留真正變動的比賽，避免重複推播
+
+狀態在 `commit*()` 之後才更新——流程中途失敗時，下一輪會重新處理，不會漏推。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import requests
+
+from modules.html_parse import extract_fragment
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def digest(data: str) -> str:
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class FetchResult:
+    url: str
+    text: Optional[str]  # None 表示未變動（304 或雜湊相同）
+    digest: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def changed(self) -> bool:
+        return self.text is not None
+
+
+class ChangeDetector:
+    def __init__(self, session: requests.Session):
+        self.session = session
+        self._lock = threading.Lock()
+        self._validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._digests: Dict[str, str] = {}
+        self._rows: Dict[str, Dict[str, str]] = {}
+
+    # ── 頁面層級 ─────────────────────────────────────────────────
+
+    def fetch(self, url: str, marker: str, timeout: float = 15) -> FetchResult:
+        """條件式 GET；回傳的 `text` 為 None 表示頁面 / 賠率表沒有變動。"""
+
+        headers = {}
+        with self._lock:
+            etag, last_modified = self._validators.get(url, (None, None))
+            previous = self._digests.get(url)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        res = self.session.get(url, timeout=timeout, headers=headers)
+        if res.status_code == 304:
+            logging.info(f"[Change] {url} 304 Not Modified")
+            return FetchResult(url, None)
+        res.raise_for_status()
+
+        h = digest(extract_fragment(res.text, marker))
+        result = FetchResult(
+            url,
+            res.text,
+            h,
+            res.headers.get("ETag"),
+            res.headers.get("Last-Modified"),
+        )
+        if h == previous:
+            logging.info(f"[Change] {url} 賠率表雜湊未變，略過解析")
+            result.text = None
+            self.commit(result)  # 刷新 validators
+        return result
+
+    def commit(self, result: FetchResult) -> None:
+        with self._lock:
+            if result.digest:
+                self._digests[result.url] = result.digest
+            if result.etag or result.last_modified:
+                self._validators[result.url] = (result.etag, result.last_modified)
+
+    # ── 逐列層級 ─────────────────────────────────────────────────
+
+    def changed_rows(
+        self, tag: str, df: pd.DataFrame, keys: pd.Series, cols=("kickoff", "spread", "total")
+    ) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """回傳 (變動列, 本次全部列的雜湊)。
+
+        後者待 LINE 確定送達（`LineDelivery.enqueue` 的 on_sent 回呼）後才交給 `commit_rows`。
+        """
+
+        content = df[list(cols)].astype(str).agg("|".join, axis=1)
+        row_hashes = [digest(c) for c in content]
+        with self._lock:
+            seen = self._rows.get(tag, {})
+        mask = [seen.get(k) != h for k, h in zip(keys, row_hashes)]
+        return df[mask], dict(zip(keys, row_hashes))
+
+    def commit_rows(self, tag: str, hashes: Dict[str, str]) -> None:
+        """以本次全部列取代舊狀態（已開賽 / 下架的比賽自然移除）。"""
+
+        with self._lock:
+            self._rows[tag] = hashes
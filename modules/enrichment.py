@@ -0,0 +1,79 @@
+# modules/enrichment.py
+"""
+並行補資料（傷兵）。
+
+原本 `process_sport` 逐列呼叫 `fetch_injuries`，每場比賽兩次阻塞式 HTTP；
+這裡改為先取出整張賽程的「不重複球隊」，再用有上限的 thread pool
+共用同一個 `requests.Session` 並行抓取，最後一次回填。
+
+✔ 可設定並行數（ENRICH_WORKERS，與共用 Session 的連線池大小相同）
+✔ 每個 host 的請求速率限制由共用 Session 負責（modules/http_client.py）
+✔ 每個運動的總期限（ENRICH_DEADLINE，秒），逾時的球隊以預設值補上
+✔ `enrich_slate`：直接寫入 MatchSlate 的傷兵人數 / 球員 ID（modules/match_slate.py），
+  不在 DataFrame 內保留傷兵 dict 列表
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List
+
+from modules.http_client import ENRICH_WORKERS
+
+if TYPE_CHECKING:
+    from modules.match_slate import MatchSlate
+
+ENRICH_DEADLINE = float(os.getenv("ENRICH_DEADLINE", "60"))
+
+
+# ────────────────────────────────────────────────────────────────
+# 不重複球隊並行抓取
+# ────────────────────────────────────────────────────────────────
+
+def fetch_all(
+    keys: List[Hashable],
+    fetch: Callable[[Any], Any],
+    default: Any,
+    max_workers: int = ENRICH_WORKERS,
+    deadline: float = ENRICH_DEADLINE,
+) -> Dict[Hashable, Any]:
+    """對每個 key 並行呼叫 `fetch`，超過 `deadline` 秒未完成者回傳 `default`。"""
+
+    results: Dict[Hashable, Any] = {k: default for k in keys}
+    if not keys:
+        return results
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="enrich")
+    futures = {pool.submit(fetch, k): k for k in keys}
+    done, pending = wait(futures, timeout=deadline)
+    for fut in done:
+        try:
+            results[futures[fut]] = fut.result()
+        except Exception as exc:
+            logging.debug(f"Enrich fetch failed ({futures[fut]}): {exc}")
+    if pending:
+        logging.warning(f"[Enrich] {len(pending)}/{len(keys)} 筆超過期限 {deadline:.0f}s，以預設值補上")
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def enrich_slate(
+    slate: MatchSlate,
+    fetch_injuries: Callable[[str], List[Dict[str, Any]]],
+    max_workers: int = ENRICH_WORKERS,
+    deadline: float = ENRICH_DEADLINE,
+) -> MatchSlate:
+    """並行抓取 `slate` 內每支不重複球隊的傷兵，只以人數 + 球員 ID 存入 `slate`。"""
+
+    if not len(slate):
+        return slate
+    started = time.monotonic()
+    teams = slate.team_names()
+    slate.set_injuries(fetch_all(teams, fetch_injuries, [], max_workers, deadline))
+    logging.info(
+        f"[Enrich] {len(slate)} 場 / {len(teams)} 隊，耗時 {time.monotonic() - started:.2f}s"
+    )
+    return slate
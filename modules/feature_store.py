@@ -0,0 +1,204 @@
+# modules/feature_store.py
+"""
+球隊近期戰績特徵庫（記憶體內、增量更新）。
+
+`process_sport` 原本把 home_wins / away_wins 寫死為 0，逐隊查 SofaScore 近期戰績則每隊一次
+HTTP。這裡以歷史 CSV（data/<sport>/<sport>_history_*.csv）建立初始狀態，之後把
+`scraper_sofascore.get_games_from_sofascore` 的新完賽結果逐場併入：
+
+✔ 每場比賽 O(1) 更新（固定長度 deque + 累計值，淘汰最舊一場時扣回）
+✔ 近 N 場勝場、得分 / 失分、休息天數、主場 / 客場分開統計
+✔ 推播時查詢只是字典查找，不需要網路
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import threading
+from collections import deque
+from datetime import date
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from modules.team_index import team_index
+
+FORM_WINDOW = int(os.getenv("FORM_WINDOW", "5"))
+HISTORY_GLOB = os.getenv("HISTORY_GLOB", "data/*/*_history_*.csv")
+FORM_TZ = os.getenv("FORM_TZ", "America/New_York")  # 完賽結果的「比賽日期」以此時區計算（同美國聯盟賽程）
+
+# (勝=1/負=0, 得分, 失分)
+Result = Tuple[int, int, int]
+
+
+def team_key(name: str) -> str:
+    """別名表內的球隊以標準 ID 為 key（歷史 CSV 的 "Lakers" 與盤口的 "Los Angeles Lakers" 合併）。"""
+
+    team = team_index.lookup(name)
+    return team.id if team is not None else str(name).strip().casefold()
+
+
+class _Rolling:
+    """近 N 場的結果與累計值；新增一場為 O(1)。"""
+
+    __slots__ = ("games", "wins", "pts_for", "pts_against")
+
+    def __init__(self, n: int):
+        self.games: Deque[Result] = deque(maxlen=n)
+        self.wins = self.pts_for = self.pts_against = 0
+
+    def push(self, result: Result) -> None:
+        if len(self.games) == self.games.maxlen:
+            old_win, old_for, old_against = self.games[0]
+            self.wins -= old_win
+            self.pts_for -= old_for
+            self.pts_against -= old_against
+        self.games.append(result)
+        self.wins += result[0]
+        self.pts_for += result[1]
+        self.pts_against += result[2]
+
+
+class TeamState:
+    __slots__ = ("all", "home", "away", "last_date")
+
+    def __init__(self, n: int):
+        self.all = _Rolling(n)
+        self.home = _Rolling(n)
+        self.away = _Rolling(n)
+        self.last_date: Optional[date] = None
+
+
+class TeamFeatureStore:
+    def __init__(self, window: int = FORM_WINDOW):
+        self.window = window
+        self._teams: Dict[str, TeamState] = {}
+        self._seen: set = set()  # (日期, 主, 客)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+
+    # ── 寫入 ─────────────────────────────────────────────────────
+
+    def _state(self, team: str) -> TeamState:
+        state = self._teams.get(team)
+        if state is None:
+            state = self._teams[team] = TeamState(self.window)
+        return state
+
+    def _add(self, day: Optional[date], home: str, away: str, hs: int, as_: int) -> None:
+        home_won = int(hs > as_)
+        away_won = int(as_ > hs)
+        h, a = self._state(home), self._state(away)
+        h.all.push((home_won, hs, as_))
+        h.home.push((home_won, hs, as_))
+        a.all.push((away_won, as_, hs))
+        a.away.push((away_won, as_, hs))
+        if day is not None:
+            h.last_date = max(h.last_date or day, day)
+            a.last_date = max(a.last_date or day, day)
+
+    def add_game(self, day: Any, home: str, away: str, home_score: int, away_score: int) -> bool:
+        """併入一場完賽結果（需依時間順序）；同日同對戰重複時略過，回傳是否有併入。"""
+
+        day = pd.Timestamp(day).date() if day is not None else None
+        home, away = team_key(home), team_key(away)
+        key = (day, home, away)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            self._add(day, home, away, int(home_score), int(away_score))
+        return True
+
+    def ingest_results(self, games: Iterable[Dict[str, Any]]) -> int:
+        """併入 `get_games_from_sofascore` 格式的結果，回傳新併入的場數。
+
+        ✔ 只收 `status == "finished"` 的比賽：進行中的比分（例如 54:50）不是結果，
+          完賽後的最終比分也才不會被當成另一場再算一次
+        ✔ 以開賽時間換算成 FORM_TZ 的比賽日期（休息天數特徵依此計算），沒有時間的略過
+        ✔ 代理每小時都會重複回傳最近幾場，以 (日期, 主, 客) 去重（與歷史 CSV 共用）
+        """
+
+        finished = []
+        for g in games:
+            if g.get("status") != "finished" or not g.get("date"):
+                continue
+            ts = pd.Timestamp(g["date"])
+            ts = ts.tz_convert(FORM_TZ) if ts.tzinfo is not None else ts
+            finished.append((ts.date(), g))
+        finished.sort(key=lambda item: item[0])  # 依時間順序併入
+
+        added = 0
+        for day, g in finished:
+            added += self.add_game(day, g["home_team"], g["away_team"], g["home_score"], g["away_score"])
+        return added
+
+    def load_history(self, pattern: str = HISTORY_GLOB, chunksize: int = 100_000) -> int:
+        """由歷史 CSV 建立初始狀態（依日期排序後逐場併入）。"""
+
+        frames = []
+        for path in sorted(glob.glob(pattern)):
+            for chunk in pd.read_csv(
+                path,
+                usecols=["home_team", "away_team", "home_score", "away_score", "date"],
+                dtype={"home_team": "string", "away_team": "string"},
+                chunksize=chunksize,
+            ):
+                frames.append(chunk)
+        if not frames:
+            return 0
+
+        df = pd.concat(frames, ignore_index=True)
+        df["date"] = pd.to_datetime(df["date"]).dt.date
+        df = df.sort_values("date", kind="stable")
+        added = 0
+        cols = ["date", "home_team", "away_team", "home_score", "away_score"]
+        for d, h, a, hs, as_ in df[cols].itertuples(index=False):
+            added += self.add_game(d, h, a, hs, as_)
+        logging.info(f"✓ 戰績特徵庫載入 {added} 場、{len(self._teams)} 隊")
+        return added
+
+    def ensure_loaded(self) -> None:
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                self.load_history()
+            except Exception as exc:
+                logging.error(f"戰績特徵庫載入失敗：{exc}")
+
+    # ── 查詢 ─────────────────────────────────────────────────────
+
+    def features(self, team: str, on: Optional[date] = None) -> Dict[str, Any]:
+        """近 N 場特徵；未知球隊回傳全 0（rest_days 為 None）。"""
+
+        state = self._teams.get(team_key(team))
+        if state is None:
+            return {
+                "games": 0, "wins": 0, "pts_for": 0.0, "pts_against": 0.0, "rest_days": None,
+                "home_games": 0, "home_wins": 0, "away_games": 0, "away_wins": 0,
+            }
+        games = len(state.all.games)
+        on = on or date.today()
+        return {
+            "games": games,
+            "wins": state.all.wins,
+            "pts_for": state.all.pts_for / games if games else 0.0,
+            "pts_against": state.all.pts_against / games if games else 0.0,
+            "rest_days": (on - state.last_date).days if state.last_date else None,
+            "home_games": len(state.home.games),
+            "home_wins": state.home.wins,
+            "away_games": len(state.away.games),
+            "away_wins": state.away.wins,
+        }
+
+    def wins(self, team: str) -> int:
+        state = self._teams.get(team_key(team))
+        return state.all.wins if state else 0
+
+
+feature_store = TeamFeatureStore()
@@ -0,0 +1,65 @@
+# modules/features.py
+"""
+欄位式（columnar）特徵建構。
+
+取代逐列 `df.apply(build_features, axis=1)`：整張盤口表一次以向量化字串操作
+與 `pd.to_numeric` 解析 spread / total，傷兵數以 `.str.len()` 取得，
+輸出 C-contiguous 的 float32 矩陣，讓預測與異常偵測共用同一份特徵。
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+FEATURE_COLUMNS: List[str] = [
+    "spread",
+    "total",
+    "inj_home",
+    "inj_away",
+    "home_wins",
+    "away_wins",
+]
+SPREAD, TOTAL, INJ_HOME, INJ_AWAY, HOME_WINS, AWAY_WINS = range(len(FEATURE_COLUMNS))
+
+
+def parse_line(s: pd.Series) -> pd.Series:
+    """盤口字串 → float（"−3.5" / "+3.5" / "215" …），無法解析者為 NaN。"""
+
+    s = s.astype("string").str.strip()
+    s = s.str.replace("−", "-", regex=False).str.replace("+", "", regex=False)
+    return pd.to_numeric(s, errors="coerce")
+
+
+def _count_col(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df:
+        return np.zeros(len(df), dtype=np.float32)
+    return df[col].str.len().fillna(0).to_numpy(dtype=np.float32)
+
+
+def _num_col(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in df:
+        return np.zeros(len(df), dtype=np.float32)
+    return pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype=np.float32)
+
+
+def build_feature_matrix(df: pd.DataFrame) -> np.ndarray:
+    """整張表 → (n, len(FEATURE_COLUMNS)) float32 矩陣，欄位順序同 FEATURE_COLUMNS。
+
+    無法解析的 spread / total 以 0.0 填入，與舊版 `build_features` 一致。
+    """
+
+    n = len(df)
+    feats = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float32)
+    if n == 0:
+        return feats
+
+    feats[:, SPREAD] = parse_line(df["spread"]).fillna(0).to_numpy(dtype=np.float32)
+    feats[:, TOTAL] = parse_line(df["total"]).fillna(0).to_numpy(dtype=np.float32)
+    feats[:, INJ_HOME] = _count_col(df, "inj_home")
+    feats[:, INJ_AWAY] = _count_col(df, "inj_away")
+    feats[:, HOME_WINS] = _num_col(df, "home_wins")
+    feats[:, AWAY_WINS] = _num_col(df, "away_wins")
+    return feats
@@ -0,0 +1,272 @@
+# modules/html_parse.py
+"""
+共用 HTML 解析（lxml + XPath）。
+
+各爬蟲原本各自用 BeautifulSoup（多數是純 Python 的 `html.parser`）建整棵樹再跑
+CSS selector；解析是每小時流程最大的 CPU 成本。這裡統一改為：
+
+✔ lxml.html 直接 XPath，不經 BeautifulSoup 包裝
+✔ 有明確標記的表格（Oddspedia 賠率表、Rotowire 傷兵表）先以字串切出該段
+  子樹再解析，不解析整頁
+✔ 共用列格式 `ROW_FIELDS`，各呼叫端再轉成自己原本的回傳格式
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from lxml import html as lxml_html
+
+# 共用列格式：所有解析器輸出的 dict 都具備這些 key（沒有的欄位為 None）
+ROW_FIELDS = (
+    "kickoff",
+    "match",
+    "home",
+    "away",
+    "spread",
+    "total",
+    "home_odds",
+    "away_odds",
+    "home_score",
+    "away_score",
+    "books",  # {莊家: [賠率字串, ...]}（列表頁的每個 bookmaker 區塊，見 modules/odds_matrix.py）
+    "status",  # SofaScore 比賽狀態：finished / 其他原始狀態字串（小寫），沒有標示為 None
+)
+
+
+def make_row(**fields: Any) -> Dict[str, Any]:
+    row = dict.fromkeys(ROW_FIELDS)
+    row.update(fields)
+    return row
+
+
+def has_class(name: str) -> str:
+    """XPath 條件：class 屬性包含 `name`（等同 CSS 的 `.name`）。"""
+
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def extract_fragment(html: str, marker: str, tag: str = "table") -> str:
+    """以字串搜尋切出包含 `marker` 的 `<tag>…</tag>` 原始片段，找不到時回傳整頁。"""
+
+    pos = html.find(marker)
+    if pos < 0:
+        return html
+    start = html.rfind(f"<{tag}", 0, pos)
+    end = html.find(f"</{tag}>", pos)
+    if start < 0 or end < 0:
+        return html
+    return html[start : end + len(tag) + 3]
+
+
+def _parse(html: str):
+    return lxml_html.fromstring(html) if html.strip() else None
+
+
+def _find_table(html: str, marker: str, xpath: str):
+    """先只解析 `marker` 所在的 `<table>` 片段；切錯（例如標記出現在 script）時退回整頁。"""
+
+    fragment = extract_fragment(html, marker)
+    for source in (fragment, html) if fragment is not html else (html,):
+        root = _parse(source)
+        if root is None:
+            return None
+        tables = root.xpath(xpath)
+        if tables:
+            return tables[0]
+    return None
+
+
+def _text(el) -> str:
+    """等同 BeautifulSoup 的 `.text.strip()`。"""
+
+    return el.text_content().strip()
+
+
+def _text_joined(el) -> str:
+    """等同 BeautifulSoup 的 `.get_text(strip=True)`。"""
+
+    return "".join(s.strip() for s in el.itertext())
+
+
+# ────────────────────────────────────────────────────────────────
+# Oddspedia
+# ────────────────────────────────────────────────────────────────
+
+ODDS_TABLE_MARKER = 'data-testid="odds-table"'
+
+
+def parse_oddspedia_table(html: str) -> Optional[List[Dict[str, Any]]]:
+    """`table[data-testid='odds-table']` 的每一列；找不到表格時回傳 None。"""
+
+    table = _find_table(
+        html, ODDS_TABLE_MARKER, "descendant-or-self::table[@data-testid='odds-table']"
+    )
+    if table is None:
+        return None
+
+    rows: List[Dict[str, Any]] = []
+    for tr in table.xpath(".//tbody/tr"):
+        tds = tr.xpath("./td")
+        if len(tds) < 5:
+            continue  # 有些列可能是廣告/空白
+        rows.append(
+            make_row(
+                kickoff=_text_joined(tds[0]),
+                home=_text_joined(tds[1]),
+                away=_text_joined(tds[2]),
+                spread=_text_joined(tds[3]).replace("−", "-"),
+                total=_text_joined(tds[4]),
+            )
+        )
+    return rows
+
+
+def parse_event_rows(
+    html: str,
+    name_class: str,
+    odds_xpath: str,
+    time_class: Optional[str] = None,
+    price_class: str = "odds-value",
+) -> List[Dict[str, Any]]:
+    """`div.eventRow` 式的列表頁（modules/odds_scraper、proxy/odds_proxy）。
+
+    `odds_xpath` 為相對於每列的 XPath，取前兩個值作為主 / 客賠率。
+    另外每個 `.bookmaker-area` 的 `price_class` 值依序收進 `books`
+    （莊家名稱取 `data-bookmaker`，沒有時為 "book<i>"）。
+    """
+
+    root = _parse(html)
+    if root is None:
+        return []
+
+    rows: List[Dict[str, Any]] = []
+    for event in root.xpath(f"//div[{has_class('eventRow')}]"):
+        names = event.xpath(f".//*[{has_class(name_class)}]")
+        if not names:
+            continue
+        kickoff = None
+        if time_class:
+            times = event.xpath(f".//*[{has_class(time_class)}]")
+            if not times:
+                continue
+            kickoff = _text(times[0])
+        odds = [_text(o) for o in event.xpath(odds_xpath)]
+        books: Dict[str, List[str]] = {}
+        for i, area in enumerate(event.xpath(f".//*[{has_class('bookmaker-area')}]")):
+            prices = [_text(o) for o in area.xpath(f".//*[{has_class(price_class)}]")]
+            if prices:
+                books[area.get("data-bookmaker") or area.get("title") or f"book{i}"] = prices
+        rows.append(
+            make_row(
+                kickoff=kickoff,
+                match=_text(names[0]),
+                home_odds=odds[0] if len(odds) > 0 else None,
+                away_odds=odds[1] if len(odds) > 1 else None,
+                books=books or None,
+            )
+        )
+    return rows
+
+
+# ────────────────────────────────────────────────────────────────
+# SofaScore proxy
+# ────────────────────────────────────────────────────────────────
+
+# 視為完賽的狀態字串（小寫）；其餘（"live"、"Q3"、"45'" ...）都不是最終比分
+SOFASCORE_FINISHED = frozenset(
+    {"ft", "final", "finished", "ended", "aet", "ap", "after et", "after pen.", "f/ot", "完賽", "已結束"}
+)
+
+
+def _event_status(event) -> Optional[str]:
+    raw = event.get("data-status")
+    if raw is None:
+        nodes = event.xpath(f".//*[{has_class('eventRow__status')}]")
+        raw = _text(nodes[0]) if nodes else None
+    if not raw:
+        return None
+    raw = raw.strip().lower()
+    return "finished" if raw in SOFASCORE_FINISHED else raw
+
+
+def _event_start(event) -> Optional[str]:
+    """開賽時間（ISO 8601，UTC）：`data-start-timestamp`（Unix 秒）或 `<time datetime>`。"""
+
+    ts = event.get("data-start-timestamp")
+    if ts and ts.strip().isdigit():
+        return datetime.fromtimestamp(int(ts), tz=timezone.utc).isoformat()
+    stamps = event.xpath(".//time/@datetime")
+    return stamps[0].strip() if stamps else None
+
+
+def parse_sofascore_events(html: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """`div.eventRow__main` 內有比分（"h:a"）的比賽，附狀態（`status`）與開賽時間（`kickoff`）。
+
+    進行中的比賽也有 "h:a" 比分；只有 `status == "finished"` 的才是完賽結果。
+    狀態 / 時間先找外層 `div.eventRow` 的屬性與子元素，沒有外層時看 `eventRow__main` 本身。
+    """
+
+    root = _parse(html)
+    if root is None:
+        return []
+
+    blocks = root.xpath(f"//div[{has_class('eventRow__main')}]")
+    if limit is not None:
+        blocks = blocks[:limit]
+
+    rows: List[Dict[str, Any]] = []
+    for block in blocks:
+        teams = block.xpath(f".//span[{has_class('eventRow__name')}]")
+        scores = block.xpath(f".//div[{has_class('eventRow__score')}]")
+        if len(teams) != 2 or not scores:
+            continue
+        score = _text(scores[0])
+        if ":" not in score:
+            continue
+        try:
+            home_score, away_score = map(int, score.split(":"))
+        except ValueError:
+            continue
+        outer = block.xpath(f"ancestor::div[{has_class('eventRow')}][1]")
+        event = outer[0] if outer else block
+        rows.append(
+            make_row(
+                kickoff=_event_start(event),
+                home=_text(teams[0]),
+                away=_text(teams[1]),
+                home_score=home_score,
+                away_score=away_score,
+                status=_event_status(event),
+            )
+        )
+    return rows
+
+
+# ────────────────────────────────────────────────────────────────
+# Rotowire
+# ────────────────────────────────────────────────────────────────
+
+INJURY_TABLE_MARKER = "injury-table"
+
+
+def parse_rotowire_injuries(html: str) -> Dict[str, List[Dict[str, str]]]:
+    """`table.injury-table` → {team: [{player, position, status, notes}]}。"""
+
+    table = _find_table(
+        html, INJURY_TABLE_MARKER, f"descendant-or-self::table[{has_class('injury-table')}]"
+    )
+    if table is None:
+        return {}
+
+    injury_data: Dict[str, List[Dict[str, str]]] = {}
+    for tr in table.xpath(".//tr")[1:]:  # skip header
+        cols = [_text(td) for td in tr.xpath("./td")]
+        if len(cols) < 5:
+            continue
+        team, player, position, status, notes = cols[:5]
+        injury_data.setdefault(team, []).append(
+            {"player": player, "position": position, "status": status, "notes": notes}
+        )
+    return injury_data
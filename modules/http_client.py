@@ -0,0 +1,171 @@
+# modules/http_client.py
+"""
+共用 HTTP client（所有爬蟲 / 來源共用同一個連線池）。
+
+原本五個抓取函式各自 `requests.get`，每次都重新建立 TCP/TLS 連線，錯誤處理也各寫各的。
+這裡統一提供：
+
+✔ 單一 `requests.Session`：keep-alive 連線池，大小對齊並行數
+✔ 壓縮：gzip / deflate，安裝 `brotli` 時自動加上 br
+✔ 每個 host 的限速（token bucket，ENRICH_HOST_RPS / ENRICH_HOST_BURST）
+✔ 每個 host 的斷路器：連續失敗 CIRCUIT_FAILURES 次後暫停 CIRCUIT_RESET 秒，
+  期間直接拋出 `CircuitOpenError`，之後放行一個試探請求（half-open）
+
+※ requests / urllib3 不支援 HTTP/2，這裡以 HTTP/1.1 keep-alive 為主。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "8"))  # 並行抓取數 = 連線池大小（modules/enrichment.py）
+ENRICH_HOST_RPS = float(os.getenv("ENRICH_HOST_RPS", "5"))
+ENRICH_HOST_BURST = int(os.getenv("ENRICH_HOST_BURST", "5"))
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET = float(os.getenv("CIRCUIT_RESET", "60"))  # 秒
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) "
+    "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+
+
+class HostRateLimiter:
+    """簡單的 token bucket，以 host 為單位限制每秒請求數。"""
+
+    def __init__(self, rate: float = ENRICH_HOST_RPS, burst: int = ENRICH_HOST_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets: Dict[str, List[float]] = {}  # host -> [tokens, last_ts]
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, [float(self.burst), now])
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = [tokens - 1, now]
+                    return
+                self._buckets[host] = [tokens, now]
+                sleep_for = (1 - tokens) / self.rate
+            time.sleep(sleep_for)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """掛在 Session 上的 Adapter：送出前先向 HostRateLimiter 取 token。"""
+
+    def __init__(self, limiter: HostRateLimiter, **kwargs: Any):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):  # type: ignore[override]
+        self.limiter.acquire(urlsplit(request.url).netloc)
+        return super().send(request, **kwargs)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """host 的斷路器為開啟狀態，請求未送出。"""
+
+
+class CircuitBreaker:
+    """以 host 為單位的斷路器（closed → open → half-open）。"""
+
+    def __init__(self, failures: int = CIRCUIT_FAILURES, reset_after: float = CIRCUIT_RESET):
+        self.failures = max(1, failures)
+        self.reset_after = reset_after
+        self._state: Dict[str, list] = {}  # host -> [連續失敗數, 開啟時間 or None, 試探中]
+        self._lock = threading.Lock()
+
+    def before(self, host: str) -> None:
+        with self._lock:
+            count, opened, probing = self._state.get(host, [0, None, False])
+            if opened is None:
+                return
+            if time.monotonic() - opened < self.reset_after or probing:
+                raise CircuitOpenError(f"circuit open for {host}")
+            self._state[host] = [count, opened, True]  # half-open：只放行一個試探請求
+
+    def record(self, host: str, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self._state.pop(host, None)
+                return
+            count, opened, _ = self._state.get(host, [0, None, False])
+            count += 1
+            if count >= self.failures:
+                if opened is None or count == self.failures:
+                    logging.warning(f"[HTTP] {host} 連續失敗 {count} 次，斷路 {self.reset_after:.0f}s")
+                opened = time.monotonic()
+            self._state[host] = [count, opened, False]
+
+    def is_open(self, host: str) -> bool:
+        with self._lock:
+            return self._state.get(host, [0, None, False])[1] is not None
+
+
+class ResilientAdapter(RateLimitedAdapter):
+    """限速 + 斷路器；5xx 與連線錯誤計為失敗，4xx 不影響斷路器。"""
+
+    def __init__(self, limiter: HostRateLimiter, breaker: CircuitBreaker, **kwargs):
+        self.breaker = breaker
+        super().__init__(limiter, **kwargs)
+
+    def send(self, request, **kwargs):  # type: ignore[override]
+        host = urlsplit(request.url).netloc
+        self.breaker.before(host)
+        try:
+            res = super().send(request, **kwargs)
+        except requests.RequestException:
+            self.breaker.record(host, False)
+            raise
+        self.breaker.record(host, res.status_code < 500)
+        return res
+
+
+def create_session(
+    proxy: Optional[str] = None,
+    user_agent: str = DEFAULT_USER_AGENT,
+    pool_size: int = ENRICH_WORKERS,
+    limiter: Optional[HostRateLimiter] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"User-Agent": user_agent, "Accept-Encoding": ACCEPT_ENCODING})
+    if proxy:
+        session.proxies.update({"http": proxy, "https": proxy})
+    adapter = ResilientAdapter(
+        limiter or HostRateLimiter(),
+        breaker or CircuitBreaker(),
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """程序內共用的 Session（PROXY_URL 設定時走代理）。"""
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session(proxy=os.getenv("PROXY_URL"))
+        return _session
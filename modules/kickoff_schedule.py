@@ -0,0 +1,197 @@
+# modules/kickoff_schedule.py
+"""
+依開賽時間調整的輪詢頻率。
+
+原本每個運動以固定間隔重抓，不管下一場是十分鐘後還是兩天後。盤口多半在開賽前才變動，
+同樣的請求額度花在即將開賽的比賽上，資料會新鮮得多：
+
+✔ `kickoff_board.update(tag, df)`：由 `fetch_odds` 的 kickoff 欄建立每個運動的
+  priority queue（heapq，依開賽時間），已開賽的比賽在查詢時移除
+✔ 間隔與距離開賽時間成正比：`lead × POLL_LEAD_RATIO`，限制在 [POLL_MIN, POLL_MAX]
+✔ 每個 host 的總額度（POLL_BUDGET，每小時請求數）：同一 host 的運動合計超出時，
+  所有間隔等比例放大，仍保留「越接近開賽越頻繁」的相對順序
+✔ 尚無賽程資料的運動沿用原本的間隔（modules/scheduler.py 的 SPORT_INTERVALS）
+
+`PollPlanner.interval_fn(tag)` 可直接交給 `SchedulerService(interval_fns=...)`。
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+KICKOFF_TZ = ZoneInfo(os.getenv("KICKOFF_TZ", os.getenv("SCHEDULER_TZ", "Asia/Taipei")))
+POLL_MIN = float(os.getenv("POLL_MIN", "120"))  # 秒
+POLL_MAX = float(os.getenv("POLL_MAX", "14400"))
+POLL_LEAD_RATIO = float(os.getenv("POLL_LEAD_RATIO", "0.1"))  # 開賽前 2 小時 → 每 12 分鐘
+POLL_BUDGET = os.getenv("POLL_BUDGET", "")  # "oddspedia.com=60"：每小時請求數
+POLL_BUDGET_DEFAULT = float(os.getenv("POLL_BUDGET_DEFAULT", "60"))
+
+IntervalFn = Callable[[datetime], float]
+
+_CLOCK_RE = re.compile(r"(?P<h>\d{1,2}):(?P<m>\d{2})")
+_DATE_RE = re.compile(r"(?P<mo>\d{1,2})/(?P<d>\d{1,2})")
+
+
+def parse_kickoff(text, now: datetime) -> Optional[datetime]:
+    """Oddspedia 的開賽欄位 → 有時區的 datetime；無法解析時回傳 None。
+
+    支援 ISO 8601、"MM/DD HH:MM" 與 "HH:MM"。只有時刻時取 `now` 之後最近的那一次
+    （已過的時刻視為明天；今天已開賽的比賽不會再出現在盤口表上）。
+    """
+
+    if text is None or (isinstance(text, float) and text != text):
+        return None
+    text = str(text).strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        parsed = None
+    if parsed is not None:
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=KICKOFF_TZ)
+
+    clock = _CLOCK_RE.search(text)
+    if clock is None:
+        return None
+    hour, minute = int(clock["h"]), int(clock["m"])
+    if hour > 23 or minute > 59:
+        return None
+    local = now.astimezone(KICKOFF_TZ)
+    date = _DATE_RE.search(text)
+    if date is not None:
+        try:
+            kickoff = local.replace(month=int(date["mo"]), day=int(date["d"]), hour=hour, minute=minute, second=0, microsecond=0)
+        except ValueError:
+            return None
+        if kickoff < local - timedelta(days=180):  # 跨年
+            kickoff = kickoff.replace(year=kickoff.year + 1)
+        return kickoff
+    kickoff = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return kickoff if kickoff >= local else kickoff + timedelta(days=1)
+
+
+class KickoffBoard:
+    """每個運動一個依開賽時間排序的 heap：[(kickoff, match_key), ...]。"""
+
+    def __init__(self) -> None:
+        self._heaps: Dict[str, List[Tuple[datetime, str]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, tag: str, df: pd.DataFrame, now: Optional[datetime] = None) -> int:
+        """以本次賽程取代該運動的佇列，回傳可解析開賽時間的場數。"""
+
+        if df is None or "kickoff" not in df:
+            return 0
+        now = now or datetime.now(KICKOFF_TZ)
+        keys = (df["home"].astype(str).str.strip() + "|" + df["away"].astype(str).str.strip()).tolist()
+        # 同一個字串只解析一次（一張賽程表的開賽時刻通常只有十幾種）
+        parsed = {k: parse_kickoff(k, now) for k in dict.fromkeys(df["kickoff"])}
+        heap = [(parsed[k], key) for k, key in zip(df["kickoff"], keys) if parsed[k] is not None]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heaps[tag] = heap
+        return len(heap)
+
+    def next_kickoff(self, tag: str, now: datetime) -> Optional[datetime]:
+        """下一場尚未開賽的比賽；已開賽的從 heap 移除。"""
+
+        with self._lock:
+            heap = self._heaps.get(tag)
+            if heap is None:
+                return None
+            while heap and heap[0][0] <= now:
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def known(self, tag: str) -> bool:
+        with self._lock:
+            return tag in self._heaps
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heaps.clear()
+
+
+kickoff_board = KickoffBoard()
+
+
+def parse_budget(spec: str) -> Dict[str, float]:
+    """"oddspedia.com=60,api.sofascore.app=120" → {host: 每小時請求數}。"""
+
+    out: Dict[str, float] = {}
+    for item in spec.split(","):
+        host, sep, value = item.partition("=")
+        if not sep:
+            continue
+        try:
+            out[host.strip()] = float(value)
+        except ValueError:
+            logging.warning(f"POLL_BUDGET 格式錯誤：{item!r}")
+    return out
+
+
+class PollPlanner:
+    """依下一場開賽時間決定各運動的輪詢間隔，並以 host 為單位套用每小時額度。"""
+
+    def __init__(
+        self,
+        hosts: Mapping[str, str],
+        fallback: Mapping[str, IntervalFn],
+        board: KickoffBoard = kickoff_board,
+        budget: Optional[Mapping[str, float]] = None,
+        min_interval: float = POLL_MIN,
+        max_interval: float = POLL_MAX,
+        lead_ratio: float = POLL_LEAD_RATIO,
+    ):
+        self.hosts = dict(hosts)  # {運動: 抓盤口的 host}
+        self.fallback = dict(fallback)
+        self.board = board
+        self.budget = dict(parse_budget(POLL_BUDGET) if budget is None else budget)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lead_ratio = lead_ratio
+
+    def desired(self, tag: str, now: datetime) -> float:
+        """不考慮額度時的間隔。"""
+
+        if not self.board.known(tag):
+            return self.fallback[tag](now)
+        kickoff = self.board.next_kickoff(tag, now)
+        if kickoff is None:
+            return self.max_interval  # 賽程表上已無未開賽的比賽，只需偶爾檢查新賽程
+        lead = (kickoff - now).total_seconds()
+        return min(self.max_interval, max(self.min_interval, lead * self.lead_ratio))
+
+    def plan(self, now: datetime) -> Dict[str, float]:
+        """所有運動的間隔；同一 host 每小時請求數超出額度時等比例放大。"""
+
+        wanted = {tag: self.desired(tag, now) for tag in self.hosts}
+        by_host: Dict[str, List[str]] = {}
+        for tag, host in self.hosts.items():
+            by_host.setdefault(host, []).append(tag)
+
+        out = dict(wanted)
+        for host, tags in by_host.items():
+            budget = self.budget.get(host, POLL_BUDGET_DEFAULT)
+            per_hour = sum(3600.0 / wanted[t] for t in tags)
+            if budget > 0 and per_hour > budget:
+                scale = per_hour / budget
+                for t in tags:
+                    out[t] = wanted[t] * scale
+                logging.debug(f"[Poll] {host} 需求 {per_hour:.0f}/h 超出額度 {budget:.0f}/h，間隔 ×{scale:.2f}")
+        return out
+
+    def interval(self, tag: str, now: datetime) -> float:
+        return self.plan(now)[tag]
+
+    def interval_fn(self, tag: str) -> IntervalFn:
+        return lambda now: self.interval(tag, now)
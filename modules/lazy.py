@@ -0,0 +1,52 @@
+# modules/lazy.py
+"""
+延遲 import：第一次存取屬性時才真正載入模組。
+
+webhook / CLI 的入口只需要少數模組就能開始服務；pandas、pytesseract 之類的重量級
+依賴（各自數百毫秒）留到真的用到時再載入：
+
+    pd = lazy_import("pandas")
+    pd.DataFrame(...)          # 這裡才 import pandas
+
+與 `importlib.util.LazyLoader` 不同，這裡的代理物件在多執行緒下也安全：實際載入走
+`importlib.import_module`（有每個模組的 import lock），webhook worker 同時觸發也只載入一次。
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = self.__dict__["_lazy_module"] = importlib.import_module(self.__name__)
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """已載入的模組直接回傳；否則回傳代理，第一次存取屬性時才 import。"""
+
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    return name in sys.modules
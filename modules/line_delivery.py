@@ -0,0 +1,283 @@
+# modules/line_delivery.py
+"""
+LINE 推播傳送子系統（背景佇列）。
+
+原本 `push_line` 同步呼叫 `broadcast`、`predict_and_push` 另用 v3 SDK `push_message`，
+失敗只記 log。這裡統一改為：
+
+✔ `enqueue()` 立即返回，實際傳送在背景 thread，爬蟲與預測不必等 LINE API
+✔ 同一收件對象的訊息合併，每個請求最多 5 則（LINE 上限）
+✔ 單一對象用 push、多個對象用 multicast（每批 ≤ 500 人，各批分別記錄成敗）、None 為 broadcast
+✔ 共用連線池的 requests.Session
+✔ 429 / 5xx 以指數退避 + jitter 重試（遵守 Retry-After）
+✔ 超過單則 5000 字的訊息依行切分
+✔ `enqueue(..., on_sent=)`：該則訊息全部送達（或確定失敗）後以 True / False 回呼
+✔ `reply()` 超過 5 則的部分改以 push 排入佇列，不會默默丟掉
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+LINE_API = os.getenv("LINE_API", "https://api.line.me/v2/bot/message")
+MAX_MESSAGES_PER_REQUEST = 5
+MAX_TEXT_LENGTH = 5000
+MAX_MULTICAST_RECIPIENTS = 500
+DELIVERY_RETRIES = int(os.getenv("LINE_DELIVERY_RETRIES", "5"))
+DELIVERY_BACKOFF = float(os.getenv("LINE_DELIVERY_BACKOFF", "1"))
+DELIVERY_BATCH_WAIT = float(os.getenv("LINE_DELIVERY_BATCH_WAIT", "0.5"))  # 秒
+
+Recipients = Union[None, str, Sequence[str]]
+SentCallback = Callable[[bool], None]
+
+
+def split_text(text: str, limit: int = MAX_TEXT_LENGTH) -> List[str]:
+    """依行切分為每段 ≤ `limit` 字；單行過長時硬切。"""
+
+    if len(text) <= limit:
+        return [text]
+    chunks: List[str] = []
+    buf = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if buf:
+                chunks.append(buf)
+                buf = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{buf}\n{line}" if buf else line
+        if len(candidate) > limit:
+            chunks.append(buf)
+            buf = line
+        else:
+            buf = candidate
+    if buf:
+        chunks.append(buf)
+    return chunks
+
+
+def _recipient_key(to: Recipients) -> Tuple[str, ...]:
+    if to is None:
+        return ()
+    if isinstance(to, str):
+        return (to,)
+    return tuple(sorted(set(to)))
+
+
+@dataclass
+class _Job:
+    key: Tuple[str, ...]
+    texts: List[str] = field(default_factory=list)
+    on_sent: Optional[SentCallback] = None
+
+
+def _notify(callbacks: List[SentCallback], ok: bool) -> None:
+    for cb in callbacks:
+        try:
+            cb(ok)
+        except Exception as exc:
+            logging.error(f"LINE 推播回呼失敗：{exc}")
+
+
+class LineDelivery:
+    def __init__(
+        self,
+        token: Optional[str],
+        session: Optional[requests.Session] = None,
+        retries: int = DELIVERY_RETRIES,
+        backoff: float = DELIVERY_BACKOFF,
+        batch_wait: float = DELIVERY_BATCH_WAIT,
+    ):
+        self.token = token
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_wait = batch_wait
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+            session.mount("https://", adapter)
+        self.session = session
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+
+    # ── 對外介面 ─────────────────────────────────────────────────
+
+    def enqueue(self, text: str, to: Recipients = None, on_sent: Optional[SentCallback] = None) -> None:
+        """排入一則訊息（None=broadcast、str=push、list=multicast），立即返回。
+
+        `on_sent(ok)` 在背景 thread 呼叫：同一收件對象合併送出的所有請求都成功才是 True。
+        multicast 某一批失敗後，該批不再收到後續分段，其他批照常送完；回呼仍為 False，
+        呼叫端若據此整則重送，已送達的批次會收到重複訊息（LINE 無法只補送失敗的批次，刻意接受）。
+        """
+
+        if not self.token:
+            logging.error("LINE Token 未設置，跳過推播。")
+            if on_sent is not None:
+                _notify([on_sent], False)
+            return
+        self._put(_Job(_recipient_key(to), split_text(text), on_sent))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待佇列送完；逾時回傳 False。程式結束前呼叫，避免訊息遺失。"""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def reply(self, reply_token: str, text: str, to: Optional[str] = None) -> bool:
+        """同步回覆（reply token 有時效，不經佇列合併）。
+
+        reply token 只能用一次、最多 5 則；超過的分段有 `to`（事件的 userId）時改以 push 排入佇列，
+        否則記錄被捨棄的段數。
+        """
+
+        chunks = split_text(text)
+        head, rest = chunks[:MAX_MESSAGES_PER_REQUEST], chunks[MAX_MESSAGES_PER_REQUEST:]
+        messages = [{"type": "text", "text": t} for t in head]
+        ok = self._post("reply", {"replyToken": reply_token, "messages": messages})
+        if rest:
+            if to:
+                self._put(_Job(_recipient_key(to), rest))
+            else:
+                logging.warning(f"LINE reply 超過 {MAX_MESSAGES_PER_REQUEST} 則，捨棄其餘 {len(rest)} 則（無 userId 可 push）")
+        return ok
+
+    # ── 背景 worker ──────────────────────────────────────────────
+
+    def _put(self, job: _Job) -> None:
+        self._ensure_worker()
+        self._queue.put(job)
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="line-delivery", daemon=True)
+                self._worker.start()
+
+    def _drain(self, first: _Job) -> Tuple[Dict[Tuple[str, ...], _Job], int]:
+        """取出目前佇列中的訊息（短暫等待湊批），依收件對象合併（回呼一併收集）。"""
+
+        merged: Dict[Tuple[str, ...], _Job] = {}
+        callbacks: Dict[Tuple[str, ...], List[SentCallback]] = {}
+        job = first
+        taken = 1
+        deadline = time.monotonic() + self.batch_wait
+        while True:
+            group = merged.setdefault(job.key, _Job(job.key))
+            group.texts.extend(job.texts)
+            if job.on_sent is not None:
+                callbacks.setdefault(job.key, []).append(job.on_sent)
+            try:
+                job = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            taken += 1
+        for key, cbs in callbacks.items():
+            merged[key].on_sent = lambda ok, cbs=cbs: _notify(cbs, ok)
+        return merged, taken
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            merged, taken = self._drain(first)
+            try:
+                for key, job in merged.items():
+                    ok = self._deliver(key, job.texts)
+                    if job.on_sent is not None:
+                        job.on_sent(ok)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def _deliver(self, key: Tuple[str, ...], texts: List[str]) -> bool:
+        """依序送出一個收件對象的所有分段；multicast 以批為單位記錄成敗，失敗的批次不再送後續分段。"""
+
+        batches = [key[i : i + MAX_MULTICAST_RECIPIENTS] for i in range(0, len(key), MAX_MULTICAST_RECIPIENTS)] or [()]
+        failed: Set[int] = set()
+        for i in range(0, len(texts), MAX_MESSAGES_PER_REQUEST):
+            for b, to in enumerate(batches):
+                if b in failed:
+                    continue
+                try:
+                    ok = self._send(to, texts[i : i + MAX_MESSAGES_PER_REQUEST])
+                except Exception as exc:
+                    logging.error(f"LINE 推播失敗：{exc}")
+                    ok = False
+                if not ok:
+                    failed.add(b)
+        if failed and len(batches) > 1:
+            logging.warning(f"LINE multicast {len(failed)}/{len(batches)} 批失敗，其餘批次已送達")
+        return not failed
+
+    def _send(self, to: Tuple[str, ...], texts: List[str]) -> bool:
+        messages = [{"type": "text", "text": t} for t in texts]
+        if not to:
+            ok = self._post("broadcast", {"messages": messages})
+        elif len(to) == 1:
+            ok = self._post("push", {"to": to[0], "messages": messages})
+        else:
+            ok = self._post("multicast", {"to": list(to), "messages": messages})
+        if ok:
+            self.sent += len(messages)
+            logging.info(f"✓ LINE 推播完成（{len(messages)} 則）")
+        else:
+            self.failed += len(messages)
+        return ok
+
+    def _post(self, endpoint: str, payload: dict) -> bool:
+        headers = {"Authorization": f"Bearer {self.token}"}
+        for attempt in range(self.retries + 1):
+            try:
+                res = self.session.post(f"{LINE_API}/{endpoint}", json=payload, headers=headers, timeout=10)
+            except requests.RequestException as exc:
+                res, error = None, str(exc)
+            else:
+                if res.status_code < 300:
+                    return True
+                error = f"{res.status_code} {res.text[:200]}"
+                if res.status_code != 429 and res.status_code < 500:
+                    logging.error(f"LINE {endpoint} 失敗：{error}")
+                    return False
+
+            if attempt >= self.retries:
+                break
+            delay = self.backoff * (2 ** attempt)
+            retry_after = res.headers.get("Retry-After") if res is not None else None
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            delay *= random.uniform(0.5, 1.5)  # jitter
+            logging.warning(f"LINE {endpoint} 暫時失敗（{error}），{delay:.1f}s 後重試")
+            time.sleep(delay)
+
+        logging.error(f"LINE {endpoint} 重試 {self.retries} 次仍失敗：{error}")
+        return False
+
+
+_deliveries: Dict[Optional[str], LineDelivery] = {}
+_deliveries_lock = threading.Lock()
+
+
+def get_delivery(token: Optional[str]) -> LineDelivery:
+    """每個 channel token 共用一個傳送器（同一個佇列與連線池）。"""
+
+    with _deliveries_lock:
+        delivery = _deliveries.get(token)
+        if delivery is None:
+            delivery = _deliveries[token] = LineDelivery(token)
+        return delivery
@@ -0,0 +1,220 @@
+# modules/match_slate.py
+"""
+精簡的賽程表示法（struct-of-arrays）。
+
+原本補資料時把每支球隊的傷兵 dict 列表塞進 DataFrame 的 object 欄位，每場比賽兩個
+Python list、每位傷兵一個 dict；大型多聯盟賽程的記憶體與配置次數都很可觀。這裡改為：
+
+✔ 每個欄位一個 NumPy 陣列（主 / 客隊、盤口、傷兵數、勝場數…）
+✔ 球隊 / 聯盟 / 運動以字典編碼（interned string → int），陣列只存代碼；代碼表屬於各自的賽程，
+  隨賽程一起釋放，長駐程序不會一輪輪累積隊名 / 球員名
+✔ 傷兵只存「人數」與球員 ID（CSR：每隊一段 ID 區間），不保留原始 dict
+✔ 只在模型邊界轉換：`features()` → float32 矩陣、`to_frame()` → DataFrame
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from modules.features import (
+    AWAY_WINS,
+    FEATURE_COLUMNS,
+    HOME_WINS,
+    INJ_AWAY,
+    INJ_HOME,
+    SPREAD,
+    TOTAL,
+    parse_line,
+)
+
+
+class Interner:
+    """字串 ↔ 連續整數代碼（執行緒安全，只增不減；每個 MatchSlate 各有一份）。"""
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, name: Any) -> int:
+        key = str(name)
+        code = self._ids.get(key)
+        if code is not None:
+            return code
+        with self._lock:
+            code = self._ids.get(key)
+            if code is None:
+                code = self._ids[key] = len(self.names)
+                self.names.append(sys.intern(key))
+            return code
+
+    def codes(self, values: Iterable[Any]) -> np.ndarray:
+        """整欄編碼：先 factorize 取不重複值，再逐一查表。"""
+
+        series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+        local, uniques = pd.factorize(series, sort=False, use_na_sentinel=False)
+        lut = np.fromiter((self.intern(u) for u in uniques), dtype=np.int32, count=len(uniques))
+        return lut[local]
+
+    def lookup(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(self.names, dtype=object)[codes]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def player_id(injury: Mapping[str, Any], players: Interner) -> int:
+    """SofaScore 的 player.id；沒有 ID 時以球員名稱編碼（負數，避免與真 ID 衝突）。"""
+
+    player = injury.get("player") or {}
+    pid = player.get("id") if isinstance(player, Mapping) else None
+    if pid is not None:
+        return int(pid)
+    name = player.get("name") if isinstance(player, Mapping) else injury.get("player")
+    return -1 - players.intern(name or "?")
+
+
+@dataclass
+class MatchSlate:
+    sport: np.ndarray  # uint16，sports 代碼
+    league: np.ndarray  # uint16，leagues 代碼
+    kickoff: np.ndarray  # object，interned 字串
+    home: np.ndarray  # int32，teams 代碼
+    away: np.ndarray  # int32
+    spread: np.ndarray  # float32，無法解析為 NaN
+    total: np.ndarray  # float32
+    inj_home: np.ndarray = field(default=None)  # uint16 傷兵人數
+    inj_away: np.ndarray = field(default=None)
+    home_wins: np.ndarray = field(default=None)  # uint8
+    away_wins: np.ndarray = field(default=None)
+    # 傷兵 ID（CSR）：injury_team[i] 的球員 ID 為 injury_ids[injury_ptr[i]:injury_ptr[i + 1]]
+    injury_team: np.ndarray = field(default=None)
+    injury_ptr: np.ndarray = field(default=None)
+    injury_ids: np.ndarray = field(default=None)
+    # 本賽程的代碼表（名稱無 ID 的傷兵也以 players 編碼成負數 ID）
+    teams: Interner = field(default_factory=Interner, repr=False)
+    leagues: Interner = field(default_factory=Interner, repr=False)
+    sports: Interner = field(default_factory=Interner, repr=False)
+    players: Interner = field(default_factory=Interner, repr=False)
+
+    def __post_init__(self) -> None:
+        n = len(self.home)
+        for name, dtype in (("inj_home", np.uint16), ("inj_away", np.uint16), ("home_wins", np.uint8), ("away_wins", np.uint8)):
+            if getattr(self, name) is None:
+                setattr(self, name, np.zeros(n, dtype=dtype))
+        if self.injury_team is None:
+            self.injury_team = np.empty(0, dtype=np.int32)
+            self.injury_ptr = np.zeros(1, dtype=np.int32)
+            self.injury_ids = np.empty(0, dtype=np.int64)
+
+    # ── 建構 ─────────────────────────────────────────────────────
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, sport: str, league_col: str = "league") -> "MatchSlate":
+        n = len(df)
+        teams, leagues, sports = Interner(), Interner(), Interner()
+        league = (
+            leagues.codes(df[league_col].fillna(sport)) if league_col in df else np.full(n, leagues.intern(sport))
+        )
+        k_local, k_uniques = pd.factorize(df["kickoff"].astype(str), sort=False)
+        kickoff = np.array([sys.intern(k) for k in k_uniques] + [""], dtype=object)[k_local]
+        return cls(
+            sport=np.full(n, sports.intern(sport), dtype=np.uint16),
+            league=np.asarray(league, dtype=np.uint16),
+            kickoff=kickoff,
+            home=teams.codes(df["home"]),
+            away=teams.codes(df["away"]),
+            spread=parse_line(df["spread"]).to_numpy(dtype=np.float32, na_value=np.nan),
+            total=parse_line(df["total"]).to_numpy(dtype=np.float32, na_value=np.nan),
+            teams=teams,
+            leagues=leagues,
+            sports=sports,
+        )
+
+    def __len__(self) -> int:
+        return len(self.home)
+
+    def team_ids(self) -> np.ndarray:
+        return np.unique(np.concatenate([self.home, self.away]))
+
+    def team_names(self) -> List[str]:
+        return list(self.teams.lookup(self.team_ids()))
+
+    # ── 補資料 ───────────────────────────────────────────────────
+
+    def set_injuries(self, injuries: Mapping[str, List[Mapping[str, Any]]]) -> None:
+        """{球隊名稱: 傷兵列表} → 每場人數 + 每隊球員 ID；原始 dict 不保留。"""
+
+        teams = self.team_ids()
+        counts = np.zeros(int(teams.max()) + 1 if len(teams) else 0, dtype=np.uint16)
+        ptr = [0]
+        ids: List[int] = []
+        for tid in teams:
+            items = injuries.get(self.teams.names[tid]) or []
+            counts[tid] = min(len(items), np.iinfo(np.uint16).max)
+            ids.extend(player_id(i, self.players) for i in items)
+            ptr.append(len(ids))
+        self.inj_home = counts[self.home]
+        self.inj_away = counts[self.away]
+        self.injury_team = teams.astype(np.int32)
+        self.injury_ptr = np.asarray(ptr, dtype=np.int32)
+        self.injury_ids = np.asarray(ids, dtype=np.int64)
+
+    def set_wins(self, wins: Callable[[str], int]) -> None:
+        """每支不重複球隊查一次 `wins(name)`，再以代碼展開到每場。"""
+
+        teams = self.team_ids()
+        table = np.zeros(int(teams.max()) + 1 if len(teams) else 0, dtype=np.uint8)
+        for tid in teams:
+            table[tid] = min(int(wins(self.teams.names[tid])), 255)
+        self.home_wins = table[self.home]
+        self.away_wins = table[self.away]
+
+    # ── 模型邊界 ─────────────────────────────────────────────────
+
+    def features(self) -> np.ndarray:
+        """同 `build_feature_matrix`：(n, len(FEATURE_COLUMNS)) float32，NaN 盤口填 0。"""
+
+        feats = np.empty((len(self), len(FEATURE_COLUMNS)), dtype=np.float32)
+        feats[:, SPREAD] = np.nan_to_num(self.spread, nan=0.0)
+        feats[:, TOTAL] = np.nan_to_num(self.total, nan=0.0)
+        feats[:, INJ_HOME] = self.inj_home
+        feats[:, INJ_AWAY] = self.inj_away
+        feats[:, HOME_WINS] = self.home_wins
+        feats[:, AWAY_WINS] = self.away_wins
+        return feats
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "sport": self.sports.lookup(self.sport),
+                "league": self.leagues.lookup(self.league),
+                "kickoff": self.kickoff,
+                "home": self.teams.lookup(self.home),
+                "away": self.teams.lookup(self.away),
+                "spread": self.spread,
+                "total": self.total,
+                "inj_home": self.inj_home,
+                "inj_away": self.inj_away,
+                "home_wins": self.home_wins,
+                "away_wins": self.away_wins,
+            }
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """陣列本身的位元組數（kickoff 為共用的 interned 字串，只計指標）。"""
+
+        return sum(
+            getattr(self, f).nbytes
+            for f in (
+                "sport", "league", "kickoff", "home", "away", "spread", "total", "inj_home",
+                "inj_away", "home_wins", "away_wins", "injury_team", "injury_ptr", "injury_ids",
+            )
+        )
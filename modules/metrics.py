@@ -0,0 +1,310 @@
+# modules/metrics.py
+"""
+每輪流程的量測（stage 計時、HTTP 延遲、快取命中率、列數、推論時間）。
+
+原本 `run_once` 只記錯誤，慢的時候看不出是哪一段慢。這裡提供：
+
+✔ `metrics.timer(stage, sport=...)`：各階段耗時（直方圖）
+✔ `install_http_metrics(session)`：以 response hook 記錄每個 host 的延遲直方圖與狀態碼
+✔ `metrics.add_collector(fn)`：輸出時才呼叫，回報快取命中率等即時數值
+✔ `metrics.render()`：Prometheus text format（main.py 的 GET /metrics）
+✔ `metrics.run()`：單輪 JSON 摘要（METRICS_RUN_LOG 設定時逐行附加）
+✔ `profile_run(mode)`：cProfile / pyinstrument 擷取單輪（PROFILE_DIR）
+
+只用標準函式庫，不需 prometheus_client。
+"""
+
+from __future__ import annotations
+
+import bisect
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+METRICS_RUN_LOG = os.getenv("METRICS_RUN_LOG")  # 例如 ./logs/runs.jsonl
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+
+# 秒；涵蓋毫秒級解析到數十秒的爬蟲
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels: Any) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _RunSummary:
+    def __init__(self, sports: Optional[Iterable[str]] = None) -> None:
+        self.sports = None if sports is None else set(sports)
+        self.started = time.time()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.rows: Dict[str, Dict[str, int]] = {}
+        self.http: Dict[str, List[float]] = {}
+        self.http_errors: Dict[str, int] = {}
+
+    def covers(self, sport: Optional[str]) -> bool:
+        return self.sports is None or sport is None or sport in self.sports
+
+    def as_dict(self) -> Dict[str, Any]:
+        http = {}
+        for host, samples in self.http.items():
+            ordered = sorted(samples)
+            http[host] = {
+                "requests": len(ordered),
+                "errors": self.http_errors.get(host, 0),
+                "p50": ordered[len(ordered) // 2],
+                "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+                "max": ordered[-1],
+            }
+        return {
+            "started_at": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "elapsed": round(time.time() - self.started, 3),
+            "stages": {k: {s: round(v, 4) for s, v in d.items()} for k, d in self.stages.items()},
+            "rows": self.rows,
+            "http": http,
+        }
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hists: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+        self._runs: List[_RunSummary] = []  # 同時進行中的輪次（排程器可能並行跑不同運動）
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    # ── 基本型別 ─────────────────────────────────────────────────
+
+    def observe(self, name: str, value: float, help: str = "", **labels: Any) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram()
+            hist.observe(value)
+            if help:
+                self._help.setdefault(name, help)
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels: Any) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def add_collector(self, fn: Callable[[], Dict[str, float]]) -> None:
+        """`fn()` 回傳 {gauge 名稱: 值}，於輸出時呼叫。"""
+
+        self._collectors.append(fn)
+
+    # ── 流程量測 ─────────────────────────────────────────────────
+
+    @contextmanager
+    def timer(self, stage: str, sport: Optional[str] = None) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.observe("pipeline_stage_seconds", elapsed, "每個流程階段的耗時", stage=stage, sport=sport)
+            with self._lock:
+                for run in self._runs:
+                    if run.covers(sport):
+                        stages = run.stages.setdefault(sport or "_", {})
+                        stages[stage] = stages.get(stage, 0.0) + elapsed
+
+    def rows(self, stage: str, n: int, sport: Optional[str] = None) -> None:
+        self.inc("pipeline_rows_total", n, "各階段處理的列數", stage=stage, sport=sport)
+        with self._lock:
+            for run in self._runs:
+                if run.covers(sport):
+                    counts = run.rows.setdefault(sport or "_", {})
+                    counts[stage] = counts.get(stage, 0) + n
+
+    def http(self, host: str, seconds: float, status: int) -> None:
+        self.observe("http_request_seconds", seconds, "每個 host 的 HTTP 延遲", host=host)
+        self.inc("http_requests_total", 1, "每個 host 的 HTTP 請求數", host=host, code=f"{status // 100}xx")
+        with self._lock:
+            for run in self._runs:  # HTTP 無法歸屬到運動，記入所有進行中的輪次
+                run.http.setdefault(host, []).append(seconds)
+                if status >= 400:
+                    run.http_errors[host] = run.http_errors.get(host, 0) + 1
+
+    @contextmanager
+    def run(self, sports: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """量測一輪（`sports` 為 None 表示全部運動）；結束後 `summary` 會補上 stages / rows / http / gauges。"""
+
+        summary: Dict[str, Any] = {}
+        run = _RunSummary(sports)
+        with self._lock:
+            self._runs.append(run)
+        try:
+            yield summary
+        finally:
+            with self._lock:
+                self._runs.remove(run)
+            summary.update(run.as_dict())
+            summary["gauges"] = self.gauges()
+            self.observe("pipeline_run_seconds", summary["elapsed"], "整輪耗時")
+            self.last_run = summary
+            self._write_run(summary)
+
+    def _write_run(self, summary: Dict[str, Any]) -> None:
+        if not METRICS_RUN_LOG:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(METRICS_RUN_LOG)), exist_ok=True)
+            with open(METRICS_RUN_LOG, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(summary, ensure_ascii=False, default=str) + "\n")
+        except OSError as exc:
+            logging.error(f"寫入 run summary 失敗：{exc}")
+
+    # ── 輸出 ─────────────────────────────────────────────────────
+
+    def gauges(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for fn in self._collectors:
+            try:
+                out.update(fn())
+            except Exception as exc:
+                logging.debug(f"metrics collector 失敗：{exc}")
+        return out
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4。"""
+
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_fmt_labels(labels)} {value:g}")
+            for name, series in sorted(self._hists.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_fmt_labels(labels)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{_fmt_labels(labels)} {hist.count}")
+        for name, value in sorted(self.gauges().items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def install_http_metrics(session: requests.Session, registry: Metrics = metrics) -> None:
+    """每個回應記錄 host 延遲（`Response.elapsed`：送出到收到標頭）。
+
+    同一個 session 對同一個 registry 重複呼叫不會重複掛 hook（以 hook 上的標記判斷）。
+    """
+
+    hooks = session.hooks["response"]
+    if any(getattr(h, "_metrics_registry", None) is registry for h in hooks):
+        return
+
+    def _hook(res: requests.Response, *args: Any, **kwargs: Any) -> None:
+        registry.http(urlsplit(res.url).netloc, res.elapsed.total_seconds(), res.status_code)
+
+    _hook._metrics_registry = registry  # type: ignore[attr-defined]
+    hooks.append(_hook)
+
+
+# ────────────────────────────────────────────────────────────────
+# 單輪 profiling
+# ────────────────────────────────────────────────────────────────
+
+@contextmanager
+def profile_run(mode: Optional[str], out_dir: str = PROFILE_DIR) -> Iterator[None]:
+    """mode 為 "cprofile" / "pyinstrument" / None（不擷取）。
+
+    兩者都只擷取呼叫端所在的 thread，擷取時流程應以 serial 模式執行。
+    """
+
+    if not mode:
+        yield
+        return
+
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logging.warning("未安裝 pyinstrument，改用 cProfile")
+            mode = "cprofile"
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                path = os.path.join(out_dir, f"run-{stamp}.html")
+                with open(path, "w", encoding="utf-8") as fh:
+                    fh.write(profiler.output_html())
+                logging.info(f"[Profile] 已寫入 {path}")
+            return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = os.path.join(out_dir, f"run-{stamp}.prof")
+        profiler.dump_stats(path)
+        buf = io.StringIO()
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(20)
+        logging.info(f"[Profile] 已寫入 {path}\n{buf.getvalue()}")
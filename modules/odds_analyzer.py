@@ -1,5 +1,7 @@
 
 # modules/odds_analyzer.py
+import numpy as np
+import pandas as pd
 
 def analyze_odds_shift(game_data):
     """
@@ -22,3 +24,25 @@ def analyze_odds_shift(game_data):
         messages.append("⚠️ 熱門隊賠率升高（疑似誘導盤）")
 
     return " / ".join(messages) if messages else "✅ 賠率無異常"
+
+
+def analyze_odds_shift_frame(df: pd.DataFrame) -> pd.Series:
+    """
+    `analyze_odds_shift` 的整批版本：一次判斷整個賽程。
+    需要欄位 open_odds / current_odds，home_win_rate 可省略（視為無資料）。
+    """
+    shift = (df["current_odds"] - df["open_odds"]).to_numpy(dtype=float)
+    win_rate = (
+        df["home_win_rate"].to_numpy(dtype=float)
+        if "home_win_rate" in df
+        else np.full(len(df), np.nan)
+    )
+
+    big_move = np.abs(shift) >= 1.0
+    trap = (win_rate > 65) & (shift > 0)
+
+    msg = np.full(len(df), "✅ 賠率無異常", dtype=object)
+    msg[big_move] = "🔺 賠率大幅變動（異常水位）"
+    msg[trap] = "⚠️ 熱門隊賠率升高（疑似誘導盤）"
+    msg[big_move & trap] = "🔺 賠率大幅變動（異常水位） / ⚠️ 熱門隊賠率升高（疑似誘導盤）"
+    return pd.Series(msg, index=df.index)
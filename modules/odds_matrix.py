@@ -0,0 +1,222 @@
+# modules/odds_matrix.py
+"""
+多莊家賠率矩陣：比賽 × 莊家 × 結果（主 / (和) / 客）的 NumPy 陣列。
+
+原本列表頁只留第一組 `.odds-value`（主 / 客兩個字串），其他莊家全部丟掉。
+這裡把每列的 `books`（modules/html_parse.parse_event_rows）整理成
+
+    prices[i, b, k]：第 i 場、第 b 家、結果 k 的十進位賠率（缺值為 NaN）
+
+並以向量化方式一次算完整個賽程：
+
+✔ `best_price()`：每個結果的最佳賠率與提供的莊家
+✔ `overround()`：每家的抽水（Σ 1/賠率 − 1）
+✔ `fair_prob()`：去除抽水後的機率（比例法：1/賠率 ÷ Σ 1/賠率）
+✔ `consensus()`：各家去水機率的平均，作為市場共識
+✔ `arbitrage()`：跨莊家取各結果最佳賠率，Σ 1/最佳 < 1 即為套利，附下注比例
+✔ `to_frame()`：每場一列的市場特徵
+
+※ 目前只是函式庫：排程流程（main_runtime_model）讀的是 Oddspedia 讓分 / 大小分表，
+  沒有各莊家的賠率，因此沒有接進推播；需要市場特徵時對列表頁的 `Match`
+  （`sources.oddspedia_events.fetch`）呼叫 `market_frame`。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.sources import Match
+
+TWO_WAY = ("home", "away")
+THREE_WAY = ("home", "draw", "away")  # Oddspedia 1X2 的順序
+
+
+def to_decimal(values: Sequence[object]) -> np.ndarray:
+    """賠率字串 → 十進位賠率；美式（+150 / -120）自動換算，無法解析或 ≤ 1 為 NaN。"""
+
+    try:
+        raw = np.array(values, dtype=np.float64)  # 常見情況：全是數字字串，直接在 C 層轉換
+    except (TypeError, ValueError):
+        raw = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+    out = raw.copy()
+    # 只有 |值| ≥ 100 的才需要檢查是否帶正負號（美式賠率）
+    for i in np.flatnonzero(np.abs(raw) >= 100):
+        if str(values[i]).lstrip().startswith(("+", "-")):
+            out[i] = 1 + raw[i] / 100 if raw[i] > 0 else 1 + 100 / -raw[i]
+    with np.errstate(invalid="ignore"):
+        out[~(out > 1)] = np.nan
+    return out
+
+
+@dataclass
+class OddsMatrix:
+    prices: np.ndarray  # (n_match, n_book, n_outcome) float64
+    matches: List[str]
+    bookmakers: List[str]
+    outcomes: Tuple[str, ...] = TWO_WAY
+    kickoff: Optional[List[Optional[str]]] = None
+
+    # ── 建構 ─────────────────────────────────────────────────────
+
+    @classmethod
+    def from_books(
+        cls,
+        matches: Sequence[str],
+        books: Sequence[Optional[Mapping[str, Sequence[str]]]],
+        kickoff: Optional[Sequence[Optional[str]]] = None,
+    ) -> "OddsMatrix":
+        """`books[i]` 為第 i 場的 {莊家: [賠率字串, ...]}。
+
+        結果數取全部莊家中最多的那個（2 → 主 / 客，3 → 主 / 和 / 客）；
+        先收集每組 (場, 家) 與攤平的賠率字串，再以 repeat / tile 展開索引一次寫入矩陣。
+        """
+
+        n_out = max((len(p) for b in books if b for p in b.values()), default=2)
+        outcomes = THREE_WAY if n_out >= 3 else TWO_WAY
+        n_out = len(outcomes)
+
+        book_ids: dict = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        vals: List[str] = []
+        for i, per_book in enumerate(books):
+            for name, prices in (per_book or {}).items():
+                if len(prices) != n_out:
+                    continue  # 只有部分結果的莊家（例如 2-way 混入 3-way 市場）無法去水
+                b = book_ids.get(name)
+                if b is None:
+                    b = book_ids[name] = len(book_ids)
+                rows.append(i)
+                cols.append(b)
+                vals.extend(prices)
+
+        prices_arr = np.full((len(matches), len(book_ids), n_out), np.nan)
+        if vals:
+            prices_arr[
+                np.repeat(rows, n_out), np.repeat(cols, n_out), np.tile(np.arange(n_out), len(rows))
+            ] = to_decimal(vals)
+        return cls(
+            prices_arr,
+            list(matches),
+            list(book_ids),
+            outcomes,
+            None if kickoff is None else list(kickoff),
+        )
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[Match]) -> "OddsMatrix":
+        items = list(matches)
+        return cls.from_books([m.label for m in items], [m.books for m in items], [m.kickoff for m in items])
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.prices.shape
+
+    def __len__(self) -> int:
+        return self.prices.shape[0]
+
+    # ── 計算（全部對整個賽程一次完成） ────────────────────────────
+
+    def implied(self) -> np.ndarray:
+        """(n, b, k) 原始隱含機率 1/賠率。"""
+
+        return 1.0 / self.prices
+
+    def complete(self) -> np.ndarray:
+        """(n, b) 該家是否所有結果都有賠率（才能計算抽水）。"""
+
+        return ~np.isnan(self.prices).any(axis=2)
+
+    def overround(self) -> np.ndarray:
+        """(n, b) Σ 1/賠率 − 1；賠率不完整的莊家為 NaN。"""
+
+        book = self.implied().sum(axis=2) - 1.0
+        book[~self.complete()] = np.nan
+        return book
+
+    def fair_prob(self) -> np.ndarray:
+        """(n, b, k) 比例法去水後的機率（各家各自正規化為總和 1）。"""
+
+        implied = self.implied()
+        total = implied.sum(axis=2, keepdims=True)  # 不完整的莊家 → NaN，自然排除
+        return implied / total
+
+    def consensus(self) -> np.ndarray:
+        """(n, k) 各家去水機率的平均（沒有完整報價的比賽為 NaN）。"""
+
+        fair = self.fair_prob()
+        counts = (~np.isnan(fair[:, :, 0])).sum(axis=1)
+        prob = np.nansum(fair, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            prob = prob / counts[:, None]
+        prob[counts == 0] = np.nan
+        return prob
+
+    def best_price(self) -> Tuple[np.ndarray, np.ndarray]:
+        """((n, k) 最佳賠率, (n, k) 提供的莊家索引；全部缺值時為 NaN / -1)。"""
+
+        n, n_book, n_out = self.prices.shape
+        if n_book == 0:
+            return np.full((n, n_out), np.nan), np.full((n, n_out), -1)
+        filled = np.where(np.isnan(self.prices), -np.inf, self.prices)
+        idx = filled.argmax(axis=1)
+        best = np.take_along_axis(filled, idx[:, None, :], axis=1)[:, 0, :]
+        missing = np.isinf(best)
+        best[missing] = np.nan
+        idx[missing] = -1
+        return best, idx
+
+    def arbitrage(self) -> Tuple[np.ndarray, np.ndarray]:
+        """((n,) 套利報酬率（> 0 即有套利，NaN 為報價不足）, (n, k) 下注比例)。
+
+        取各結果的跨家最佳賠率：S = Σ 1/最佳；S < 1 時依 (1/最佳)/S 分配，
+        不論結果為何都回收 1/S 倍。
+        """
+
+        best, _ = self.best_price()
+        inv = 1.0 / best
+        total = inv.sum(axis=1)
+        return 1.0 / total - 1.0, inv / total[:, None]
+
+    # ── 輸出 ─────────────────────────────────────────────────────
+
+    def book_names(self, idx: np.ndarray) -> np.ndarray:
+        names = np.asarray(self.bookmakers + [None], dtype=object)
+        return names[idx]  # -1 → None
+
+    def to_frame(self) -> pd.DataFrame:
+        """每場一列：最佳賠率 / 莊家、共識機率、抽水中位數、報價家數、套利報酬率。"""
+
+        best, idx = self.best_price()
+        fair = self.consensus()
+        margin, stakes = self.arbitrage()
+        with np.errstate(all="ignore"):
+            books = self.complete().sum(axis=1)
+            over = np.full(len(self), np.nan)
+            quoted = books > 0
+            over[quoted] = np.nanmedian(self.overround()[quoted], axis=1)
+
+        cols = {"match": self.matches}
+        if self.kickoff is not None:
+            cols["kickoff"] = self.kickoff
+        for k, outcome in enumerate(self.outcomes):
+            cols[f"best_{outcome}"] = best[:, k]
+            cols[f"best_{outcome}_book"] = self.book_names(idx[:, k])
+            cols[f"consensus_{outcome}"] = fair[:, k]
+        cols["books"] = books
+        cols["overround"] = over
+        cols["arb_margin"] = margin
+        cols["arbitrage"] = margin > 0
+        for k, outcome in enumerate(self.outcomes):
+            cols[f"arb_stake_{outcome}"] = np.where(margin > 0, stakes[:, k], np.nan)
+        return pd.DataFrame(cols)
+
+
+def market_frame(matches: Iterable[Match]) -> pd.DataFrame:
+    """列表頁的比賽 → 每場的市場特徵（見 `OddsMatrix.to_frame`）。"""
+
+    return OddsMatrix.from_matches(matches).to_frame()
@@ -0,0 +1,219 @@
+# modules/odds_store.py
+"""
+盤口快照儲存（append-only）。
+
+每次 `fetch_odds` 的結果寫成一個 Parquet 檔，依 sport / 日期分區：
+
+    ODDS_STORE_DIR/sport=NBA/date=2025-06-01/part-1717200000000.parquet
+
+另以 SQLite 建立 (sport, match, bookmaker, ts) 索引（match 含開賽日期，見 `match_key`）（WITHOUT ROWID B-tree），
+單場查詢初盤 / 最新盤為 O(log n)，整個賽程的初盤 / 最新盤也不必把歷史全部讀進記憶體。
+歷史分析則以 pyarrow.dataset 依分區逐批讀取。
+
+需要 pyarrow；未安裝時只保留 SQLite 索引（仍可查初盤 / 最新盤）。
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from modules.features import parse_line
+from modules.kickoff_schedule import KICKOFF_TZ, parse_kickoff
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 可選依賴
+    pa = ds = pq = None
+
+ODDS_STORE_DIR = os.getenv("ODDS_STORE_DIR")  # 例如 ./data/odds_store
+DEFAULT_BOOKMAKER = "oddspedia"
+
+SNAPSHOT_SCHEMA = None
+if pa is not None:
+    SNAPSHOT_SCHEMA = pa.schema(
+        [
+            ("ts", pa.int64()),
+            ("match_key", pa.string()),
+            ("bookmaker", pa.string()),
+            ("kickoff", pa.string()),
+            ("home", pa.string()),
+            ("away", pa.string()),
+            ("spread", pa.float32()),
+            ("total", pa.float32()),
+        ]
+    )
+
+
+def match_key(df: pd.DataFrame, now: Optional[datetime] = None) -> pd.Series:
+    """比賽識別：`home|away|開賽日期`（KICKOFF_TZ 的 YYYY-MM-DD，見 kickoff_schedule.parse_kickoff）。
+
+    NBA / MLB 的同一組對戰常在連續幾天（系列賽）重複出現；只用隊名時，初盤會取到前一場的盤口，
+    同一次抓取裡的兩場也會互相覆寫。開賽欄位無法解析時以原字串代替日期。
+    """
+
+    teams = df["home"].astype(str).str.strip() + "|" + df["away"].astype(str).str.strip()
+    if "kickoff" not in df:
+        return teams + "|"
+    now = now or datetime.now(KICKOFF_TZ)
+    kickoff = df["kickoff"].fillna("").astype(str).str.strip()
+    # 同一個字串只解析一次（一張賽程表的開賽時刻通常只有十幾種）
+    days = {}
+    for k in dict.fromkeys(kickoff):
+        parsed = parse_kickoff(k, now)
+        days[k] = parsed.astimezone(KICKOFF_TZ).strftime("%Y-%m-%d") if parsed is not None else k
+    return teams + "|" + pd.Series([days[k] for k in kickoff], index=df.index, dtype=object)
+
+
+class OddsStore:
+    """Parquet 快照 + SQLite (sport, match, bookmaker, ts) 索引。"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS lines ("
+            " sport TEXT, match_key TEXT, bookmaker TEXT, ts INTEGER,"
+            " spread REAL, total REAL,"
+            " PRIMARY KEY (sport, match_key, bookmaker, ts)) WITHOUT ROWID"
+        )
+        self._db.commit()
+
+    # ── 寫入 ─────────────────────────────────────────────────────
+
+    def append(
+        self, sport: str, df: pd.DataFrame, ts: Optional[int] = None, keys: Optional[pd.Series] = None
+    ) -> int:
+        """寫入一次抓取結果，回傳寫入筆數。`ts` 為 epoch 毫秒（預設現在）；`keys` 預設為 `match_key(df)`。"""
+
+        if df.empty:
+            return 0
+        ts = int(time.time() * 1000) if ts is None else int(ts)
+
+        snap = pd.DataFrame(
+            {
+                "ts": np.full(len(df), ts, dtype=np.int64),
+                "match_key": (match_key(df) if keys is None else keys).to_numpy(),
+                "bookmaker": (
+                    df["bookmaker"].astype(str).to_numpy() if "bookmaker" in df else DEFAULT_BOOKMAKER
+                ),
+                "kickoff": df["kickoff"].astype(str).to_numpy(),
+                "home": df["home"].astype(str).to_numpy(),
+                "away": df["away"].astype(str).to_numpy(),
+                "spread": parse_line(df["spread"]).to_numpy(dtype=np.float32, na_value=np.nan),
+                "total": parse_line(df["total"]).to_numpy(dtype=np.float32, na_value=np.nan),
+            }
+        )
+
+        if pa is not None:
+            day = datetime.fromtimestamp(ts / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+            part_dir = os.path.join(self.root, f"sport={sport}", f"date={day}")
+            os.makedirs(part_dir, exist_ok=True)
+            table = pa.Table.from_pandas(snap, schema=SNAPSHOT_SCHEMA, preserve_index=False)
+            pq.write_table(table, os.path.join(part_dir, f"part-{ts}.parquet"), compression="zstd")
+
+        rows = [
+            (sport, m, b, ts, _nan_to_none(s), _nan_to_none(t))
+            for m, b, s, t in zip(snap["match_key"], snap["bookmaker"], snap["spread"], snap["total"])
+        ]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO lines VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+        return len(rows)
+
+    # ── 查詢 ─────────────────────────────────────────────────────
+
+    def line(self, sport: str, key: str, bookmaker: str = DEFAULT_BOOKMAKER, latest: bool = True):
+        """單場初盤（latest=False）或最新盤：(ts, spread, total)，走索引 O(log n)。"""
+
+        order = "DESC" if latest else "ASC"
+        with self._lock:
+            return self._db.execute(
+                "SELECT ts, spread, total FROM lines"
+                " WHERE sport = ? AND match_key = ? AND bookmaker = ?"
+                f" ORDER BY ts {order} LIMIT 1",
+                (sport, key, bookmaker),
+            ).fetchone()
+
+    def opening_and_latest(self, sport: str, keys: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """整個賽程每個 (match, bookmaker) 的初盤與最新盤。
+
+        回傳欄位：match_key, bookmaker, open_ts, open_spread, open_total, ts, spread, total
+        """
+
+        sql = (
+            "SELECT g.match_key, g.bookmaker, o.ts, o.spread, o.total, c.ts, c.spread, c.total"
+            " FROM (SELECT match_key, bookmaker, MIN(ts) AS open_ts, MAX(ts) AS last_ts"
+            "       FROM lines WHERE sport = ?{flt} GROUP BY match_key, bookmaker) g"
+            " JOIN lines o ON o.sport = ? AND o.match_key = g.match_key"
+            "  AND o.bookmaker = g.bookmaker AND o.ts = g.open_ts"
+            " JOIN lines c ON c.sport = ? AND c.match_key = g.match_key"
+            "  AND c.bookmaker = g.bookmaker AND c.ts = g.last_ts"
+        )
+        params: List = [sport]
+        flt = ""
+        if keys is not None:
+            keys = list(keys)
+            if not keys:
+                return pd.DataFrame(columns=_OPEN_LATEST_COLS)
+            flt = f" AND match_key IN ({','.join('?' * len(keys))})"
+            params += keys
+        params += [sport, sport]
+        with self._lock:
+            rows = self._db.execute(sql.format(flt=flt), params).fetchall()
+        return pd.DataFrame(rows, columns=_OPEN_LATEST_COLS)
+
+    def history(
+        self,
+        sport: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """依日期分區（YYYY-MM-DD，含頭尾）逐批讀出快照，不一次載入全部歷史。"""
+
+        if ds is None:
+            raise RuntimeError("讀取快照歷史需要 pyarrow")
+        base = os.path.join(self.root, f"sport={sport}")
+        if not os.path.isdir(base):
+            return
+        partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+        dataset = ds.dataset(base, format="parquet", partitioning=partitioning)
+        flt = None
+        if start:
+            flt = ds.field("date") >= start
+        if end:
+            cond = ds.field("date") <= end
+            flt = cond if flt is None else flt & cond
+        for batch in dataset.to_batches(columns=columns, filter=flt):
+            yield batch.to_pandas()
+
+
+_OPEN_LATEST_COLS = [
+    "match_key",
+    "bookmaker",
+    "open_ts",
+    "open_spread",
+    "open_total",
+    "ts",
+    "spread",
+    "total",
+]
+
+
+def _nan_to_none(v):
+    return None if v is None or v != v else float(v)
+
+
+odds_store: Optional[OddsStore] = OddsStore(ODDS_STORE_DIR) if ODDS_STORE_DIR else None
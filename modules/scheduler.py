@@ -0,0 +1,275 @@
+# modules/scheduler.py
+"""
+常駐排程服務（APScheduler）：取代「每小時冷啟動一個 process 跑 `run_once`」。
+
+每輪都重新 import pandas / xgboost / bs4 / linebot、重新載入模型、重建 Session，
+實際工作反而只佔一小部分。這裡讓 process 常駐：
+
+✔ 啟動時先暖機：載入模型、特徵庫，之後各輪共用同一份 Session 連線池與快取
+✔ 每個運動一個 job，間隔可分別設定（SPORT_INTERVALS，例如 "NBA=1800,MLB=3600"）
+✔ 夜間時段（QUIET_HOURS，例如 "2-9"）間隔乘上 QUIET_FACTOR
+✔ 同一運動上一輪還沒跑完時略過本輪（max_instances=1），並記錄於 log / metrics
+✔ 上次執行時間寫入 SCHEDULER_STATE；重啟後已逾期的運動立即補跑一次（coalesce）
+✔ ADAPTIVE_POLLING=1（預設）：依賽程的開賽時間調整間隔，並受每個 host 的額度限制
+  （modules/kickoff_schedule.py）；每輪結束後依最新賽程重新排定下一次
+
+    python -m modules.scheduler          # 獨立常駐（BlockingScheduler）
+    main.py 的 ENABLE_SCHEDULER=1        # 與 webhook 同一 process（BackgroundScheduler）
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MAX_INSTANCES, JobEvent
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.base import BaseTrigger
+
+from modules.kickoff_schedule import PollPlanner
+from modules.metrics import metrics
+
+SCHEDULER_STATE = os.getenv("SCHEDULER_STATE", "./cache/scheduler_state.json")
+SCHEDULER_TZ = ZoneInfo(os.getenv("SCHEDULER_TZ", "Asia/Taipei"))
+PUSH_INTERVAL = float(os.getenv("PUSH_INTERVAL", "3600"))
+SPORT_INTERVALS = os.getenv("SPORT_INTERVALS", "")  # "NBA=1800,MLB=3600"
+QUIET_HOURS = os.getenv("QUIET_HOURS", "")  # "2-9"：02:00–08:59（SCHEDULER_TZ）
+QUIET_FACTOR = float(os.getenv("QUIET_FACTOR", "4"))
+MISFIRE_GRACE = int(os.getenv("SCHEDULER_MISFIRE_GRACE", "600"))
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "1") == "1"
+
+IntervalFn = Callable[[datetime], float]
+
+
+def parse_intervals(spec: str) -> Dict[str, float]:
+    """"NBA=1800,MLB=3600" → {"NBA": 1800.0, "MLB": 3600.0}；格式錯誤的項目略過。"""
+
+    out: Dict[str, float] = {}
+    for item in spec.split(","):
+        tag, sep, value = item.partition("=")
+        if not sep:
+            continue
+        try:
+            out[tag.strip()] = float(value)
+        except ValueError:
+            logging.warning(f"SPORT_INTERVALS 格式錯誤：{item!r}")
+    return out
+
+
+def parse_quiet_hours(spec: str) -> Optional[Tuple[int, int]]:
+    """"2-9" → (2, 9)；"23-6" 跨午夜亦可。"""
+
+    start, sep, end = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        return int(start) % 24, int(end) % 24
+    except ValueError:
+        logging.warning(f"QUIET_HOURS 格式錯誤：{spec!r}")
+        return None
+
+
+def in_quiet_hours(now: datetime, quiet: Optional[Tuple[int, int]]) -> bool:
+    if quiet is None:
+        return False
+    start, end = quiet
+    hour = now.astimezone(SCHEDULER_TZ).hour
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+def sport_interval(
+    tag: str,
+    intervals: Optional[Dict[str, float]] = None,
+    quiet: Optional[Tuple[int, int]] = None,
+    quiet_factor: float = QUIET_FACTOR,
+) -> IntervalFn:
+    """預設的間隔函式：運動各自的秒數，夜間乘上 `quiet_factor`。"""
+
+    base = (intervals or {}).get(tag, PUSH_INTERVAL)
+
+    def _interval(now: datetime) -> float:
+        return base * quiet_factor if in_quiet_hours(now, quiet) else base
+
+    return _interval
+
+
+# ────────────────────────────────────────────────────────────────
+# 狀態（上次執行時間）
+# ────────────────────────────────────────────────────────────────
+
+class RunState:
+    """{運動: 上次完成時間}，寫入 JSON（暫存檔 + os.replace，避免寫到一半）。"""
+
+    def __init__(self, path: Optional[str] = SCHEDULER_STATE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._last: Dict[str, datetime] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                raw = json.load(fh)
+            self._last = {tag: datetime.fromisoformat(ts) for tag, ts in raw.get("last_run", {}).items()}
+        except (OSError, ValueError) as exc:
+            logging.warning(f"排程狀態讀取失敗，視為首次啟動：{exc}")
+
+    def last_run(self, tag: str) -> Optional[datetime]:
+        return self._last.get(tag)
+
+    def mark(self, tag: str, when: Optional[datetime] = None) -> None:
+        with self._lock:
+            self._last[tag] = when or datetime.now(SCHEDULER_TZ)
+            if not self.path:
+                return
+            payload = {"last_run": {t: ts.isoformat() for t, ts in self._last.items()}}
+            tmp = f"{self.path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    json.dump(payload, fh)
+                os.replace(tmp, self.path)
+            except OSError as exc:
+                logging.error(f"排程狀態寫入失敗：{exc}")
+
+
+# ────────────────────────────────────────────────────────────────
+# Trigger：每次觸發後依 interval_fn(now) 決定下一次
+# ────────────────────────────────────────────────────────────────
+
+class SportTrigger(BaseTrigger):
+    """間隔在每次觸發時以 `interval_fn(now)` 重新計算（夜間放寬、或依賽程調整）。"""
+
+    def __init__(self, interval_fn: IntervalFn, start: Optional[datetime] = None):
+        self.interval_fn = interval_fn
+        self.start = start
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        if previous_fire_time is None:
+            return self.start or now
+        # 以「現在」而非上一次預定時間為基準：長時間執行 / 睡眠喚醒後不會連續補跑多輪
+        base = max(previous_fire_time, now)
+        return base + timedelta(seconds=max(1.0, self.interval_fn(base)))
+
+    def __str__(self) -> str:
+        return "sport-trigger"
+
+
+# ────────────────────────────────────────────────────────────────
+# 服務
+# ────────────────────────────────────────────────────────────────
+
+class SchedulerService:
+    def __init__(
+        self,
+        bot,
+        state: Optional[RunState] = None,
+        interval_fns: Optional[Dict[str, IntervalFn]] = None,
+    ):
+        self.bot = bot
+        self.state = state or RunState()
+        intervals = parse_intervals(SPORT_INTERVALS)
+        quiet = parse_quiet_hours(QUIET_HOURS)
+        self.interval_fns: Dict[str, IntervalFn] = {
+            tag: sport_interval(tag, intervals, quiet) for tag in bot.SPORT_ROUTE
+        }
+        self.planner: Optional[PollPlanner] = None
+        if ADAPTIVE_POLLING:
+            hosts = {tag: urlsplit(f"{bot.ODDSPEDIA_BASE}/{route}").netloc for tag, route in bot.SPORT_ROUTE.items()}
+            self.planner = PollPlanner(hosts, fallback=self.interval_fns)
+            self.interval_fns = {tag: self.planner.interval_fn(tag) for tag in bot.SPORT_ROUTE}
+        self.interval_fns.update(interval_fns or {})
+        self.scheduler = None
+
+    def warm_up(self) -> None:
+        """第一輪之前先載入模型與特徵庫，避免把載入時間算進第一輪。"""
+
+        with metrics.timer("warm_up"):
+            self.bot.init()
+
+    def run_sport(self, tag: str) -> None:
+        report = self.bot.run_once(sports=[tag])
+        self.state.mark(tag)
+        if report.get(tag, {}).get("status") != "ok":
+            logging.warning(f"[Scheduler] {tag} 本輪失敗：{report.get(tag)}")
+        if self.planner is not None and self.scheduler is not None:
+            # 觸發時算出的下一次用的是上一輪的賽程；本輪剛更新開賽時間，從完成時間重新排定
+            now = datetime.now(SCHEDULER_TZ)
+            seconds = self.interval_fns[tag](now)
+            try:
+                self.scheduler.modify_job(tag, next_run_time=now + timedelta(seconds=seconds))
+            except JobLookupError:
+                return  # 排程已關閉
+            logging.info(f"[Scheduler] {tag} 依開賽時間，{seconds / 60:.1f} 分鐘後再輪詢")
+
+    def first_fire(self, tag: str, now: datetime) -> datetime:
+        """已逾期（或從未執行）→ 立即；否則接續上次完成時間 + 間隔。"""
+
+        last = self.state.last_run(tag)
+        if last is None:
+            return now
+        due = last + timedelta(seconds=self.interval_fns[tag](now))
+        if due <= now:
+            logging.info(f"[Scheduler] {tag} 上次執行於 {last:%m-%d %H:%M}，已逾期，立即補跑")
+            return now
+        return due
+
+    def _on_event(self, event: JobEvent) -> None:
+        if event.code == EVENT_JOB_MAX_INSTANCES:
+            logging.warning(f"[Scheduler] {event.job_id} 上一輪仍在執行，略過本次")
+            metrics.inc("scheduler_skipped_total", 1, "因上一輪未完成而略過的次數", job=event.job_id)
+        elif event.code == EVENT_JOB_ERROR:
+            logging.error(f"[Scheduler] {event.job_id} 執行失敗：{getattr(event, 'exception', None)}")
+
+    def start(self, blocking: bool = False):
+        self.warm_up()
+        cls = BlockingScheduler if blocking else BackgroundScheduler
+        self.scheduler = cls(
+            timezone=SCHEDULER_TZ,
+            job_defaults={"max_instances": 1, "coalesce": True, "misfire_grace_time": MISFIRE_GRACE},
+        )
+        self.scheduler.add_listener(self._on_event, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_ERROR)
+        now = datetime.now(SCHEDULER_TZ)
+        for tag in self.bot.SPORT_ROUTE:
+            start = self.first_fire(tag, now)
+            self.scheduler.add_job(
+                self.run_sport,
+                SportTrigger(self.interval_fns[tag], start=start),
+                args=[tag],
+                id=tag,
+                name=f"run_once[{tag}]",
+            )
+            logging.info(f"[Scheduler] {tag} 下次執行 {start:%m-%d %H:%M:%S}")
+        self.scheduler.start()
+        return self.scheduler
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self.scheduler is not None and self.scheduler.running:
+            self.scheduler.shutdown(wait=wait)
+
+
+def start_scheduler(blocking: bool = False, **kwargs) -> SchedulerService:
+    """建立並啟動排程服務（延遲 import 主流程，避免循環 import）。"""
+
+    import main_runtime_model as bot
+
+    service = SchedulerService(bot, **kwargs)
+    service.start(blocking=blocking)
+    return service
+
+
+if __name__ == "__main__":
+    try:
+        start_scheduler(blocking=True)
+    except (KeyboardInterrupt, SystemExit):
+        pass
@@ -0,0 +1,56 @@
+# modules/slate_cache.py
+"""
+最新賽程快取（預測結果 + 盤口），供 webhook `/查詢` 直接回覆。
+
+每次 `process_sport` 完成後寫入；因為變動偵測只處理有變動的比賽，
+這裡以 (sport, match) 為單位 upsert，超過 SLATE_TTL 未更新的比賽自動移除。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SLATE_TTL = float(os.getenv("SLATE_TTL", str(24 * 3600)))
+
+
+def _norm(name: Any) -> str:
+    return str(name).strip().casefold()
+
+
+class SlateCache:
+    def __init__(self, ttl: float = SLATE_TTL):
+        self.ttl = ttl
+        self._rows: Dict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, tag: str, df: pd.DataFrame) -> None:
+        now = time.time()
+        records = df.to_dict("records")
+        with self._lock:
+            for r in records:
+                self._rows[(tag, _norm(r["home"]), _norm(r["away"]))] = (now, {**r, "sport": tag})
+            expired = [k for k, (ts, _) in self._rows.items() if now - ts > self.ttl]
+            for k in expired:
+                del self._rows[k]
+
+    def lookup(self, team: str) -> List[Dict[str, Any]]:
+        """主隊或客隊名稱包含 `team`（不分大小寫）的比賽。"""
+
+        q = _norm(team)
+        if not q:
+            return []
+        with self._lock:
+            rows = [r for (_, home, away), (_, r) in self._rows.items() if q in home or q in away]
+        return sorted(rows, key=lambda r: (r["sport"], str(r.get("kickoff", ""))))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+slate_cache = SlateCache()
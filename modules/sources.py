@@ -0,0 +1,261 @@
+# modules/sources.py
+"""
+可插拔的賠率 / 比分來源。
+
+原本 `main_runtime_model.fetch_odds`、`modules/odds_scraper.fetch_odds`、
+`proxy/odds_proxy.fetch_oddspedia_soccer`、`proxy/odds_fetcher.get_odds_from_proxy`、
+`scraper_sofascore.get_games_from_sofascore` 各自有 URL 對照表、各自 `requests.get`。
+這裡改為：
+
+✔ 每個來源是一個小 adapter：`routes`（運動 → 路徑）+ `parse(text)`
+✔ 一律走 modules/http_client.py 的共用 Session（連線池、壓縮、限速、斷路器）
+✔ 統一輸出 `Match`；原本的函式只是把 `Match` 轉回各自的舊格式
+
+新增聯盟只需在對應來源的 `routes` 加一行；新增網站則繼承 `Source` 實作 `parse`。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from modules.html_parse import (
+    ROW_FIELDS,
+    has_class,
+    parse_event_rows,
+    parse_oddspedia_table,
+    parse_sofascore_events,
+)
+from modules.http_client import get_session
+
+ODDSPEDIA_BASE = "https://oddspedia.com"
+SOFASCORE_HTML_PROXY = os.getenv("SOFASCORE_HTML_PROXY", "https://sofascore-proxy-production.up.railway.app")
+ODDS_PROXY_URL = os.getenv("ODDS_PROXY_URL", "https://line-odds-bot.up.railway.app/odds-proxy")
+
+
+@dataclass
+class Match:
+    """所有來源共用的比賽紀錄（欄位同 `html_parse.ROW_FIELDS`，沒有的為 None）。"""
+
+    sport: str
+    source: str
+    kickoff: Optional[str] = None
+    match: Optional[str] = None  # 列表頁只有「主 vs 客」字串時
+    home: Optional[str] = None
+    away: Optional[str] = None
+    spread: Optional[str] = None
+    total: Optional[str] = None
+    home_odds: Optional[str] = None
+    away_odds: Optional[str] = None
+    home_score: Optional[int] = None
+    away_score: Optional[int] = None
+    books: Optional[Dict[str, List[str]]] = None  # {莊家: [主, (和,) 客]}，見 modules/odds_matrix.py
+    status: Optional[str] = None  # "finished" = 完賽（SofaScore），見 html_parse.parse_sofascore_events
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any], sport: str, source: str) -> "Match":
+        return cls(sport, source, **{k: row.get(k) for k in ROW_FIELDS})
+
+    @property
+    def label(self) -> str:
+        return self.match or f"{self.home} vs {self.away}"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Source:
+    """來源 adapter 基底：子類別設定 `name` / `base_url` / `routes` 並實作 `parse`。"""
+
+    name = "source"
+    base_url = ""
+    routes: Dict[str, str] = {}
+    timeout = 10.0
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self._session = session
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session or get_session()
+
+    def url(self, sport: str) -> Optional[str]:
+        path = self.routes.get(sport.lower())
+        return None if path is None else f"{self.base_url}{path}"
+
+    def parse(self, text: str, sport: str) -> List[Match]:
+        raise NotImplementedError
+
+    def fetch_url(self, url: str, sport: str = "") -> List[Match]:
+        """抓取並解析；HTTP 錯誤 / 斷路直接拋出（由呼叫端決定重試或略過）。"""
+
+        res = self.session.get(url, timeout=self.timeout)
+        res.raise_for_status()
+        return self.parse(res.text, sport)
+
+    def fetch(self, sport: str, raise_errors: bool = False) -> List[Match]:
+        url = self.url(sport)
+        if url is None:
+            return []
+        try:
+            return self.fetch_url(url, sport)
+        except Exception as exc:
+            if raise_errors:
+                raise
+            logging.error(f"[{self.name}] {sport} 抓取失敗：{exc}")
+            return []
+
+
+# ────────────────────────────────────────────────────────────────
+# Oddspedia
+# ────────────────────────────────────────────────────────────────
+
+class OddspediaTableSource(Source):
+    """賠率表頁（讓分 / 大小分），主程式使用。"""
+
+    name = "oddspedia_table"
+    base_url = f"{ODDSPEDIA_BASE}/"
+    routes = {"nba": "basketball/nba", "mlb": "baseball/mlb", "soccer": "soccer"}
+    timeout = 15.0
+
+    def parse(self, text: str, sport: str) -> List[Match]:
+        rows = parse_oddspedia_table(text)
+        if rows is None:
+            raise RuntimeError("Odds table not found – 可能前端結構更新。")
+        return [Match.from_row(r, sport, self.name) for r in rows]
+
+
+class OddspediaEventsSource(Source):
+    """`div.eventRow` 列表頁（主 / 客賠率）。"""
+
+    name = "oddspedia_events"
+    base_url = f"{ODDSPEDIA_BASE}/"
+    routes = {"nba": "basketball/usa/nba", "mlb": "baseball/usa/mlb", "soccer": "football"}
+
+    def __init__(
+        self,
+        name_class: str = "eventCell__name",
+        odds_xpath: str = f".//*[{has_class('bookmaker-area')}]//*[{has_class('odds-value')}]",
+        time_class: Optional[str] = None,
+        price_class: str = "odds-value",
+        name: Optional[str] = None,
+        routes: Optional[Dict[str, str]] = None,
+        session: Optional[requests.Session] = None,
+    ):
+        super().__init__(session)
+        if name:
+            self.name = name
+        if routes is not None:
+            self.routes = routes
+        self.name_class = name_class
+        self.odds_xpath = odds_xpath
+        self.time_class = time_class
+        self.price_class = price_class
+
+    def parse(self, text: str, sport: str) -> List[Match]:
+        rows = parse_event_rows(
+            text, self.name_class, self.odds_xpath, time_class=self.time_class, price_class=self.price_class
+        )
+        return [Match.from_row(r, sport, self.name) for r in rows]
+
+
+# ────────────────────────────────────────────────────────────────
+# SofaScore（HTML proxy）
+# ────────────────────────────────────────────────────────────────
+
+class SofascoreSource(Source):
+    """完賽比分（近期戰績用）。"""
+
+    name = "sofascore"
+    base_url = SOFASCORE_HTML_PROXY
+    routes = {
+        "nba": "/basketball/nba",
+        "mlb": "/baseball/usa/mlb",
+        "kbo": "/baseball/south-korea/kbo",
+        "npb": "/baseball/japan/pro-yakyu-npb",
+        "soccer": "/football",
+    }
+
+    def __init__(self, limit: Optional[int] = None, session: Optional[requests.Session] = None):
+        super().__init__(session)
+        self.limit = limit
+
+    def parse(self, text: str, sport: str) -> List[Match]:
+        rows = parse_sofascore_events(text, limit=self.limit)
+        return [Match.from_row(r, sport, self.name) for r in rows]
+
+
+# ────────────────────────────────────────────────────────────────
+# 自家賠率 proxy（JSON）
+# ────────────────────────────────────────────────────────────────
+
+class OddsProxySource(Source):
+    """`/odds-proxy` 回傳的 `{"status": "success", "data": [...]}`；以 ETag 條件式請求。"""
+
+    name = "odds_proxy"
+    base_url = ODDS_PROXY_URL
+    routes = {"soccer": ""}
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
+        self._cached: Dict[str, tuple] = {}  # url -> (etag, matches)
+
+    def fetch_url(self, url: str, sport: str = "") -> List[Match]:
+        etag, cached = self._cached.get(url, (None, None))
+        headers = {"If-None-Match": etag} if etag else {}
+        res = self.session.get(url, timeout=self.timeout, headers=headers)
+        if res.status_code == 304 and cached is not None:
+            return list(cached)
+        res.raise_for_status()
+        if not res.headers.get("Content-Type", "").startswith("application/json"):
+            raise ValueError(f"非 JSON 回傳：{res.text[:200]}")
+        payload = res.json()
+        if payload.get("status") != "success":
+            raise ValueError(f"賠率 API 回傳非 success 狀態：{payload.get('message')}")
+        matches = [
+            Match(
+                sport,
+                self.name,
+                kickoff=item.get("time"),
+                match=item.get("match"),
+                home_odds=item.get("home_odds"),
+                away_odds=item.get("away_odds"),
+                books=item.get("books"),
+            )
+            for item in payload.get("data", [])
+        ]
+        if res.headers.get("ETag"):
+            self._cached[url] = (res.headers["ETag"], matches)
+        return list(matches)
+
+
+SOURCES: Dict[str, Source] = {}
+
+
+def register_source(source: Source) -> Source:
+    SOURCES[source.name] = source
+    return source
+
+
+def get_source(name: str) -> Source:
+    return SOURCES[name]
+
+
+oddspedia_table = register_source(OddspediaTableSource())
+oddspedia_events = register_source(OddspediaEventsSource())
+oddspedia_soccer = register_source(
+    OddspediaEventsSource(
+        name_class="name",
+        odds_xpath=f".//*[{has_class('odds')}]",
+        time_class="time",
+        price_class="odds",
+        name="oddspedia_soccer",
+        routes={"soccer": "football"},
+    )
+)
+sofascore = register_source(SofascoreSource(limit=5))
+odds_proxy = register_source(OddsProxySource())
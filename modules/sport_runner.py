@@ -0,0 +1,89 @@
+# modules/sport_runner.py
+"""
+多運動並行排程。
+
+每個運動（NBA / MLB / Soccer …）各自在獨立 thread 內執行，互不阻塞：
+
+✔ 每個運動各自的期限（SPORT_TIMEOUT，秒）
+✔ 失敗自動重試（SPORT_RETRIES 次，指數退避）
+✔ 錯誤隔離：單一運動失敗 / 逾時不影響其他運動推播
+✔ 每完成一個運動就回報結果與耗時，整輪延遲取決於最慢的運動
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+SPORT_TIMEOUT = float(os.getenv("SPORT_TIMEOUT", "180"))
+SPORT_RETRIES = int(os.getenv("SPORT_RETRIES", "1"))
+SPORT_RETRY_BACKOFF = float(os.getenv("SPORT_RETRY_BACKOFF", "2"))
+
+
+def _with_retries(tag: str, job: Callable[[], Any], retries: int, backoff: float) -> Any:
+    for attempt in range(retries + 1):
+        try:
+            return job()
+        except Exception as exc:
+            if attempt >= retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            logging.warning(f"{tag} 第 {attempt + 1} 次失敗：{exc}，{delay:.0f}s 後重試")
+            time.sleep(delay)
+
+
+def run_parallel(
+    jobs: Dict[str, Callable[[], Any]],
+    timeout: float = SPORT_TIMEOUT,
+    retries: int = SPORT_RETRIES,
+    backoff: float = SPORT_RETRY_BACKOFF,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """並行執行 `jobs`，回傳 {tag: {"status", "elapsed", "result"/"error"}}。
+
+    `timeout` 為每個運動自開始起算的期限；逾時者標記為 "timeout" 並不再等待
+    （thread 無法強制中止，會在背景自行結束）。
+    """
+
+    report: Dict[str, Dict[str, Any]] = {}
+    if not jobs:
+        return report
+
+    pool = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="sport")
+    started = time.monotonic()
+    futures = {
+        pool.submit(_with_retries, tag, job, retries, backoff): tag for tag, job in jobs.items()
+    }
+
+    def _record(tag: str, entry: Dict[str, Any]) -> None:
+        report[tag] = entry
+        if entry["status"] == "ok":
+            logging.info(f"✓ {tag} 完成，耗時 {entry['elapsed']:.2f}s")
+        else:
+            logging.error(f"{tag} 流程錯誤（{entry['status']}）：{entry.get('error')}，耗時 {entry['elapsed']:.2f}s")
+        if on_result:
+            on_result(tag, entry)
+
+    pending = set(futures)
+    while pending:
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for fut in done:
+            tag = futures[fut]
+            elapsed = time.monotonic() - started
+            try:
+                _record(tag, {"status": "ok", "elapsed": elapsed, "result": fut.result()})
+            except Exception as exc:
+                _record(tag, {"status": "error", "elapsed": elapsed, "error": str(exc)})
+
+    for fut in pending:
+        fut.cancel()
+        _record(futures[fut], {"status": "timeout", "elapsed": timeout, "error": f"超過 {timeout:.0f}s"})
+
+    pool.shutdown(wait=False, cancel_futures=True)
+    return report
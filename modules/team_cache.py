@@ -0,0 +1,174 @@
+# modules/team_cache.py
+"""
+球隊資料快取（傷兵 / 近期戰績）。
+
+同一支球隊會出現在多場比賽、多個運動流程與連續的每小時排程中，
+這裡以 (endpoint, team) 為 key 快取結果：
+
+✔ 每個 endpoint 各自的 TTL（傷兵以分鐘計、戰績以小時計）
+✔ LRU 淘汰（TEAM_CACHE_SIZE）
+✔ 失敗結果的負向快取（短 TTL，避免對同一支隊伍反覆失敗請求）
+✔ 可選的 SQLite 落地（TEAM_CACHE_DB），dyno 重啟後即可暖啟動
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+TEAM_CACHE_SIZE = int(os.getenv("TEAM_CACHE_SIZE", "4096"))
+TEAM_CACHE_DB = os.getenv("TEAM_CACHE_DB")  # 例如 ./cache/team_cache.sqlite
+NEGATIVE_TTL = float(os.getenv("TEAM_CACHE_NEGATIVE_TTL", "300"))
+
+# 每個 endpoint 的 TTL（秒）
+DEFAULT_TTLS: Dict[str, float] = {
+    "injuries": float(os.getenv("TEAM_CACHE_INJURY_TTL", str(15 * 60))),
+    "form": float(os.getenv("TEAM_CACHE_FORM_TTL", str(6 * 3600))),
+}
+
+_MISSING = object()
+
+
+class TeamDataCache:
+    """執行緒安全的 TTL + LRU 快取，可選 SQLite 落地。"""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        maxsize: int = TEAM_CACHE_SIZE,
+        negative_ttl: float = NEGATIVE_TTL,
+        db_path: Optional[str] = TEAM_CACHE_DB,
+    ):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        # key -> (expires_at, ok, value)
+        self._data: "OrderedDict[Tuple[str, str], Tuple[float, bool, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._open_db(db_path)
+
+    # ── SQLite ───────────────────────────────────────────────────
+
+    def _open_db(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS team_cache ("
+                " endpoint TEXT, team TEXT, expires_at REAL, ok INTEGER, value TEXT,"
+                " PRIMARY KEY (endpoint, team))"
+            )
+            self._db.execute("DELETE FROM team_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+            self._warm()
+        except sqlite3.Error as exc:
+            logging.error(f"TeamDataCache SQLite 開啟失敗：{exc}")
+            self._db = None
+
+    def _warm(self) -> None:
+        """將尚未過期的資料載入記憶體（最新的優先保留）。"""
+
+        rows = self._db.execute(
+            "SELECT endpoint, team, expires_at, ok, value FROM team_cache"
+            " ORDER BY expires_at DESC LIMIT ?",
+            (self.maxsize,),
+        ).fetchall()
+        for endpoint, team, expires_at, ok, value in reversed(rows):
+            self._data[(endpoint, team)] = (expires_at, bool(ok), json.loads(value))
+        if rows:
+            logging.info(f"✓ TeamDataCache 暖啟動：{len(rows)} 筆")
+
+    def _persist(self, key: Tuple[str, str], entry: Tuple[float, bool, Any]) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO team_cache VALUES (?, ?, ?, ?, ?)",
+                (key[0], key[1], entry[0], int(entry[1]), json.dumps(entry[2], ensure_ascii=False)),
+            )
+            self._db.commit()
+        except (sqlite3.Error, TypeError, ValueError) as exc:
+            logging.debug(f"TeamDataCache 寫入失敗：{exc}")
+
+    # ── 快取操作 ─────────────────────────────────────────────────
+
+    def get(self, endpoint: str, team: Hashable) -> Any:
+        """回傳 (ok, value)；沒有或已過期時回傳 `_MISSING`。"""
+
+        key = (endpoint, str(team))
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, endpoint: str, team: Hashable, value: Any, ok: bool = True) -> None:
+        ttl = self.ttls.get(endpoint, 0) if ok else self.negative_ttl
+        if ttl <= 0:
+            return
+        key = (endpoint, str(team))
+        entry = (time.time() + ttl, ok, value)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._persist(key, entry)
+
+    def get_or_fetch(
+        self,
+        endpoint: str,
+        team: Hashable,
+        loader: Callable[[], Any],
+        default: Any,
+    ) -> Any:
+        """命中則回傳快取；否則呼叫 `loader`，失敗時寫入負向快取並回傳 `default`。"""
+
+        cached = self.get(endpoint, team)
+        if cached is not _MISSING:
+            ok, value = cached
+            return value if ok else default
+
+        try:
+            value = loader()
+        except Exception as exc:
+            logging.warning(f"[{endpoint}] {team} 抓取失敗：{exc}")
+            self.set(endpoint, team, None, ok=False)
+            return default
+
+        self.set(endpoint, team, value)
+        return value
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM team_cache")
+                self._db.commit()
+
+
+team_cache = TeamDataCache()
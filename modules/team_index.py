@@ -0,0 +1,389 @@
+# modules/team_index.py
+"""
+球隊名稱解析索引：任何來源的隊名 → 標準球隊 ID（例如 `nba:LAL`）。
+
+各來源的隊名寫法都不同：Oddspedia 是英文全名（"Los Angeles Lakers"）、
+Rotowire 是縮寫、截圖 OCR 是中文簡稱（「湖人」「洛杉矶湖人」）外加雜訊；
+`process_sport` 原本直接把顯示名稱當 SofaScore slug 送出，對不上就白打一次請求。
+這裡以 data/team_aliases.json 為種子，在發出任何請求前先把名稱解析成同一個 ID：
+
+✔ 正規化：NFKC、大小寫、去重音 / 標點、繁→簡（中文繁簡寫法共用同一組 key）
+✔ 精確比對：正規化 key → 球隊的 hashmap，O(1)；可限定運動（「勇士」= NBA 勇士 / MLB 勇士隊）
+✔ 子字串比對：字元 trie 找出名稱內最長的別名（「LA Lakers 客場」「湖人 -5.5」）
+✔ 模糊比對：n-gram（拉丁字母 3-gram / 中文 2-gram）倒排索引 + Dice 係數（TEAM_FUZZY_THRESHOLD），
+  第一名須領先第二名 TEAM_FUZZY_MARGIN；只是多隊共用的片段（"New York"「洛杉矶」"Sox"）視為無法判斷
+✔ 解析結果以原始字串 memo；高信心（TEAM_LEARN_THRESHOLD）的模糊命中才學成新別名
+✔ 有設定 TEAM_INDEX_PATH 時，學到的別名連同編譯後的索引寫入該檔，種子檔較新時才重建；
+  未設定則只在記憶體內
+✔ `team_index` 在第一次查詢時才載入，import 本模組不讀寫任何檔案
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEAM_ALIAS_SEED = os.getenv("TEAM_ALIAS_SEED", os.path.join(ROOT, "data", "team_aliases.json"))
+TEAM_INDEX_PATH = os.getenv("TEAM_INDEX_PATH") or None  # 例如 ./cache/team_index.json；未設定 = 不落地
+TEAM_FUZZY_THRESHOLD = float(os.getenv("TEAM_FUZZY_THRESHOLD", "0.5"))
+TEAM_FUZZY_MARGIN = float(os.getenv("TEAM_FUZZY_MARGIN", "0.1"))  # 第一名需領先第二名的 Dice 差距
+TEAM_LEARN_THRESHOLD = float(os.getenv("TEAM_LEARN_THRESHOLD", "0.75"))  # 達此分數才學成永久別名
+TEAM_MEMO_SIZE = int(os.getenv("TEAM_MEMO_SIZE", "16384"))
+
+INDEX_VERSION = 1
+
+# 種子與常見盤口用字的繁→簡對照（只需涵蓋會出現在隊名裡的字）
+_T2S = str.maketrans(
+    "鷹亞蘭爾凱頓籃網魯黃騎獨俠達塊馬納磯熱邁蘇鵜鶘紐奧約術費陽鳳國緬聖東倫龍猶華師"
+    "響鶯紅襪護羅薩魚釀雙會運動盜茲舊圖灣遊鳥藍隊體場賽對勝負讓盤鄉衛諾維爾",
+    "鹰亚兰尔凯顿篮网鲁黄骑独侠达块马纳矶热迈苏鹈鹕纽奥约术费阳凤国缅圣东伦龙犹华师"
+    "响莺红袜护罗萨鱼酿双会运动盗兹旧图湾游鸟蓝队体场赛对胜负让盘乡卫诺维尔",
+)
+_NON_WORD_RE = re.compile(r"[^\w]+|_")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _is_cjk(ch: str) -> bool:
+    return "㐀" <= ch <= "鿿" or "豈" <= ch <= "﫿"
+
+
+@lru_cache(maxsize=TEAM_MEMO_SIZE)
+def normalize(name: str) -> str:
+    """比對用的 key：'Los Ángeles  Lakers.' → 'los angeles lakers'，'洛杉磯湖人' → '洛杉矶湖人'。"""
+
+    s = unicodedata.normalize("NFKC", str(name)).casefold()
+    s = "".join(ch for ch in unicodedata.normalize("NFKD", s) if not unicodedata.combining(ch))
+    s = _NON_WORD_RE.sub(" ", s.replace("'", "").translate(_T2S))
+    return " ".join(s.split())
+
+
+def slugify(name: str) -> str:
+    return _SLUG_RE.sub("-", normalize(name)).strip("-")
+
+
+def _is_abbr(key: str) -> bool:
+    """'lal' / 'sf' 這類縮寫只做精確比對，不參與子字串與模糊比對。"""
+
+    return len(key) <= 3 and key.isascii()
+
+
+def _grams(key: str) -> frozenset:
+    if any(_is_cjk(ch) for ch in key):
+        s = key.replace(" ", "")
+        return frozenset(s[i:i + 2] for i in range(len(s) - 1)) or frozenset([s])
+    s = f" {key} "
+    return frozenset(s[i:i + 3] for i in range(len(s) - 2))
+
+
+@dataclass(frozen=True)
+class Team:
+    id: str  # 「運動:官方縮寫」
+    sport: str
+    name: str
+    abbr: str
+    zh: Optional[str] = None
+    sofascore_id: Optional[int] = None
+
+    @property
+    def slug(self) -> str:
+        return slugify(self.name)
+
+    @property
+    def sofascore_key(self) -> str:
+        """SofaScore 端點使用的隊伍代號：有確認過的數字 ID 用 ID，否則用英文全名的 slug。"""
+
+        return str(self.sofascore_id) if self.sofascore_id else self.slug
+
+
+class TeamIndex:
+    """隊名 → Team；精確 / 子字串 / 模糊三段式解析，執行緒安全。"""
+
+    def __init__(
+        self,
+        teams: Iterable[Team],
+        keys: Dict[str, Sequence[str]],
+        learned: Optional[Dict[str, str]] = None,
+        path: Optional[str] = None,
+        seed_mtime: float = 0.0,
+    ):
+        self.teams: Dict[str, Team] = {t.id: t for t in teams}
+        self.sports = frozenset(t.sport for t in self.teams.values())
+        self.learned: Dict[str, str] = {}
+        self.path = path
+        self.seed_mtime = seed_mtime
+        self._keys: Dict[str, Tuple[str, ...]] = {}
+        self._trie: Dict[str, Any] = {}
+        self._grams: Dict[str, List[str]] = {}  # gram -> 別名 key
+        self._gram_size: Dict[str, int] = {}
+        self._words: Dict[str, Set[str]] = {}  # 拉丁字母的詞 -> 含該詞的別名 key
+        self._substrings: Dict[str, Set[str]] = {}  # 中文別名的子字串 -> 球隊 ID
+        self._memo: Dict[Tuple[str, Optional[str]], Optional[Team]] = {}
+        self._lock = threading.Lock()
+        for key, ids in keys.items():
+            self._add_key(key, ids)
+        for key, team_id in (learned or {}).items():
+            if team_id in self.teams and key not in self._keys:
+                self.learned[key] = team_id
+                self._add_key(key, (team_id,))
+
+    # ── 建立 / 載入 ──────────────────────────────────────────────
+
+    @staticmethod
+    def compile_seed(doc: Dict[str, Any]) -> Tuple[List[Team], Dict[str, List[str]]]:
+        """種子檔 → (球隊, 正規化 key → 球隊 ID)。英文全名、縮寫、中文名與 aliases 都是 key。"""
+
+        teams: List[Team] = []
+        keys: Dict[str, List[str]] = {}
+        for row in doc.get("teams", []):
+            team = Team(
+                row["id"], row["sport"].lower(), row["name"], row.get("abbr") or "",
+                row.get("zh"), row.get("sofascore_id"),
+            )
+            teams.append(team)
+            for alias in (team.name, team.abbr, team.zh, *row.get("aliases", [])):
+                key = normalize(alias) if alias else ""
+                if key and team.id not in keys.setdefault(key, []):
+                    keys[key].append(team.id)
+        return teams, keys
+
+    @classmethod
+    def load(cls, seed_path: str = TEAM_ALIAS_SEED, path: Optional[str] = TEAM_INDEX_PATH) -> "TeamIndex":
+        """優先讀取已編譯的索引檔；種子檔較新（或索引不存在 / 損壞）時重新編譯並保留學到的別名。"""
+
+        try:
+            seed_mtime = os.path.getmtime(seed_path)
+        except OSError:
+            logging.warning(f"[TeamIndex] 找不到種子檔 {seed_path}，索引為空")
+            seed_mtime = 0.0
+
+        cached: Dict[str, Any] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    cached = json.load(fh)
+            except (OSError, ValueError) as exc:
+                logging.warning(f"[TeamIndex] 索引檔 {path} 無法讀取，重新編譯：{exc}")
+
+        learned = cached.get("learned", {})
+        if cached.get("version") == INDEX_VERSION and cached.get("seed_mtime") == seed_mtime:
+            teams = [Team(**row) for row in cached["teams"]]
+            return cls(teams, cached["keys"], learned, path, seed_mtime)
+
+        teams, keys = [], {}
+        if seed_mtime:
+            with open(seed_path, encoding="utf-8") as fh:
+                teams, keys = cls.compile_seed(json.load(fh))
+        index = cls(teams, keys, learned, path, seed_mtime)
+        index.save()
+        return index
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        base = {k: ids for k, ids in self._keys.items() if k not in self.learned}
+        payload = {
+            "version": INDEX_VERSION,
+            "seed_mtime": self.seed_mtime,
+            "teams": [asdict(t) for t in self.teams.values()],
+            "keys": base,
+            "learned": self.learned,
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            logging.error(f"[TeamIndex] 寫入 {self.path} 失敗：{exc}")
+
+    def _add_key(self, key: str, ids: Sequence[str]) -> None:
+        self._keys[key] = tuple(ids)
+        if _is_abbr(key):
+            return
+        node = self._trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = self._keys[key]  # 終點
+        grams = _grams(key)
+        self._gram_size[key] = len(grams)
+        for g in grams:
+            self._grams.setdefault(g, []).append(key)
+        # 共用片段索引（見 `_shared_fragment`）：建索引時一次展開，查詢只做字典查找
+        if any(_is_cjk(ch) for ch in key):
+            for i in range(len(key)):
+                for j in range(i + 1, len(key) + 1):
+                    self._substrings.setdefault(key[i:j], set()).update(ids)
+        else:
+            for word in set(key.split()):
+                self._words.setdefault(word, set()).add(key)
+
+    # ── 解析 ─────────────────────────────────────────────────────
+
+    def covers(self, sport: Optional[str]) -> bool:
+        """該運動是否有種子資料（沒有的運動無法判斷名稱是否有效）。"""
+
+        return bool(sport) and sport.lower() in self.sports
+
+    def _pick(self, ids: Iterable[str], sport: Optional[str]) -> Tuple[Optional[Team], bool]:
+        """(唯一符合的球隊, 是否有符合但不唯一)。"""
+
+        found = {i for i in ids if sport is None or self.teams[i].sport == sport}
+        if len(found) == 1:
+            return self.teams[found.pop()], False
+        return None, len(found) > 1
+
+    def lookup(self, name: Any, sport: Optional[str] = None) -> Optional[Team]:
+        """只做精確比對（正規化後的 hashmap 查詢）。"""
+
+        if name is None:
+            return None
+        return self._pick(self._keys.get(normalize(str(name)), ()), sport.lower() if sport else None)[0]
+
+    def _scan(self, key: str, sport: Optional[str]) -> Optional[Team]:
+        """名稱內最長的別名；拉丁字母的別名必須落在詞的邊界。"""
+
+        matches: Dict[int, List[str]] = {}
+        n = len(key)
+        for start in range(n):
+            if start and key[start - 1] != " " and not _is_cjk(key[start]):
+                continue
+            node = self._trie
+            for end in range(start, n):
+                node = node.get(key[end])
+                if node is None:
+                    break
+                ids = node.get("")
+                if ids and (end + 1 == n or key[end + 1] == " " or _is_cjk(key[end])):
+                    matches.setdefault(end + 1 - start, []).extend(ids)
+        for length in sorted(matches, reverse=True):
+            team, ambiguous = self._pick(matches[length], sport)
+            if team is not None or ambiguous:
+                return team
+        return None
+
+    def _shared_fragment(self, key: str, sport: Optional[str]) -> bool:
+        """名稱是否只是多隊別名共用的片段：拉丁字母看詞的子集合（"new york" ⊂ Mets / Yankees），
+        中文看子字串（「洛杉矶」⊂ 湖人 / 快艇 / 道奇 ...）。"""
+
+        if any(_is_cjk(ch) for ch in key):
+            ids: Iterable[str] = self._substrings.get(key, ())
+        else:
+            aliases: Optional[Set[str]] = None
+            for word in set(key.split()):
+                posting = self._words.get(word)
+                if not posting:
+                    return False
+                aliases = posting if aliases is None else aliases & posting
+            ids = (i for alias in aliases or () for i in self._keys[alias])
+        found = {i for i in ids if sport is None or self.teams[i].sport == sport}
+        return len(found) > 1
+
+    def _fuzzy(self, key: str, sport: Optional[str]) -> Tuple[Optional[Team], float]:
+        """(最佳球隊, Dice 分數)；未達門檻、與第二名差距不足或只是共用片段時為 (None, 0)。"""
+
+        if self._shared_fragment(key, sport):
+            return None, 0.0
+        grams = _grams(key)
+        shared: Counter = Counter()
+        for g in grams:
+            shared.update(self._grams.get(g, ()))
+        scores: Dict[str, float] = {}
+        for alias, count in shared.items():
+            dice = 2.0 * count / (len(grams) + self._gram_size[alias])
+            for team_id in self._keys[alias]:
+                if (sport is None or self.teams[team_id].sport == sport) and dice > scores.get(team_id, 0.0):
+                    scores[team_id] = dice
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        if not ranked or ranked[0][1] < TEAM_FUZZY_THRESHOLD:
+            return None, 0.0
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < TEAM_FUZZY_MARGIN:
+            return None, 0.0  # 前兩名太接近，無法判斷
+        return self.teams[ranked[0][0]], ranked[0][1]
+
+    def resolve(self, name: Any, sport: Optional[str] = None) -> Optional[Team]:
+        """精確 → 子字串 → 模糊；無法唯一判斷時回傳 None。`sport` 如 "NBA" / "mlb"（不分大小寫）。"""
+
+        if name is None:
+            return None
+        sport = sport.lower() if sport else None
+        memo_key = (str(name), sport)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        key = normalize(str(name))
+        team, ambiguous = self._pick(self._keys.get(key, ()), sport)
+        if team is None and not ambiguous and key:
+            team = self._scan(key, sport)
+            if team is None:
+                with self._lock:  # 學習別名會改動倒排索引
+                    team, score = self._fuzzy(key, sport)
+                    if team is not None and score >= TEAM_LEARN_THRESHOLD:
+                        self._learn(key, team, str(name))
+
+        if len(self._memo) >= TEAM_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[memo_key] = team
+        return team
+
+    def resolve_pair(
+        self, home: Any, away: Any, sport: Optional[str] = None
+    ) -> Tuple[Optional[Team], Optional[Team]]:
+        """對戰雙方：不知道運動時，以解析成功的一方推定另一方（「湖人 vs 勇士」→ NBA 勇士）。"""
+
+        h, a = self.resolve(home, sport), self.resolve(away, sport)
+        if sport is None:
+            if h is None and a is not None:
+                h = self.resolve(home, a.sport)
+            elif a is None and h is not None:
+                a = self.resolve(away, h.sport)
+        return h, a
+
+    def _learn(self, key: str, team: Team, raw: str) -> None:
+        if key in self._keys:
+            return
+        logging.info(f"[TeamIndex] 新別名 {raw!r} → {team.id}")
+        self.learned[key] = team.id
+        self._add_key(key, (team.id,))
+        self.save()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "teams": len(self.teams),
+            "keys": len(self._keys),
+            "learned": len(self.learned),
+            "memo": len(self._memo),
+        }
+
+
+class LazyTeamIndex:
+    """`TeamIndex` 的代理：第一次存取屬性時才載入（讀種子檔 / 索引檔），之後直接轉呼叫。"""
+
+    def __init__(self, seed_path: str = TEAM_ALIAS_SEED, path: Optional[str] = TEAM_INDEX_PATH) -> None:
+        self._args = (seed_path, path)
+        self._index: Optional[TeamIndex] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> TeamIndex:
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = TeamIndex.load(*self._args)
+                index = self._index
+        return index
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.get(), attr)
+
+
+team_index = LazyTeamIndex()
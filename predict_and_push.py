@@ -1,23 +1,36 @@
-import joblib
-import pandas as pd
 from datetime import datetime
-from linebot.v3.messaging import MessagingApi, Configuration, ApiClient
-from linebot.v3.messaging.models import TextMessage, PushMessageRequest
 import os
 
+from model.predictor import predict_batch, registry
+from modules.lazy import lazy_import
+from modules.line_delivery import get_delivery
+
+# numpy / pandas 到真正預測時才載入
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
 # 載入環境變數
 CHANNEL_ACCESS_TOKEN = os.getenv("CHANNEL_ACCESS_TOKEN")
-USER_ID = os.getenv("USER_ID")
+USER_ID = os.getenv("USER_ID")  # 多位使用者以逗號分隔，會改用 multicast
+
+MODEL_PATHS = {
+    "home_win": "models/model_home_win.pkl",
+    "spread": "models/model_spread.pkl",
+    "over": "models/model_over.pkl",
+}
+
+
+# 登記模型（第一次預測時才載入，檔案更新後自動熱替換）；import 本模組不做任何事
+def init():
+    for name, path in MODEL_PATHS.items():
+        registry.register(name, path)
 
-# 初始化 LINE Messaging API
-configuration = Configuration(access_token=CHANNEL_ACCESS_TOKEN)
-api_client = ApiClient(configuration)
-line_bot_api = MessagingApi(api_client)
 
-# 載入模型
-model_win = joblib.load("models/model_home_win.pkl")
-model_spread = joblib.load("models/model_spread.pkl")
-model_over = joblib.load("models/model_over.pkl")
+def _model(name):
+    handle = registry.get(name)
+    if handle is None:
+        raise RuntimeError(f"模型 {name} 無法載入")
+    return handle
 
 # 模擬今日比賽（可改為真實爬蟲資料）
 today_games = [
@@ -35,27 +48,47 @@ today_games = [
     }
 ]
 
+FEATURES = ["home_score", "away_score"]
+TARGETS = ["home_win", "spread", "over"]
+
+
+# 整個賽程一次預測：特徵矩陣只建一次，三個目標共用
+def predict_slate(games):
+    """回傳每場比賽的 home_win / spread / over 標籤與 *_prob 機率。"""
+    out = pd.DataFrame(games)
+    if out.empty:
+        return out
+    init()
+    X = np.array([[g[f] for f in FEATURES] for g in games], dtype=np.float32)
+    results = predict_batch({t: _model(t) for t in TARGETS}, X)
+    for target, (labels, probs) in results.items():
+        out[target] = labels
+        out[f"{target}_prob"] = probs
+    return out
+
+
 # 產生預測推播內容
 def generate_predictions(games):
     message = f"📊 AI 賽事預測 ({datetime.now().strftime('%m/%d')})\n\n"
-    for game in games:
-        X = pd.DataFrame([[game["home_score"], game["away_score"]]], columns=["home_score", "away_score"])
-        win = model_win.predict(X)[0]
-        spread = model_spread.predict(X)[0]
-        ou = model_over.predict(X)[0]
-
-        message += f"{game['home_team']} vs {game['away_team']}\n"
-        message += f"預測勝方：{'主隊' if win == 1 else '客隊'}\n"
-        message += f"推薦盤口：{'主隊過盤' if spread else '客隊受讓'}\n"
-        message += f"大小分推薦：{'大分' if ou else '小分'}\n\n"
+    for g in predict_slate(games).itertuples(index=False):
+        message += f"{g.home_team} vs {g.away_team}\n"
+        message += f"預測勝方：{'主隊' if g.home_win == 1 else '客隊'}（主勝 {g.home_win_prob:.0%}）\n"
+        message += f"推薦盤口：{'主隊過盤' if g.spread else '客隊受讓'}\n"
+        message += f"大小分推薦：{'大分' if g.over else '小分'}\n\n"
     return message
 
 # 發送推播
 def push_prediction():
+    user_ids = [u.strip() for u in (USER_ID or "").split(",") if u.strip()]
+    if not user_ids:
+        print("❌ USER_ID 未設定，跳過推播")
+        return
     text = generate_predictions(today_games)
-    line_bot_api.push_message(PushMessageRequest(to=USER_ID, messages=[TextMessage(text=text)]))
-    print("✅ 已推播預測內容")
+    # LINE 推播走共用的背景佇列（見 modules/line_delivery.py）
+    get_delivery(CHANNEL_ACCESS_TOKEN).enqueue(text, to=user_ids)
+    print("✅ 預測內容已排入推播佇列")
 
 # 若直接執行此腳本，立即推播
 if __name__ == "__main__":
     push_prediction()
+    get_delivery(CHANNEL_ACCESS_TOKEN).flush(timeout=60)
@@ -1,31 +1,294 @@
-import requests
-from bs4 import BeautifulSoup
+"""
+賠率 proxy 服務（`GET /odds-proxy`，由 main.py 掛載）。
 
-def fetch_oddspedia_soccer():
-    url = "https://oddspedia.com/football"
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
+多個 bot 實例原本各自爬 Oddspedia；改由這個服務每個區間只爬一次，其他實例透過
+`proxy/odds_fetcher.get_odds_from_proxy` 取用：
+
+✔ 記憶體 + 可選 SQLite（ODDS_PROXY_DB）快取正規化後的賠率；同機多程序共用 SQLite
+✔ ETag / If-None-Match → 304；Cache-Control 帶 max-age 與 stale-while-revalidate
+✔ stale-while-revalidate：過期但在 ODDS_PROXY_STALE 內先回舊資料、背景更新
+✔ 請求合併（single-flight）：同一時間只有一個上游請求；跨程序以 SQLite lease 協調
+✔ 預設只在有人請求 /odds-proxy 時更新（過期才經 `refresh()` 合併成一次上游請求）；
+  背景定時更新（ODDS_PROXY_INTERVAL）只應由「指定的那一個 proxy 部署」設定——
+  SQLite lease 只能協調同一台機器的程序，每個 bot 都開的話又變回 N 個 bot → N 次上游請求
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import Blueprint, Response, request
+
+from modules.change_detector import digest
+from modules.sources import oddspedia_soccer
+
+ODDS_PROXY_TTL = float(os.getenv("ODDS_PROXY_TTL", "60"))  # 新鮮期（秒）
+ODDS_PROXY_STALE = float(os.getenv("ODDS_PROXY_STALE", "600"))  # 過期後仍可先回舊資料的時間
+ODDS_PROXY_INTERVAL = float(os.getenv("ODDS_PROXY_INTERVAL", "0"))  # 背景更新間隔；0（預設）為停用，只有 proxy 部署設定
+ODDS_PROXY_WAIT = float(os.getenv("ODDS_PROXY_WAIT", "20"))  # 無快取時等待上游的上限
+ODDS_PROXY_DB = os.getenv("ODDS_PROXY_DB")  # 例如 ./cache/odds_proxy.sqlite
 
+PROXY_SOURCES = {"soccer": oddspedia_soccer}
+
+
+def load_matches(sport="soccer") -> List[Dict]:
+    """爬取並正規化為 proxy 的資料格式（失敗時拋出）。"""
+
+    source = PROXY_SOURCES.get(sport)
+    if source is None:
+        raise KeyError(f"unsupported sport: {sport}")
+    return [
+        {
+            "match": m.match,
+            "time": m.kickoff,
+            "home_odds": m.home_odds,
+            "away_odds": m.away_odds,
+            "books": m.books,
+        }
+        for m in source.fetch(sport, raise_errors=True)
+        if m.away_odds is not None
+    ]
+
+
+def fetch_oddspedia_soccer():
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        matches = []
-        for item in soup.select(".eventRow"):
-            teams = item.select_one(".name").text.strip()
-            time = item.select_one(".time").text.strip()
-            odds = item.select(".odds")
-            if len(odds) >= 2:
-                match = {
-                    "match": teams,
-                    "time": time,
-                    "home_odds": odds[0].text.strip(),
-                    "away_odds": odds[1].text.strip()
-                }
-                matches.append(match)
-
-        return jsonify({"status": "success", "data": 賠率資料列表})
+        return {"status": "success", "data": load_matches("soccer")}
 
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+# ────────────────────────────────────────────────────────────────
+# 快取
+# ────────────────────────────────────────────────────────────────
+
+@dataclass
+class Snapshot:
+    body: bytes
+    etag: str
+    fetched_at: float
+
+    def age(self, now=None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+
+def make_snapshot(data: List[Dict], fetched_at=None) -> Snapshot:
+    body = json.dumps({"status": "success", "data": data}, ensure_ascii=False).encode("utf-8")
+    return Snapshot(body, f'"{digest(body.decode("utf-8"))}"', fetched_at or time.time())
+
+
+class OddsProxyCache:
+    def __init__(
+        self,
+        loader: Callable[[str], List[Dict]] = load_matches,
+        ttl: float = ODDS_PROXY_TTL,
+        stale: float = ODDS_PROXY_STALE,
+        db_path: Optional[str] = ODDS_PROXY_DB,
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale = stale
+        self._mem: Dict[str, Snapshot] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.RLock()  # done callback 可能在 refresh() 持鎖時同步執行
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="odds-proxy")
+        self.upstream_requests = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._open_db(db_path)
+
+    # ── SQLite（同機多程序共用）─────────────────────────────────
+
+    def _open_db(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " sport TEXT PRIMARY KEY, body BLOB, etag TEXT, fetched_at REAL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS leases (sport TEXT PRIMARY KEY, owner TEXT, until REAL)"
+            )
+            self._db.commit()
+        except sqlite3.Error as exc:
+            logging.error(f"OddsProxyCache SQLite 開啟失敗：{exc}")
+            self._db = None
+
+    def _db_read(self, sport: str) -> Optional[Snapshot]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT body, etag, fetched_at FROM snapshots WHERE sport = ?", (sport,)
+            ).fetchone()
+        return Snapshot(bytes(row[0]), row[1], row[2]) if row else None
+
+    def _db_write(self, sport: str, snap: Snapshot) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                (sport, snap.body, snap.etag, snap.fetched_at),
+            )
+            self._db.commit()
+
+    def _claim(self, sport: str, owner: str, hold: float) -> bool:
+        """跨程序 lease：只有取得 lease 的程序會打上游。"""
+
+        if self._db is None:
+            return True
+        now = time.time()
+        with self._db_lock:
+            cur = self._db.execute(
+                "INSERT INTO leases VALUES (?, ?, ?)"
+                " ON CONFLICT(sport) DO UPDATE SET owner = excluded.owner, until = excluded.until"
+                " WHERE leases.until < ?",
+                (sport, owner, now + hold, now),
+            )
+            self._db.commit()
+            return cur.rowcount > 0
+
+    def _release(self, sport: str, owner: str) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute("DELETE FROM leases WHERE sport = ? AND owner = ?", (sport, owner))
+            self._db.commit()
+
+    # ── 讀取 ─────────────────────────────────────────────────────
+
+    def _current(self, sport: str) -> Optional[Snapshot]:
+        with self._lock:
+            snap = self._mem.get(sport)
+        shared = self._db_read(sport)
+        if shared and (snap is None or shared.fetched_at > snap.fetched_at):
+            with self._lock:
+                self._mem[sport] = shared
+            snap = shared
+        return snap
+
+    def get(self, sport: str = "soccer", wait: float = ODDS_PROXY_WAIT) -> Tuple[Snapshot, str]:
+        """回傳 (snapshot, 狀態)；狀態為 HIT / STALE / MISS。"""
+
+        snap = self._current(sport)
+        if snap is not None:
+            age = snap.age()
+            if age < self.ttl:
+                return snap, "HIT"
+            if age < self.ttl + self.stale:
+                self.refresh(sport)  # 背景更新，先回舊資料
+                return snap, "STALE"
+
+        try:
+            return self.refresh(sport).result(timeout=wait), "MISS"
+        except Exception:
+            if snap is not None:  # stale-if-error
+                return snap, "STALE"
+            raise
+
+    # ── 更新（single-flight）────────────────────────────────────
+
+    def refresh(self, sport: str = "soccer") -> Future:
+        with self._lock:
+            fut = self._inflight.get(sport)
+            if fut is None:
+                fut = self._inflight[sport] = self._pool.submit(self._refresh, sport)
+                fut.add_done_callback(lambda _: self._done(sport))
+            return fut
+
+    def _done(self, sport: str) -> None:
+        with self._lock:
+            self._inflight.pop(sport, None)
+
+    def _refresh(self, sport: str) -> Snapshot:
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        deadline = time.time() + ODDS_PROXY_WAIT
+        while True:
+            shared = self._db_read(sport)
+            if shared and shared.age() < self.ttl:  # 其他程序剛更新過
+                with self._lock:
+                    self._mem[sport] = shared
+                return shared
+            if self._claim(sport, owner, ODDS_PROXY_WAIT):
+                break
+            if time.time() > deadline:
+                raise TimeoutError(f"odds proxy lease for {sport} not released")
+            time.sleep(0.2)
+
+        try:
+            self.upstream_requests += 1
+            snap = make_snapshot(self.loader(sport))
+            with self._lock:
+                self._mem[sport] = snap
+            self._db_write(sport, snap)
+            return snap
+        finally:
+            self._release(sport, owner)
+
+
+odds_cache = OddsProxyCache()
+
+
+def start_refresher(interval=ODDS_PROXY_INTERVAL, sports=tuple(PROXY_SOURCES)) -> Optional[threading.Thread]:
+    """每 `interval` 秒更新一次（多程序共用 SQLite 時由取得 lease 者實際爬取）。
+
+    interval ≤ 0（預設）不啟動：資料在 /odds-proxy 被請求時才按需更新。
+    """
+
+    if interval <= 0:
+        return None
+
+    def loop():
+        while True:
+            for sport in sports:
+                try:
+                    odds_cache.refresh(sport).result()
+                except Exception as exc:
+                    logging.error(f"[OddsProxy] {sport} 更新失敗：{exc}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="odds-proxy-refresh", daemon=True)
+    thread.start()
+    return thread
+
+
+# ────────────────────────────────────────────────────────────────
+# Flask blueprint
+# ────────────────────────────────────────────────────────────────
+
+odds_proxy_bp = Blueprint("odds_proxy", __name__)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    return header.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in header.split(",")]
+
+
+@odds_proxy_bp.get("/odds-proxy")
+def odds_proxy():
+    sport = request.args.get("sport", "soccer").lower()
+    if sport not in PROXY_SOURCES:
+        return {"status": "error", "message": f"unsupported sport: {sport}"}, 404
+    try:
+        snap, state = odds_cache.get(sport)
+    except Exception as exc:
+        return {"status": "error", "message": str(exc)}, 502
+
+    headers = {
+        "ETag": snap.etag,
+        "Cache-Control": f"public, max-age={int(odds_cache.ttl)}, stale-while-revalidate={int(odds_cache.stale)}",
+        "Age": str(int(snap.age())),
+        "X-Cache": state,
+    }
+    if _etag_matches(request.headers.get("If-None-Match", ""), snap.etag):
+        return Response(status=304, headers=headers)
+    return Response(snap.body, status=200, headers=headers, mimetype="application/json")
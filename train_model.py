@@ -1,37 +1,37 @@
-import pandas as pd
-import os
-from xgboost import XGBClassifier
-from sklearn.model_selection import train_test_split
-import joblib
+import argparse
+import logging
 
-# 模擬真實歷史數據（請用實際資料取代）
-data = {
-    "home_score": [110, 98, 120, 115, 101],
-    "away_score": [105, 102, 115, 117, 95],
-    "spread": [-2.5, -1.5, -4.0, -3.5, -2.0],
-    "over_under": [220.5, 215.0, 225.0, 218.5, 212.0],
-}
-nba_df = pd.DataFrame(data)
+from train_models_runtime import (
+    HISTORY_PARQUET_DIR,
+    MODEL_DIR,
+    export_models,
+    ingest_history,
+    load_history,
+    train_models,
+)
 
-# 建立標籤欄位
-nba_df["home_win"] = (nba_df["home_score"] > nba_df["away_score"]).astype(int)
-nba_df["spread_cover"] = ((nba_df["home_score"] - nba_df["away_score"]) > nba_df["spread"]).astype(int)
-nba_df["total_over"] = ((nba_df["home_score"] + nba_df["away_score"]) > nba_df["over_under"]).astype(int)
+# 以真實歷史資料訓練並寫出模型（取代原本寫死的模擬資料）
+#   python train_model.py                                  # 匯入 data/*/*_history_*.csv 後訓練全部運動
+#   python train_model.py --sports nba --start 2023-10     # 只用 NBA 2023-10 之後的資料
+#   python train_model.py --csv data/nba/nba_history_2023_2024.csv --out models
+def main():
+    parser = argparse.ArgumentParser(description="訓練主勝 / 過盤 / 大小分模型")
+    parser.add_argument("--csv", nargs="*", help="要匯入的歷史 CSV（預設 HISTORY_GLOB）")
+    parser.add_argument("--skip-ingest", action="store_true", help="直接使用已匯入的 Parquet")
+    parser.add_argument("--parquet", default=HISTORY_PARQUET_DIR)
+    parser.add_argument("--sports", nargs="*")
+    parser.add_argument("--start", help="起始月份 YYYY-MM")
+    parser.add_argument("--end", help="結束月份 YYYY-MM")
+    parser.add_argument("--out", default=MODEL_DIR)
+    args = parser.parse_args()
 
-# 特徵
-X = nba_df[["home_score", "away_score", "spread", "over_under"]]
+    if not args.skip_ingest:
+        ingest_history(args.csv, args.parquet)
+    df = load_history(args.parquet, args.sports, args.start, args.end)
+    for path in export_models(train_models(df), args.out, rows=len(df)):
+        logging.info(f"✓ 已寫出 {path}")
 
-# 確保資料夾存在
-os.makedirs("/mnt/data/models", exist_ok=True)
 
-# 訓練模型並儲存
-def train_and_save(y, filename):
-    y = y.astype(int)  # 確保標籤為整數
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    model = XGBClassifier(use_label_encoder=False, eval_metric="logloss")
-    model.fit(X_train, y_train)
-    joblib.dump(model, f"/mnt/data/models/{filename}")
-
-train_and_save(nba_df["home_win"], "model_home_win.pkl")
-train_and_save(nba_df["spread_cover"], "model_spread_cover.pkl")
-train_and_save(nba_df["total_over"], "model_total_over.pkl")
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,26 +1,189 @@
 
+"""
+訓練管線：多季、多運動歷史資料 → 三個 XGBoost 模型（主勝 / 過盤 / 大小分）。
+
+1. ingest_history：CSV 以 chunk 讀入（明確 dtype）→ 依 sport / 月份分區的 Parquet
+2. load_history：以 pyarrow.dataset 依運動 / 日期篩選讀回
+3. train_models：特徵矩陣只建一次（QuantileDMatrix 分位切點共用），
+   三個目標以 `hist` 演算法平行訓練、分攤 CPU 核心
+4. export_models：寫出帶版本的原生 UBJSON，並原子替換 model/predictor 監看的檔案
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
 import pandas as pd
-from xgboost import XGBClassifier
-from sklearn.model_selection import train_test_split
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import xgboost as xgb
+
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+HISTORY_GLOB = os.getenv("HISTORY_GLOB", "data/*/*_history_*.csv")
+HISTORY_PARQUET_DIR = os.getenv("HISTORY_PARQUET_DIR", "data/history_parquet")
+
+HISTORY_DTYPES = {
+    "home_team": "string",
+    "away_team": "string",
+    "home_score": "int16",
+    "away_score": "int16",
+    "date": "string",
+}
+FEATURES = ["home_score", "away_score"]
+TARGETS = ("home_win", "spread", "over")
+
+# 歷史資料沒有 spread / over_under 欄位時的預設盤口
+DEFAULT_LINES = {"nba": (-2.5, 220.0), "mlb": (-1.5, 8.5), "soccer": (-0.5, 2.5)}
+
+XGB_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": "logloss",
+    "tree_method": "hist",
+    "max_depth": 4,
+    "eta": 0.1,
+}
+NUM_BOOST_ROUND = int(os.getenv("NUM_BOOST_ROUND", "100"))
+
+
+def ingest_history(csv_paths=None, out_dir=HISTORY_PARQUET_DIR, chunksize=100_000):
+    """CSV → 依 sport / month 分區的 Parquet；同一來源重跑會覆寫同名檔案。"""
+    csv_paths = csv_paths or sorted(glob.glob(HISTORY_GLOB))
+    optional = {"spread": "float32", "over_under": "float32"}
+    rows = 0
+    for path in csv_paths:
+        sport = os.path.basename(os.path.dirname(path)).lower()
+        stem = os.path.splitext(os.path.basename(path))[0]
+        header = pd.read_csv(path, nrows=0).columns
+        dtypes = {**HISTORY_DTYPES, **{c: t for c, t in optional.items() if c in header}}
+        reader = pd.read_csv(path, dtype=dtypes, usecols=list(dtypes), chunksize=chunksize)
+        for i, chunk in enumerate(reader):
+            chunk["date"] = pd.to_datetime(chunk["date"])
+            chunk["month"] = chunk["date"].dt.strftime("%Y-%m")
+            chunk["sport"] = sport
+            pq.write_to_dataset(
+                pa.Table.from_pandas(chunk, preserve_index=False),
+                root_path=out_dir,
+                partition_cols=["sport", "month"],
+                basename_template=f"{stem}-{i}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+            rows += len(chunk)
+    logging.info(f"✓ 匯入 {len(csv_paths)} 個檔案、{rows} 場比賽 → {out_dir}")
+    return rows
+
+
+def load_history(parquet_dir=HISTORY_PARQUET_DIR, sports=None, start=None, end=None):
+    """讀回歷史資料；`sports` 為運動清單，`start` / `end` 為 YYYY-MM（含頭尾）。"""
+    partitioning = ds.partitioning(
+        pa.schema([("sport", pa.string()), ("month", pa.string())]), flavor="hive"
+    )
+    dataset = ds.dataset(parquet_dir, format="parquet", partitioning=partitioning)
+    flt = None
+    for cond in (
+        ds.field("sport").isin(list(sports)) if sports else None,
+        ds.field("month") >= start if start else None,
+        ds.field("month") <= end if end else None,
+    ):
+        if cond is not None:
+            flt = cond if flt is None else flt & cond
+    return dataset.to_table(filter=flt).to_pandas()
+
+
+def build_labels(df):
+    """三個二元目標；盤口優先用資料中的 spread / over_under 欄位。"""
+    lines = df["sport"].astype(str).map(lambda s: DEFAULT_LINES.get(s, DEFAULT_LINES["nba"]))
+    spread_line = df["spread"] if "spread" in df else lines.str[0]
+    total_line = df["over_under"] if "over_under" in df else lines.str[1]
+    margin = df["home_score"].astype(int) - df["away_score"].astype(int)
+    points = df["home_score"].astype(int) + df["away_score"].astype(int)
+    return {
+        "home_win": (margin > 0).to_numpy(np.float32),
+        "spread": (margin > spread_line.astype(float)).to_numpy(np.float32),
+        "over": (points > total_line.astype(float)).to_numpy(np.float32),
+    }
+
+
+def train_models(df=None, test_size=0.3, seed=42):
+    """平行訓練三個目標，回傳 {target: Booster}。
+
+    `df` 省略時讀取 HISTORY_PARQUET_DIR（不存在則先由 CSV 匯入）。
+    """
+    if df is None:
+        if not os.path.isdir(HISTORY_PARQUET_DIR):
+            ingest_history()
+        df = load_history()
+
+    X = np.ascontiguousarray(df[FEATURES].to_numpy(np.float32))
+    labels = build_labels(df)
+
+    rng = np.random.default_rng(seed)
+    is_train = rng.random(len(df)) >= test_size
+
+    # 分位切點只算一次，其餘目標以 ref 共用
+    base = xgb.QuantileDMatrix(X[is_train])
+    n_jobs = max(1, (os.cpu_count() or 1) // len(TARGETS))
+
+    def _train(target):
+        y = labels[target]
+        dtrain = xgb.QuantileDMatrix(X[is_train], label=y[is_train], ref=base)
+        evals = [(dtrain, "train")]
+        if (~is_train).any():
+            evals.append((xgb.DMatrix(X[~is_train], label=y[~is_train]), "valid"))
+        params = {**XGB_PARAMS, "nthread": n_jobs, "seed": seed}
+        booster = xgb.train(params, dtrain, NUM_BOOST_ROUND, evals=evals, verbose_eval=False)
+        booster.feature_names = FEATURES
+        return target, booster
+
+    with ThreadPoolExecutor(max_workers=len(TARGETS)) as pool:
+        return dict(pool.map(_train, TARGETS))
+
+
+def export_models(models, out_dir=MODEL_DIR, rows=None):
+    """寫出版本化的原生 UBJSON 並更新最新版。
+
+        models/<target>/<version>.ubj   保留每個版本
+        models/model_<target>.ubj       最新版（先寫暫存檔再原子替換）
+
+    檔名與 predict_and_push 登記的名稱相同，model/predictor 會依 mtime 自動熱替換。
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    paths = []
+    for name, booster in models.items():
+        raw = booster.save_raw("ubj")
+        version = f"{stamp}-{hashlib.sha1(raw).hexdigest()[:8]}"
 
-def train_models():
-    nba_path = "data/nba/nba_history_2023_2024.csv"
-    nba_df = pd.read_csv(nba_path)
+        version_dir = os.path.join(out_dir, name)
+        os.makedirs(version_dir, exist_ok=True)
+        with open(os.path.join(version_dir, f"{version}.ubj"), "wb") as f:
+            f.write(raw)
+        with open(os.path.join(version_dir, f"{version}.json"), "w") as f:
+            json.dump({"version": version, "features": FEATURES, "rows": rows}, f)
 
-    nba_df["home_win"] = (nba_df["home_score"] > nba_df["away_score"]).astype(int)
-    nba_df["spread_result"] = ((nba_df["home_score"] - nba_df["away_score"]) > -2.5).astype(int)
-    nba_df["over_result"] = ((nba_df["home_score"] + nba_df["away_score"]) > 220).astype(int)
+        path = os.path.join(out_dir, f"model_{name}.ubj")
+        tmp = os.path.join(out_dir, f".model_{name}.tmp.ubj")
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+        paths.append(path)
+    return paths
 
-    X = nba_df[["home_score", "away_score"]]
 
-    def train(X, y):
-        X_train, _, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=42)
-        model = XGBClassifier(use_label_encoder=False, eval_metric="logloss")
-        model.fit(X_train, y_train)
-        return model
+def train_and_export(out_dir=MODEL_DIR):
+    if not os.path.isdir(HISTORY_PARQUET_DIR):
+        ingest_history()
+    df = load_history()
+    return export_models(train_models(df), out_dir, rows=len(df))
 
-    model_win = train(X, nba_df["home_win"])
-    model_spread = train(X, nba_df["spread_result"])
-    model_over = train(X, nba_df["over_result"])
 
-    return model_win, model_spread, model_over
+# 建議以獨立程序執行，或透過 registry.retrain_async(train_and_export) 在背景執行
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for p in train_and_export():
+        logging.info(f"✓ 已寫出 {p}")